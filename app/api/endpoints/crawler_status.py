@@ -0,0 +1,357 @@
+from fastapi import APIRouter, Request  # 导入FastAPI组件
+
+from app.api.models.APIResponseModel import ResponseModel  # 导入响应模型
+
+# 共享客户端池/Shared client pool
+from crawlers.utils.client_pool import ClientPool
+# 熔断器/Circuit breakers
+from crawlers.utils.circuit_breaker import CircuitBreakerRegistry
+# 限流器/Rate limiter
+from crawlers.utils.rate_limiter import RateLimiter
+# 代理池/Proxy pool
+from crawlers.utils.proxy_pool import ProxyPool
+# Cookie池/Cookie pool
+from crawlers.utils.cookie_pool import CookiePool
+# 令牌预热池/Token pre-warming pool
+from crawlers.utils.token_pool import TokenPool
+# 请求合并/Request coalescing
+from crawlers.utils.singleflight import SingleFlight
+# 响应缓存/Response cache
+from crawlers.utils.response_cache import ResponseCache
+# 分享链接解析缓存/Share-link resolution cache
+from crawlers.utils.link_cache import LinkCache
+# 短链重定向解析器/Share-link redirect resolver
+from crawlers.utils.redirect_resolver import RedirectResolver
+# 对冲请求/Hedged requests
+from crawlers.utils.hedge import Hedge
+# 请求截止时间/Request deadline
+from crawlers.utils.deadline import Deadline
+# 作品数据持久化缓存/Persistent video data cache
+from crawlers.hybrid.hybrid_crawler import metadata_cache
+
+router = APIRouter()
+
+
+# 获取共享客户端池状态
+@router.get("/http_clients",
+            response_model=ResponseModel,
+            summary="获取共享HTTP客户端状态/Get shared HTTP client status"
+            )
+async def get_http_clients(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取共享HTTP客户端池的状态，包括每个客户端的连接数、HTTP/2连接数以及并发流数。
+    ### 返回:
+    - 客户端池状态
+
+    # [English]
+    ### Purpose:
+    - Get the status of the shared HTTP client pool, including connection count, HTTP/2 connection count and concurrent streams of every client.
+    ### Return:
+    - Client pool status
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=ClientPool.stats())
+
+
+# 获取上游熔断器状态
+@router.get("/circuit_breakers",
+            response_model=ResponseModel,
+            summary="获取上游熔断器状态/Get upstream circuit breaker status"
+            )
+async def get_circuit_breakers(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取每个上游域名（如 www.douyin.com、www.tiktok.com、api.bilibili.com）的熔断器状态。
+    - 状态为 `closed`（正常）、`open`（快速失败）或 `half_open`（探测中）。
+    ### 返回:
+    - 熔断器状态列表
+
+    # [English]
+    ### Purpose:
+    - Get the circuit breaker status of every upstream host (e.g. www.douyin.com, www.tiktok.com, api.bilibili.com).
+    - The state is `closed` (normal), `open` (failing fast) or `half_open` (probing).
+    ### Return:
+    - List of circuit breaker status
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=CircuitBreakerRegistry.stats())
+
+
+# 获取出站请求限流状态
+@router.get("/rate_limiters",
+            response_model=ResponseModel,
+            summary="获取出站请求限流状态/Get outgoing request rate limiter status"
+            )
+async def get_rate_limiters(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取每个平台与Cookie身份的令牌桶状态，Cookie仅以摘要形式展示。
+    ### 返回:
+    - 令牌桶状态列表
+
+    # [English]
+    ### Purpose:
+    - Get the token bucket status of every platform and cookie identity, cookies are only shown as digests.
+    ### Return:
+    - List of token bucket status
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=RateLimiter.stats())
+
+
+# 获取代理池健康评分
+@router.get("/proxy_pools",
+            response_model=ResponseModel,
+            summary="获取代理池健康评分/Get proxy pool health scores"
+            )
+async def get_proxy_pools(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取每个平台代理池中各代理的延迟、错误率、选择权重与隔离状态，代理地址不包含账号密码。
+    - 只有在配置文件中填写了 `proxy_pool` 的平台才会出现在结果中。
+    ### 返回:
+    - 按平台分组的代理状态
+
+    # [English]
+    ### Purpose:
+    - Get the latency, error rate, selection weight and quarantine state of every proxy in each platform's pool, proxy addresses are shown without credentials.
+    - Only platforms with a `proxy_pool` in their config file are listed.
+    ### Return:
+    - Proxy status grouped by platform
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=ProxyPool.stats())
+
+
+# 获取Cookie池状态
+@router.get("/cookie_pools",
+            response_model=ResponseModel,
+            summary="获取Cookie池状态/Get cookie pool status"
+            )
+async def get_cookie_pools(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取抖音与TikTok的多账号Cookie池状态，包括每个Cookie的请求数、并发数、失败次数与冷却状态。
+    - Cookie仅以摘要形式展示。
+    ### 返回:
+    - 按平台分组的Cookie状态
+
+    # [English]
+    ### Purpose:
+    - Get the status of the Douyin and TikTok multi-account cookie pools, including requests, in-flight requests, failures and cooldown state of every cookie.
+    - Cookies are only shown as digests.
+    ### Return:
+    - Cookie status grouped by platform
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=CookiePool.stats())
+
+
+# 获取令牌预热池状态
+@router.get("/token_pools",
+            response_model=ResponseModel,
+            summary="获取令牌预热池状态/Get token pre-warming pool status"
+            )
+async def get_token_pools(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取每个平台msToken预热池的令牌数量、最旧令牌的寿命以及取用、生成、失败与过期次数。
+    - 不会返回令牌内容。
+    ### 返回:
+    - 令牌池状态列表
+
+    # [English]
+    ### Purpose:
+    - Get the token count, oldest token age and the served, generated, failed and expired counters of every msToken pool.
+    - Token values are never returned.
+    ### Return:
+    - List of token pool status
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=TokenPool.stats())
+
+
+# 获取请求合并统计
+@router.get("/singleflight",
+            response_model=ResponseModel,
+            summary="获取请求合并统计/Get request coalescing statistics"
+            )
+async def get_singleflight(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取并发相同请求的合并统计，`coalesced` 为复用其他请求结果而未访问上游的次数。
+    ### 返回:
+    - 请求合并统计
+
+    # [English]
+    ### Purpose:
+    - Get statistics of coalesced concurrent identical requests, `coalesced` counts calls that reused another call's result without going upstream.
+    ### Return:
+    - Request coalescing statistics
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=SingleFlight.stats())
+
+
+# 获取响应缓存统计
+@router.get("/response_cache",
+            response_model=ResponseModel,
+            summary="获取响应缓存统计/Get response cache statistics"
+            )
+async def get_response_cache(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取爬虫JSON响应缓存的统计，包括条目数、占用字节数以及命中、未命中、淘汰和过期次数。
+    ### 返回:
+    - 响应缓存统计
+
+    # [English]
+    ### Purpose:
+    - Get statistics of the crawler JSON response cache, including entries, bytes used and hit, miss, eviction and expiration counts.
+    ### Return:
+    - Response cache statistics
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=ResponseCache.stats())
+
+
+# 获取分享链接解析缓存统计
+@router.get("/link_cache",
+            response_model=ResponseModel,
+            summary="获取分享链接解析缓存统计/Get share-link resolution cache statistics"
+            )
+async def get_link_cache(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取分享链接（v.douyin.com、vm.tiktok.com、b23.tv等）到作品/用户ID解析缓存的命中率、负缓存命中数、持久化命中数与淘汰数。
+    ### 返回:
+    - 缓存统计
+
+    # [English]
+    ### Purpose:
+    - Get the hit rate, negative hits, persistent hits and evictions of the share-link (v.douyin.com, vm.tiktok.com, b23.tv, etc.) to post/user id resolution cache.
+    ### Return:
+    - Cache statistics
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=LinkCache.stats())
+
+
+# 获取短链重定向解析统计
+@router.get("/redirects",
+            response_model=ResponseModel,
+            summary="获取短链重定向解析统计/Get share-link redirect resolution statistics"
+            )
+async def get_redirects(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取短链重定向解析的次数、跟随的跳数、提前命中ID停止的次数与请求到落地页的次数。
+    ### 返回:
+    - 重定向解析统计
+
+    # [English]
+    ### Purpose:
+    - Get the number of share-link redirect resolutions, hops followed, early stops on an id match and requests that reached the landing page.
+    ### Return:
+    - Redirect resolution statistics
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=RedirectResolver.stats())
+
+
+# 获取对冲请求统计
+@router.get("/hedges",
+            response_model=ResponseModel,
+            summary="获取对冲请求统计/Get hedged request statistics"
+            )
+async def get_hedges(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取对冲请求（如TikTok APP与Web接口竞速，以及各平台GET请求的重复请求）的调用次数、发起备用请求次数(fired)、备用请求胜出次数(won)与全部失败次数。
+    - 按分位数延迟对冲的平台还会返回当前的等待秒数(delay)，在各平台 `config.yaml` 的 `hedge` 中配置。
+    ### 返回:
+    - 对冲请求统计
+
+    # [English]
+    ### Purpose:
+    - Get calls, fallbacks started (fired), fallbacks that won (won) and total failures of hedged requests, such as the TikTok APP vs Web race and the duplicated GET requests of each platform.
+    - Platforms hedged with a percentile-based delay also return the current wait in seconds (delay), configured by `hedge` in each platform's `config.yaml`.
+    ### Return:
+    - Hedged request statistics
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=Hedge.stats())
+
+
+# 获取请求截止时间统计
+@router.get("/deadlines",
+            response_model=ResponseModel,
+            summary="获取请求截止时间统计/Get request deadline statistics"
+            )
+async def get_deadlines(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取设置了截止时间的请求数(scopes)与因超过截止时间而提前终止的次数(expired)。
+    - 时间预算上限在根目录 `config.yaml` 的 `API.Request_Timeout` 中设置，请求头 `X-Request-Timeout` 只能缩短它。
+    ### 返回:
+    - 请求截止时间统计
+
+    # [English]
+    ### Purpose:
+    - Get the number of requests with a deadline (scopes) and the number of times work stopped early because the deadline had passed (expired).
+    - The time budget is capped by `API.Request_Timeout` in the root `config.yaml`, the `X-Request-Timeout` header can only shorten it.
+    ### Return:
+    - Request deadline statistics
+    """
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=Deadline.stats())
+
+
+# 获取作品数据持久化缓存统计
+@router.get("/metadata_cache",
+            response_model=ResponseModel,
+            summary="获取作品数据持久化缓存统计/Get persistent video data cache statistics"
+            )
+async def get_metadata_cache(request: Request):
+    """
+    # [中文]
+    ### 用途:
+    - 获取SQLite作品数据缓存的统计，未在 `crawlers/hybrid/config.yaml` 中启用时返回 `enabled: false`。
+    ### 返回:
+    - 作品数据缓存统计
+
+    # [English]
+    ### Purpose:
+    - Get statistics of the SQLite video data cache, returns `enabled: false` when it is not enabled in `crawlers/hybrid/config.yaml`.
+    ### Return:
+    - Video data cache statistics
+    """
+    data = {"enabled": False} if metadata_cache is None else {"enabled": True, **(await metadata_cache.stats())}
+    return ResponseModel(code=200,
+                         router=request.url.path,
+                         data=data)
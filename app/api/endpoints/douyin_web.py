@@ -1,9 +1,11 @@
 from typing import List
 
 from fastapi import APIRouter, Body, Query, Request, HTTPException  # 导入FastAPI组件
+from fastapi.responses import StreamingResponse
 from app.api.models.APIResponseModel import ResponseModel, ErrorResponseModel  # 导入响应模型
 
 from crawlers.douyin.web.web_crawler import DouyinWebCrawler  # 导入抖音Web爬虫
+from crawlers.utils.batch_resolver import BatchResolver  # 导入批量解析器
 
 
 router = APIRouter()
@@ -830,23 +832,26 @@ async def get_all_sec_user_id(request: Request,
                                       "https://v.douyin.com/idFqvUms/",
                                   ],
                                   description="用户主页链接列表/User homepage link list"
-                              )):
+                              ),
+                              stream: bool = Query(False, description="以NDJSON流逐项返回/Stream per-item results as NDJSON")):
     """
     # [中文]
     ### 用途:
     - 提取列表用户id
     ### 参数:
     - url: 用户主页链接列表
+    - stream: 是否以NDJSON流按完成顺序逐项返回，默认为False
     ### 返回:
-    - 用户sec_user_id列表
+    - 每个链接的解析结果列表，单个链接失败不影响其他结果（index、input、ok，成功时为value，失败时为error_type与error）
 
     # [English]
     ### Purpose:
     - Extract list user id
     ### Parameters:
     - url: User homepage link list
+    - stream: Whether to stream per-item results as NDJSON in completion order, default is False
     ### Return:
-    - User sec_user_id list
+    - Per-link results, one failed link does not affect the others (index, input, ok, plus value on success or error_type and error on failure)
 
     # [示例/Example]
     ```json
@@ -861,7 +866,9 @@ async def get_all_sec_user_id(request: Request,
     ```
     """
     try:
-        data = await DouyinWebCrawler.get_all_sec_user_id(url)
+        data = await DouyinWebCrawler.get_all_sec_user_id(url, stream=stream)
+        if stream:
+            return StreamingResponse(BatchResolver.ndjson(data), media_type="application/x-ndjson")
         return ResponseModel(code=200,
                              router=request.url.path,
                              data=data)
@@ -927,23 +934,26 @@ async def get_all_aweme_id(request: Request,
                                    "https://www.douyin.com/video/7298145681699622182?previous_page=web_code_link",
                                    "https://www.douyin.com/video/7298145681699622182",
                                ],
-                               description="作品链接列表/Video link list")):
+                               description="作品链接列表/Video link list"),
+                           stream: bool = Query(False, description="以NDJSON流逐项返回/Stream per-item results as NDJSON")):
     """
     # [中文]
     ### 用途:
     - 提取列表作品id
     ### 参数:
     - url: 作品链接列表
+    - stream: 是否以NDJSON流按完成顺序逐项返回，默认为False
     ### 返回:
-    - 作品id列表
+    - 每个链接的解析结果列表，单个链接失败不影响其他结果（index、input、ok，成功时为value，失败时为error_type与error）
 
     # [English]
     ### Purpose:
     - Extract list video id
     ### Parameters:
     - url: Video link list
+    - stream: Whether to stream per-item results as NDJSON in completion order, default is False
     ### Return:
-    - Video id list
+    - Per-link results, one failed link does not affect the others (index, input, ok, plus value on success or error_type and error on failure)
 
     # [示例/Example]
     ```json
@@ -959,7 +969,9 @@ async def get_all_aweme_id(request: Request,
     ```
     """
     try:
-        data = await DouyinWebCrawler.get_all_aweme_id(url)
+        data = await DouyinWebCrawler.get_all_aweme_id(url, stream=stream)
+        if stream:
+            return StreamingResponse(BatchResolver.ndjson(data), media_type="application/x-ndjson")
         return ResponseModel(code=200,
                              router=request.url.path,
                              data=data)
@@ -1025,23 +1037,26 @@ async def get_all_webcast_id(request: Request,
                                      "6i- Q@x.Sl 03/23 【醒子8ke的直播间】  点击打开👉https://v.douyin.com/i8tBR7hX/  或长按复制此条消息，打开抖音，看TA直播",
                                      "https://v.douyin.com/i8tBR7hX/",
                                  ],
-                                 description="直播间链接列表/Room link list")):
+                                 description="直播间链接列表/Room link list"),
+                             stream: bool = Query(False, description="以NDJSON流逐项返回/Stream per-item results as NDJSON")):
     """
     # [中文]
     ### 用途:
     - 提取列表直播间号
     ### 参数:
     - url: 直播间链接列表
+    - stream: 是否以NDJSON流按完成顺序逐项返回，默认为False
     ### 返回:
-    - 直播间号列表
+    - 每个链接的解析结果列表，单个链接失败不影响其他结果（index、input、ok，成功时为value，失败时为error_type与error）
 
     # [English]
     ### Purpose:
     - Extract list webcast id
     ### Parameters:
     - url: Room link list
+    - stream: Whether to stream per-item results as NDJSON in completion order, default is False
     ### Return:
-    - Room id list
+    - Per-link results, one failed link does not affect the others (index, input, ok, plus value on success or error_type and error on failure)
 
     # [示例/Example]
     ```json
@@ -1057,7 +1072,9 @@ async def get_all_webcast_id(request: Request,
     ```
     """
     try:
-        data = await DouyinWebCrawler.get_all_webcast_id(url)
+        data = await DouyinWebCrawler.get_all_webcast_id(url, stream=stream)
+        if stream:
+            return StreamingResponse(BatchResolver.ndjson(data), media_type="application/x-ndjson")
         return ResponseModel(code=200,
                              router=request.url.path,
                              data=data)
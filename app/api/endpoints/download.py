@@ -10,6 +10,7 @@ from starlette.responses import FileResponse
 
 from app.api.models.APIResponseModel import ErrorResponseModel  # 导入响应模型
 from crawlers.hybrid.hybrid_crawler import HybridCrawler  # 导入混合数据爬虫
+from crawlers.utils.deadline import Deadline  # 请求截止时间
 
 router = APIRouter()
 HybridCrawler = HybridCrawler()
@@ -24,8 +25,8 @@ async def fetch_data(url: str, headers: dict = None):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     } if headers is None else headers.get('headers')
     
-    # 添加重定向支持和超时设置
-    async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as client:
+    # 添加重定向支持和超时设置，超时不超过剩余的请求预算
+    async with httpx.AsyncClient(follow_redirects=True, timeout=Deadline.timeout(60.0)) as client:
         response = await client.get(url, headers=headers)
         response.raise_for_status()  # 确保响应是成功的
         return response
@@ -36,8 +37,8 @@ async def fetch_data_stream(url: str, request:Request , headers: dict = None, fi
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     } if headers is None else headers.get('headers')
     
-    # 创建支持重定向的客户端，设置超时时间
-    async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as client:
+    # 创建支持重定向的客户端，设置超时时间，单次读写不超过剩余的请求预算
+    async with httpx.AsyncClient(follow_redirects=True, timeout=Deadline.timeout(60.0)) as client:
         # 启用流式请求
         async with client.stream("GET", url, headers=headers) as response:
             response.raise_for_status()
@@ -150,9 +151,9 @@ async def download_file_hybrid(request: Request,
                 clean_naming = sanitize_filename(naming)
                 file_name = f"{clean_naming}.mp4"
                 # 存储文件时使用ID作为文件名以避免冲突
-                storage_file_name = f"{file_prefix}{platform}_{aweme_id}.mp4" if not with_watermark else f"{file_prefix}{platform}_{aweme_id}_watermark.mp4"
+                storage_file_name = f"{file_prefix}{platform}_{video_id}.mp4" if not with_watermark else f"{file_prefix}{platform}_{video_id}_watermark.mp4"
             else:
-                file_name = f"{file_prefix}{platform}_{aweme_id}.mp4" if not with_watermark else f"{file_prefix}{platform}_{aweme_id}_watermark.mp4"
+                file_name = f"{file_prefix}{platform}_{video_id}.mp4" if not with_watermark else f"{file_prefix}{platform}_{video_id}_watermark.mp4"
                 storage_file_name = file_name
             
             url = data.get('video_data').get('nwm_video_url_HQ') if not with_watermark else data.get('video_data').get(
@@ -205,9 +206,9 @@ async def download_file_hybrid(request: Request,
                 clean_naming = sanitize_filename(naming)
                 zip_file_name = f"{clean_naming}.zip"
                 # 存储文件时使用ID作为文件名以避免冲突
-                storage_zip_file_name = f"{file_prefix}{platform}_{aweme_id}_images.zip" if not with_watermark else f"{file_prefix}{platform}_{aweme_id}_images_watermark.zip"
+                storage_zip_file_name = f"{file_prefix}{platform}_{video_id}_images.zip" if not with_watermark else f"{file_prefix}{platform}_{video_id}_images_watermark.zip"
             else:
-                zip_file_name = f"{file_prefix}{platform}_{aweme_id}_images.zip" if not with_watermark else f"{file_prefix}{platform}_{aweme_id}_images_watermark.zip"
+                zip_file_name = f"{file_prefix}{platform}_{video_id}_images.zip" if not with_watermark else f"{file_prefix}{platform}_{video_id}_images_watermark.zip"
                 storage_zip_file_name = zip_file_name
             
             zip_file_path = os.path.join(download_path, storage_zip_file_name)
@@ -226,7 +227,7 @@ async def download_file_hybrid(request: Request,
                 index = int(urls.index(url))
                 content_type = response.headers.get('content-type')
                 file_format = content_type.split('/')[1]
-                file_name_temp = f"{file_prefix}{platform}_{aweme_id}_{index + 1}.{file_format}" if not with_watermark else f"{file_prefix}{platform}_{aweme_id}_{index + 1}_watermark.{file_format}"
+                file_name_temp = f"{file_prefix}{platform}_{video_id}_{index + 1}.{file_format}" if not with_watermark else f"{file_prefix}{platform}_{video_id}_{index + 1}_watermark.{file_format}"
                 file_path = os.path.join(download_path, file_name_temp)
                 image_file_list.append(file_path)
 
@@ -1,11 +1,14 @@
 import asyncio
+from typing import List
 
 from fastapi import APIRouter, Body, Query, Request, HTTPException  # 导入FastAPI组件
+from fastapi.responses import StreamingResponse
 
-from app.api.models.APIResponseModel import ResponseModel, ErrorResponseModel  # 导入响应模型
+from app.api.models.APIResponseModel import ResponseModel, ErrorResponseModel, response_fields  # 导入响应模型
 
 # 爬虫/Crawler
 from crawlers.hybrid.hybrid_crawler import HybridCrawler  # 导入混合爬虫
+from crawlers.utils.batch_resolver import BatchResolver  # 导入批量解析器
 
 HybridCrawler = HybridCrawler()  # 实例化混合爬虫
 
@@ -52,6 +55,50 @@ async def hybrid_parsing_single_video(request: Request,
                                     )
         raise HTTPException(status_code=status_code, detail=detail.dict())
 
+
+@router.post("/video_data/batch", tags=["Hybrid-API"],
+             summary="混合解析批量视频接口/Hybrid parsing batch video endpoint")
+async def hybrid_parsing_batch_video(request: Request,
+                                     urls: List[str] = Body(
+                                         example=["https://v.douyin.com/L4FJNR3/",
+                                                  "https://www.tiktok.com/@taylorswift/video/7359655005701311786"],
+                                         description="视频链接列表/Video link list"),
+                                     minimal: bool = Query(default=False)):
+    """
+    # [中文]
+    ### 用途:
+    - 批量解析抖音/TikTok/Bilibili视频数据，以有上限的并发解析，每完成一个链接就以一行JSON（NDJSON）立即返回。
+    ### 参数:
+    - `urls`: 视频链接、分享链接或分享文本的列表，单次请求的数量上限见 crawlers/hybrid/config.yaml 中的 Batch.max_urls。
+    - `minimal`: 是否返回最小数据。
+    ### 返回:
+    - `application/x-ndjson` 流，每行为一个链接的结果：`index`、`input`、`ok`，成功时为 `value`（视频数据），失败时为 `error_type` 与 `error`。
+
+    # [English]
+    ### Purpose:
+    - Parse Douyin/TikTok/Bilibili videos in a batch under a concurrency limit, each link's result is streamed as one JSON line (NDJSON) as soon as it completes.
+    ### Parameters:
+    - `urls`: List of video links, share links or share texts, the per-request limit is Batch.max_urls in crawlers/hybrid/config.yaml.
+    - `minimal`: Whether to return minimal data.
+    ### Returns:
+    - An `application/x-ndjson` stream, one line per link: `index`, `input`, `ok`, plus `value` (video data) on success or `error_type` and `error` on failure.
+
+    # [Example]
+    urls = ["https://v.douyin.com/L4FJNR3/", "https://www.tiktok.com/@taylorswift/video/7359655005701311786"]
+    """
+    try:
+        results = await HybridCrawler.hybrid_parsing_batch(urls=urls, minimal=minimal)
+        # 流式响应不经过响应模型，字段投影在编码每一行时应用 (Streams bypass the response model, so fields are projected per line)
+        return StreamingResponse(BatchResolver.ndjson(results, fields=response_fields.get()),
+                                 media_type="application/x-ndjson")
+    except Exception as e:
+        status_code = 400
+        detail = ErrorResponseModel(code=status_code,
+                                    router=request.url.path,
+                                    params=dict(request.query_params),
+                                    )
+        raise HTTPException(status_code=status_code, detail=detail.dict())
+
 # 更新Cookie
 @router.post("/update_cookie",
              response_model=ResponseModel,
@@ -1,10 +1,12 @@
 from typing import List
 
 from fastapi import APIRouter, Query, Body, Request, HTTPException  # 导入FastAPI组件
+from fastapi.responses import StreamingResponse
 
 from app.api.models.APIResponseModel import ResponseModel, ErrorResponseModel  # 导入响应模型
 
 from crawlers.tiktok.web.web_crawler import TikTokWebCrawler  # 导入TikTokWebCrawler类
+from crawlers.utils.batch_resolver import BatchResolver  # 导入批量解析器
 
 router = APIRouter()
 TikTokWebCrawler = TikTokWebCrawler()
@@ -748,29 +750,34 @@ async def get_sec_user_id(request: Request,
 async def get_all_sec_user_id(request: Request,
                               url: List[str] = Body(
                                   example=["https://www.tiktok.com/@tiktok"],
-                                  description="用户主页链接/User homepage link")):
+                                  description="用户主页链接/User homepage link"),
+                              stream: bool = Query(False, description="以NDJSON流逐项返回/Stream per-item results as NDJSON")):
     """
     # [中文]
     ### 用途:
     - 提取列表用户id
     ### 参数:
     - url: 用户主页链接
+    - stream: 是否以NDJSON流按完成顺序逐项返回，默认为False
     ### 返回:
-    - 用户id
+    - 每个链接的解析结果列表，单个链接失败不影响其他结果（index、input、ok，成功时为value，失败时为error_type与error）
 
     # [English]
     ### Purpose:
     - Extract list user id
     ### Parameters:
     - url: User homepage link
+    - stream: Whether to stream per-item results as NDJSON in completion order, default is False
     ### Return:
-    - User id
+    - Per-link results, one failed link does not affect the others (index, input, ok, plus value on success or error_type and error on failure)
 
     # [示例/Example]
     url = ["https://www.tiktok.com/@tiktok"]
     """
     try:
-        data = await TikTokWebCrawler.get_all_sec_user_id(url)
+        data = await TikTokWebCrawler.get_all_sec_user_id(url, stream=stream)
+        if stream:
+            return StreamingResponse(BatchResolver.ndjson(data), media_type="application/x-ndjson")
         return ResponseModel(code=200,
                              router=request.url.path,
                              data=data)
@@ -832,29 +839,34 @@ async def get_aweme_id(request: Request,
 async def get_all_aweme_id(request: Request,
                            url: List[str] = Body(
                                example=["https://www.tiktok.com/@owlcitymusic/video/7218694761253735723"],
-                               description="作品链接/Video link")):
+                               description="作品链接/Video link"),
+                           stream: bool = Query(False, description="以NDJSON流逐项返回/Stream per-item results as NDJSON")):
     """
     # [中文]
     ### 用途:
     - 提取列表作品id
     ### 参数:
     - url: 作品链接
+    - stream: 是否以NDJSON流按完成顺序逐项返回，默认为False
     ### 返回:
-    - 作品id
+    - 每个链接的解析结果列表，单个链接失败不影响其他结果（index、input、ok，成功时为value，失败时为error_type与error）
 
     # [English]
     ### Purpose:
     - Extract list video id
     ### Parameters:
     - url: Video link
+    - stream: Whether to stream per-item results as NDJSON in completion order, default is False
     ### Return:
-    - Video id
+    - Per-link results, one failed link does not affect the others (index, input, ok, plus value on success or error_type and error on failure)
 
     # [示例/Example]
     url = ["https://www.tiktok.com/@owlcitymusic/video/7218694761253735723"]
     """
     try:
-        data = await TikTokWebCrawler.get_all_aweme_id(url)
+        data = await TikTokWebCrawler.get_all_aweme_id(url, stream=stream)
+        if stream:
+            return StreamingResponse(BatchResolver.ndjson(data), media_type="application/x-ndjson")
         return ResponseModel(code=200,
                              router=request.url.path,
                              data=data)
@@ -916,29 +928,34 @@ async def get_unique_id(request: Request,
 async def get_all_unique_id(request: Request,
                             url: List[str] = Body(
                                 example=["https://www.tiktok.com/@tiktok"],
-                                description="用户主页链接/User homepage link")):
+                                description="用户主页链接/User homepage link"),
+                            stream: bool = Query(False, description="以NDJSON流逐项返回/Stream per-item results as NDJSON")):
     """
     # [中文]
     ### 用途:
     - 获取列表unique_id
     ### 参数:
     - url: 用户主页链接
+    - stream: 是否以NDJSON流按完成顺序逐项返回，默认为False
     ### 返回:
-    - unique_id
+    - 每个链接的解析结果列表，单个链接失败不影响其他结果（index、input、ok，成功时为value，失败时为error_type与error）
 
     # [English]
     ### Purpose:
     - Get list unique_id
     ### Parameters:
     - url: User homepage link
+    - stream: Whether to stream per-item results as NDJSON in completion order, default is False
     ### Return:
-    - unique_id
+    - Per-link results, one failed link does not affect the others (index, input, ok, plus value on success or error_type and error on failure)
 
     # [示例/Example]
     url = ["https://www.tiktok.com/@tiktok"]
     """
     try:
-        data = await TikTokWebCrawler.get_all_unique_id(url)
+        data = await TikTokWebCrawler.get_all_unique_id(url, stream=stream)
+        if stream:
+            return StreamingResponse(BatchResolver.ndjson(data), media_type="application/x-ndjson")
         return ResponseModel(code=200,
                              router=request.url.path,
                              data=data)
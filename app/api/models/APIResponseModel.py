@@ -1,11 +1,33 @@
 from fastapi import Body, FastAPI, Query, Request, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Any, Callable, Type, Optional, Dict
 from functools import wraps
+from contextvars import ContextVar
 import datetime
 
+from crawlers.utils.utils import parse_fields, project_fields
+
 app = FastAPI()
 
+# 当前请求的字段投影树，由 fields 查询参数设置
+# Field projection tree of the current request, set from the fields query parameter
+response_fields: ContextVar[Optional[dict]] = ContextVar("response_fields", default=None)
+
+
+# 字段投影依赖，注册在路由上，所有接口都可以使用 fields 查询参数
+async def fields_projection(fields: Optional[str] = Query(
+        default=None,
+        description="只返回data中指定的字段，点路径以逗号分隔，如 author.nickname,statistics.digg_count"
+                    "/Only return these fields of data, comma-separated dotted paths, e.g. author.nickname,statistics.digg_count")):
+    # 必须是异步依赖，同步依赖在线程池中运行，设置的上下文变量不会传回接口
+    # Must be async, sync dependencies run in a threadpool and the context variable would not reach the endpoint
+    response_fields.set(parse_fields(fields) if fields else None)
+
+
+def _project_data(data: Any) -> Any:
+    tree = response_fields.get()
+    return project_fields(data, tree) if tree else data
+
 
 # 定义响应模型
 class ResponseModel(BaseModel):
@@ -13,6 +35,9 @@ class ResponseModel(BaseModel):
     router: str = "Endpoint path"
     data: Optional[Any] = {}
 
+    # 在序列化之前按 fields 裁剪数据 (Project data by fields before serialization)
+    _project = field_validator("data")(_project_data)
+
 
 # 定义错误响应模型
 class ErrorResponseModel(BaseModel):
@@ -30,6 +55,9 @@ class HybridResponseModel(BaseModel):
     router: str = "Hybrid parsing single video endpoint"
     data: Optional[Any] = {}
 
+    # 在序列化之前按 fields 裁剪数据 (Project data by fields before serialization)
+    _project = field_validator("data")(_project_data)
+
 
 # iOS_Shortcut响应模型
 class iOS_Shortcut(BaseModel):
@@ -1,29 +1,37 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from app.api.endpoints import (
     tiktok_web,
     tiktok_app,
     douyin_web,
     bilibili_web,
     hybrid_parsing, ios_shortcut, download,
+    crawler_status,
 )
+from app.api.models.APIResponseModel import fields_projection
+
+# 数据接口支持 fields 字段投影/Data endpoints support fields projection
+projection = [Depends(fields_projection)]
 
 router = APIRouter()
 
 # TikTok routers
-router.include_router(tiktok_web.router, prefix="/tiktok/web", tags=["TikTok-Web-API"])
-router.include_router(tiktok_app.router, prefix="/tiktok/app", tags=["TikTok-App-API"])
+router.include_router(tiktok_web.router, prefix="/tiktok/web", tags=["TikTok-Web-API"], dependencies=projection)
+router.include_router(tiktok_app.router, prefix="/tiktok/app", tags=["TikTok-App-API"], dependencies=projection)
 
 # Douyin routers
-router.include_router(douyin_web.router, prefix="/douyin/web", tags=["Douyin-Web-API"])
+router.include_router(douyin_web.router, prefix="/douyin/web", tags=["Douyin-Web-API"], dependencies=projection)
 
 # Bilibili routers
-router.include_router(bilibili_web.router, prefix="/bilibili/web", tags=["Bilibili-Web-API"])
+router.include_router(bilibili_web.router, prefix="/bilibili/web", tags=["Bilibili-Web-API"], dependencies=projection)
 
 # Hybrid routers
-router.include_router(hybrid_parsing.router, prefix="/hybrid", tags=["Hybrid-API"])
+router.include_router(hybrid_parsing.router, prefix="/hybrid", tags=["Hybrid-API"], dependencies=projection)
 
 # iOS_Shortcut routers
 router.include_router(ios_shortcut.router, prefix="/ios", tags=["iOS-Shortcut"])
 
 # Download routers
 router.include_router(download.router, tags=["Download"])
+
+# Status routers
+router.include_router(crawler_status.router, prefix="/status", tags=["Status"])
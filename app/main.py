@@ -35,15 +35,24 @@
 
 # FastAPI APP
 import uvicorn
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from app.api.router import router as api_router
 
+# Shared HTTP client pool
+from crawlers.utils.client_pool import ClientPool
+# Token pre-warming pool
+from crawlers.utils.token_pool import TokenPool
+# Request-scoped deadline
+from crawlers.utils.deadline import Deadline
+
 # PyWebIO APP
 from app.web.app import MainView
 from pywebio.platform.fastapi import asgi_app
 
 # OS
 import os
+import math
 
 # YAML
 import yaml
@@ -89,6 +98,10 @@ tags_metadata = [
         "name": "Download",
         "description": "**(下载数据接口/Download data endpoints)**",
     },
+    {
+        "name": "Status",
+        "description": "**(运行状态接口/Runtime status endpoints)**",
+    },
 ]
 
 version = config['API']['Version']
@@ -123,9 +136,27 @@ description = f"""
 - If you need a more stable and feature-rich API service, you can use the paid API service: [TikHub API](https://api.tikhub.io)
 """
 
+# 令牌持久化文件，重启后载入未过期的令牌
+token_store_path = config['API'].get('Token_Store_Path') if config['API'].get('Token_Store_Enable') else None
+
+# 每个API请求的默认时间预算，请求头 X-Request-Timeout 可覆盖
+request_timeout = config['API'].get('Request_Timeout')
+
 docs_url = config['API']['Docs_URL']
 redoc_url = config['API']['Redoc_URL']
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 启动时打开共享客户端池并开始预热令牌，关闭时停止预热并释放所有连接
+    # Open the shared client pool and start pre-warming tokens on startup, stop and release every connection on shutdown
+    await ClientPool.startup()
+    await TokenPool.start(token_store_path)
+    yield
+    await TokenPool.stop()
+    await ClientPool.shutdown()
+
+
 app = FastAPI(
     title="Douyin TikTok Download API",
     description=description,
@@ -133,8 +164,28 @@ app = FastAPI(
     openapi_tags=tags_metadata,
     docs_url=docs_url,  # 文档路径
     redoc_url=redoc_url,  # redoc文档路径
+    lifespan=lifespan,  # 应用生命周期
 )
 
+
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    # 为API请求设置截止时间，爬虫各层只使用剩余的时间预算
+    # Set the deadline of API requests, every crawler layer only uses the remaining time budget
+    if not request.url.path.startswith("/api"):
+        return await call_next(request)
+    budget = request_timeout
+    try:
+        requested = float(request.headers["X-Request-Timeout"])
+    except (KeyError, ValueError):
+        requested = None
+    # 请求头只能缩短配置的时间预算，忽略非有限正数 / The header can only shorten the configured budget, values that are not finite and positive are ignored
+    if requested is not None and math.isfinite(requested) and requested > 0:
+        budget = min(requested, budget) if budget else requested
+    with Deadline.scope(budget):
+        return await call_next(request)
+
+
 # API router
 app.include_router(api_router, prefix="/api")
 
@@ -33,15 +33,26 @@
 # ==============================================================================
 
 import httpx
-import json
+import time
 import asyncio
-import re
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlparse
 
 from httpx import Response
 
 from crawlers.utils.logger import logger
+from crawlers.utils import json_utils
+from crawlers.utils.client_pool import ClientPool, HTTP2_AVAILABLE
+from crawlers.utils.retry_policy import RetryPolicy
+from crawlers.utils.circuit_breaker import CircuitBreakerRegistry
+from crawlers.utils.rate_limiter import RateLimiter
+from crawlers.utils.proxy_pool import ProxyPool
+from crawlers.utils.cookie_pool import CookiePool
+from crawlers.utils.singleflight import SingleFlight
+from crawlers.utils.response_cache import ResponseCache
+from crawlers.utils.deadline import Deadline
+from crawlers.utils.hedge import Hedge
 from crawlers.utils.api_exceptions import (
-    APIError,
     APIConnectionError,
     APIResponseError,
     APITimeoutError,
@@ -58,6 +69,9 @@ class BaseCrawler:
     基础爬虫客户端 (Base crawler client)
     """
 
+    # 是否已提示 h2 未安装 / Whether the missing h2 warning has been shown
+    _http2_warned = False
+
     def __init__(
             self,
             proxies: dict = None,
@@ -66,6 +80,10 @@ class BaseCrawler:
             timeout: int = 10,
             max_tasks: int = 50,
             crawler_headers: dict = {},
+            http2: bool = False,
+            retry_policy: RetryPolicy = None,
+            platform: str = None,
+            rate_limiter=RateLimiter,
     ):
         if isinstance(proxies, dict):
             self.proxies = proxies
@@ -80,26 +98,145 @@ class BaseCrawler:
         self._max_tasks = max_tasks
         self.semaphore = asyncio.Semaphore(max_tasks)
 
+        # 平台名称与限流器，按 平台 + Cookie 限流 / Platform name and rate limiter, limited per platform and cookie
+        self.platform = platform
+        self.rate_limiter = rate_limiter
+        self._cookie = self.crawler_headers.get("Cookie") or self.crawler_headers.get("cookie")
+
         # 限制最大连接数 / Limit the maximum number of connections
         self._max_connections = max_connections
         self.limits = httpx.Limits(max_connections=max_connections)
 
-        # 业务逻辑重试次数 / Business logic retry count
+        # HTTP/2 多路复用，需要安装 h2 / HTTP/2 multiplexing, requires h2
+        if http2 and not HTTP2_AVAILABLE:
+            if not BaseCrawler._http2_warned:
+                logger.warning("未安装 h2，已回退到 HTTP/1.1 (h2 is not installed, falling back to HTTP/1.1)")
+                BaseCrawler._http2_warned = True
+            http2 = False
+        self.http2 = http2
+
+        # 业务逻辑重试次数与重试策略 / Business logic retry count and retry policy
         self._max_retries = max_retries
-        # 底层连接重试次数 / Underlying connection retry count
-        self.atransport = httpx.AsyncHTTPTransport(retries=max_retries)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=max_retries)
+        # 连接错误由重试策略统一退避重试，底层传输不再重复重试
+        # Connection errors are retried with backoff by the retry policy, so the transport does not retry again
+        self.atransport = httpx.AsyncHTTPTransport(retries=0, http2=http2, limits=self.limits)
 
         # 超时等待时间 / Timeout waiting time
         self._timeout = timeout
         self.timeout = httpx.Timeout(timeout)
-        # 异步客户端 / Asynchronous client
-        self.aclient = httpx.AsyncClient(
+        # 异步客户端，优先复用共享客户端池 / Asynchronous client, reuse the shared client pool when possible
+        self._client_key = ClientPool.make_key(
+            self.proxies or {}, self.crawler_headers, max_connections, max_retries, timeout, http2
+        )
+        self._owns_client = not ClientPool.is_active()
+        if self._owns_client:
+            self.aclient = self._create_client()
+        else:
+            self.aclient = ClientPool.get_client(self._client_key, self._create_client, self._client_label())
+        # Cookie 池中的 Cookie 可以互换，请求合并与响应缓存不区分它们
+        # Pooled cookies are interchangeable, so request coalescing and the response cache ignore them
+        self._shared_key = self._client_key
+        if CookiePool.contains(platform, self._cookie):
+            self._shared_key = ClientPool.make_key(
+                self.proxies or {}, {k: v for k, v in self.crawler_headers.items() if k.lower() != "cookie"},
+                max_connections, max_retries, timeout, http2
+            )
+        # 代理池中每个代理各自的客户端 / One client per proxy of the proxy pool
+        self._proxy_clients = {}
+
+    def _create_client(self, proxies: dict = None) -> httpx.AsyncClient:
+        """创建异步客户端 (Create the asynchronous client)"""
+        if proxies is None:
+            proxies, transport = self.proxies, self.atransport
+        else:
+            transport = httpx.AsyncHTTPTransport(retries=0, http2=self.http2, limits=self.limits)
+        client = httpx.AsyncClient(
             headers=self.crawler_headers,
-            proxies=self.proxies,
+            proxies=proxies,
             timeout=self.timeout,
             limits=self.limits,
-            transport=self.atransport,
+            transport=transport,
+            http2=self.http2,
+        )
+        # 共享客户端不保存响应设置的Cookie，避免在无关的请求、用户与池中Cookie之间传递
+        # Shared clients do not keep cookies set by responses, so they never leak across unrelated requests, users and pooled cookies
+        client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return client
+
+    def _client_for(self, proxy) -> tuple:
+        """
+        获取代理对应的客户端 (Get the client of a proxy)
+
+        Args:
+            proxy (ProxyState | None): 代理池选中的代理，为空时使用默认客户端 (Proxy from the pool, None uses the default client)
+
+        Returns:
+            tuple: (客户端, 客户端池键) ((client, client pool key))
+        """
+        if proxy is None:
+            return self.aclient, self._client_key
+
+        key = ClientPool.make_key(
+            proxy.proxies, self.crawler_headers, self._max_connections, self._max_retries, self._timeout, self.http2
         )
+        if not self._owns_client:
+            label = "{0} via {1}".format(self._client_label(), proxy.label)
+            return ClientPool.get_client(key, lambda: self._create_client(proxy.proxies), label), key
+
+        client = self._proxy_clients.get(proxy.url)
+        if client is None:
+            client = self._create_client(proxy.proxies)
+            self._proxy_clients[proxy.url] = client
+        return client, key
+
+    def _client_label(self) -> str:
+        """客户端名称，使用 Referer 的域名 (Client label, uses the host of the Referer header)"""
+        headers = {k.lower(): v for k, v in self.crawler_headers.items()}
+        host = urlparse(headers.get("referer") or headers.get("origin") or "").netloc or "default"
+        return "{0} ({1})".format(host, "HTTP/2" if self.http2 else "HTTP/1.1")
+
+    async def _request(self, method: str, url: str, **kwargs) -> Response:
+        """
+        发送请求并记录客户端指标 (Send a request and record client metrics)
+
+        Args:
+            method (str): 请求方法 (Request method)
+            url (str): 端点URL (Endpoint URL)
+            cookie (str): 本次请求换用的Cookie，默认使用请求头中的Cookie (Cookie used for this request instead of the one in the headers)
+
+        Returns:
+            Response: 原始响应对象 (Raw response object)
+        """
+        request_cookie = kwargs.pop("cookie", None) or self._cookie
+        if request_cookie != self._cookie:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), "Cookie": request_cookie}
+        await self.rate_limiter.acquire(self.platform, request_cookie)
+        # 单次请求的超时不超过剩余的请求预算 / A single request never outlives the remaining request budget
+        if Deadline.remaining() is not None:
+            kwargs["timeout"] = httpx.Timeout(Deadline.timeout(self._timeout))
+        # 从代理池按健康权重选择出口 / Pick the egress from the proxy pool by health weight
+        proxy = ProxyPool.choose(self.platform)
+        client, key = self._client_for(proxy)
+        with ClientPool.track(key), CookiePool.track(self.platform, request_cookie) as cookie:
+            start = time.monotonic()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.RequestError:
+                if proxy is not None:
+                    proxy.record(time.monotonic() - start, ok=False)
+                raise
+            # 429 与空响应通常意味着该出口或账号被限流 / 429 and empty bodies usually mean this egress or account is throttled
+            throttled = response.status_code == 429 or (method != "HEAD" and not response.content.strip())
+            elapsed = time.monotonic() - start
+            if proxy is not None:
+                proxy.record(elapsed, ok=not throttled)
+            # 对冲延迟只统计上游耗时，不含限流排队 / Hedging delays only count time on the wire, not rate-limiter queueing
+            if method == "GET" and not throttled:
+                Hedge.observe(self.platform, elapsed)
+            if cookie is not None and throttled:
+                CookiePool.record_failure(self.platform, cookie)
+            return response
 
     async def fetch_response(self, endpoint: str) -> Response:
         """获取数据 (Get data)
@@ -121,8 +258,22 @@ class BaseCrawler:
         Returns:
             dict: 解析后的JSON数据 (Parsed JSON data)
         """
+        key = ("GET", SingleFlight.canonical_url(endpoint), self._shared_key)
+
+        # 优先读取响应缓存 / Serve from the response cache first
+        data = ResponseCache.get(key)
+        if data is not None:
+            return data
+
+        # 合并并发的相同请求 / Coalesce concurrent identical requests
+        return await SingleFlight.do(key, self._fetch_get_json, endpoint, key)
+
+    async def _fetch_get_json(self, endpoint: str, key: tuple = None) -> dict:
         response = await self.get_fetch_data(endpoint)
-        return self.parse_json(response)
+        data = self.parse_json(response)
+        if key is not None:
+            ResponseCache.set(key, endpoint, data, len(response.content))
+        return data
 
     async def fetch_post_json(self, endpoint: str, params: dict = {}, data=None) -> dict:
         """获取 JSON 数据 (Post JSON data)
@@ -133,6 +284,12 @@ class BaseCrawler:
         Returns:
             dict: 解析后的JSON数据 (Parsed JSON data)
         """
+        # 合并并发的相同请求 / Coalesce concurrent identical requests
+        key = ("POST", SingleFlight.canonical_url(endpoint), ClientPool.make_key(params or {}), repr(data),
+               self._shared_key)
+        return await SingleFlight.do(key, self._fetch_post_json, endpoint, params, data)
+
+    async def _fetch_post_json(self, endpoint: str, params: dict = {}, data=None) -> dict:
         response = await self.post_fetch_data(endpoint, params, data)
         return self.parse_json(response)
 
@@ -151,15 +308,15 @@ class BaseCrawler:
                 and response.status_code == 200
         ):
             try:
-                return response.json()
-            except json.JSONDecodeError as e:
-                # 尝试使用正则表达式匹配response.text中的json数据
-                match = re.search(r"\{.*\}", response.text)
-                try:
-                    return json.loads(match.group())
-                except json.JSONDecodeError as e:
-                    logger.error("解析 {0} 接口 JSON 失败： {1}".format(response.url, e))
+                # 直接解析原始字节，省去文本解码 (Decode the raw bytes directly, skipping text decoding)
+                return json_utils.loads(response.content)
+            except json_utils.JSONDecodeError:
+                # 从response.text中截取第一个完整的json对象 (Extract the first complete JSON object from response.text)
+                data = json_utils.find_json_object(response.text)
+                if data is None:
+                    logger.error("解析 {0} 接口 JSON 失败".format(response.url))
                     raise APIResponseError("解析JSON数据失败")
+                return data
 
         else:
             if isinstance(response, Response):
@@ -181,38 +338,27 @@ class BaseCrawler:
         Returns:
             response: 响应内容 (Response content)
         """
-        for attempt in range(self._max_retries):
-            try:
-                response = await self.aclient.get(url, follow_redirects=True)
-                if not response.text.strip() or not response.content:
-                    error_message = "第 {0} 次响应内容为空, 状态码: {1}, URL:{2}".format(attempt + 1,
-                                                                                         response.status_code,
-                                                                                         response.url)
-
-                    logger.warning(error_message)
-
-                    if attempt == self._max_retries - 1:
-                        raise APIRetryExhaustedError(
-                            "获取端点数据失败, 次数达到上限"
-                        )
-
-                    await asyncio.sleep(self._timeout)
-                    continue
-
-                # logger.info("响应状态码: {0}".format(response.status_code))
-                response.raise_for_status()
-                return response
-
-            except httpx.RequestError:
-                raise APIConnectionError("连接端点失败，检查网络环境或代理：{0} 代理：{1} 类名：{2}"
-                                         .format(url, self.proxies, self.__class__.__name__)
-                                         )
-
-            except httpx.HTTPStatusError as http_error:
-                self.handle_http_status_error(http_error, url, attempt + 1)
-
-            except APIError as e:
-                e.display_error()
+        settings = Hedge.settings(self.platform)
+        if settings is None:
+            return await self._fetch_with_retry("GET", url, follow_redirects=True)
+
+        async def duplicate():
+            # 重复请求重新选择代理，并可从Cookie池换用其他Cookie
+            # The duplicate picks its proxy again and may take another cookie from the cookie pool
+            cookie = CookiePool.choose(self.platform) if settings["switch_cookie"] else None
+            if cookie is not None and cookie == self._cookie:
+                cookie = CookiePool.choose(self.platform)
+            return await self._fetch_with_retry("GET", url, follow_redirects=True, cookie=cookie)
+
+        # 慢于近期上游耗时分位数时发起重复请求，取先返回者 / Fire a duplicate once slower than the recent upstream latency percentile, the first reply wins
+        return await Hedge.race(
+            self.platform,
+            lambda: self._fetch_with_retry("GET", url, follow_redirects=True),
+            duplicate,
+            Hedge.delay(self.platform),
+            valid=None,
+            fire_on_error=False,
+        )
 
     async def post_fetch_data(self, url: str, params: dict = {}, data=None):
         """
@@ -225,44 +371,13 @@ class BaseCrawler:
         Returns:
             response: 响应内容 (Response content)
         """
-        for attempt in range(self._max_retries):
-            try:
-                response = await self.aclient.post(
-                    url,
-                    json=None if not params else dict(params),
-                    data=None if not data else data,
-                    follow_redirects=True
-                )
-                if not response.text.strip() or not response.content:
-                    error_message = "第 {0} 次响应内容为空, 状态码: {1}, URL:{2}".format(attempt + 1,
-                                                                                         response.status_code,
-                                                                                         response.url)
-
-                    logger.warning(error_message)
-
-                    if attempt == self._max_retries - 1:
-                        raise APIRetryExhaustedError(
-                            "获取端点数据失败, 次数达到上限"
-                        )
-
-                    await asyncio.sleep(self._timeout)
-                    continue
-
-                # logger.info("响应状态码: {0}".format(response.status_code))
-                response.raise_for_status()
-                return response
-
-            except httpx.RequestError:
-                raise APIConnectionError(
-                    "连接端点失败，检查网络环境或代理：{0} 代理：{1} 类名：{2}".format(url, self.proxies,
-                                                                                   self.__class__.__name__)
-                )
-
-            except httpx.HTTPStatusError as http_error:
-                self.handle_http_status_error(http_error, url, attempt + 1)
-
-            except APIError as e:
-                e.display_error()
+        return await self._fetch_with_retry(
+            "POST",
+            url,
+            json=None if not params else dict(params),
+            data=None if not data else data,
+            follow_redirects=True
+        )
 
     async def head_fetch_data(self, url: str):
         """
@@ -274,23 +389,85 @@ class BaseCrawler:
         Returns:
             response: 响应内容 (Response content)
         """
-        try:
-            response = await self.aclient.head(url)
-            # logger.info("响应状态码: {0}".format(response.status_code))
-            response.raise_for_status()
-            return response
+        return await self._fetch_with_retry("HEAD", url)
 
-        except httpx.RequestError:
-            raise APIConnectionError("连接端点失败，检查网络环境或代理：{0} 代理：{1} 类名：{2}".format(
-                url, self.proxies, self.__class__.__name__
-            )
-            )
+    async def _fetch_with_retry(self, method: str, url: str, **kwargs) -> Response:
+        """
+        按重试策略发送请求 (Send a request following the retry policy)
+
+        Args:
+            method (str): 请求方法 (Request method)
+            url (str): 端点URL (Endpoint URL)
+
+        Returns:
+            Response: 原始响应对象 (Raw response object)
+
+        Raises:
+            APIConnectionError: 连接端点失败 (Failed to connect to endpoint)
+            APIUnavailableError: 上游熔断中 (Upstream circuit is open)
+            APIRetryExhaustedError: 重试次数达到上限 (The number of retries has reached the upper limit)
+            APITimeoutError: 超过请求截止时间 (Exceeded the request deadline)
+        """
+        policy = self.retry_policy
+        breaker = CircuitBreakerRegistry.get(url, self.platform)
+        for attempt in range(policy.max_retries):
+            last_attempt = attempt == policy.max_retries - 1
+
+            # 熔断打开时快速失败 / Fail fast while the circuit is open
+            if not breaker.allow_request():
+                raise APIUnavailableError("上游服务熔断中，请稍后重试：{0} 类名：{1}"
+                                          .format(breaker.host, self.__class__.__name__)
+                                          )
 
-        except httpx.HTTPStatusError as http_error:
-            self.handle_http_status_error(http_error, url, 1)
+            try:
+                response = await self._request(method, url, **kwargs)
+            except httpx.RequestError as exc:
+                breaker.record_failure()
+                Deadline.check(url)
+                if last_attempt or not policy.is_retryable_exception(exc):
+                    raise APIConnectionError("连接端点失败，检查网络环境或代理：{0} 代理：{1} 类名：{2}"
+                                             .format(url, self.proxies, self.__class__.__name__)
+                                             )
+                delay = policy.compute_delay(attempt)
+                logger.warning("第 {0} 次请求失败: {1}, {2:.2f} 秒后重试, URL:{3}".format(
+                    attempt + 1, exc.__class__.__name__, delay, url
+                ))
+                await Deadline.sleep(delay)
+                continue
+
+            # HEAD 请求没有响应体 / HEAD responses have no body
+            if method != "HEAD" and not response.content.strip():
+                breaker.record_failure()
+                if last_attempt:
+                    raise APIRetryExhaustedError(
+                        "获取端点数据失败, 次数达到上限"
+                    )
+                delay = policy.compute_delay(attempt, response)
+                logger.warning("第 {0} 次响应内容为空, 状态码: {1}, {2:.2f} 秒后重试, URL:{3}".format(
+                    attempt + 1, response.status_code, delay, response.url
+                ))
+                await Deadline.sleep(delay)
+                continue
+
+            # 429 与 5xx 视为上游故障 / 429 and 5xx count as upstream failures
+            if response.status_code == 429 or response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
 
-        except APIError as e:
-            e.display_error()
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as http_error:
+                if not last_attempt and policy.is_retryable_status(response.status_code):
+                    delay = policy.compute_delay(attempt, response)
+                    logger.warning("第 {0} 次响应状态码: {1}, {2:.2f} 秒后重试, URL:{3}".format(
+                        attempt + 1, response.status_code, delay, url
+                    ))
+                    await Deadline.sleep(delay)
+                    continue
+                self.handle_http_status_error(http_error, url, attempt + 1)
+
+            return response
 
     def handle_http_status_error(self, http_error, url: str, attempt):
         """
@@ -340,10 +517,14 @@ class BaseCrawler:
             raise APIResponseError(f"HTTP状态错误: {status_code}")
 
     async def close(self):
-        await self.aclient.aclose()
+        # 共享客户端由客户端池统一关闭 / Shared clients are closed by the client pool
+        if self._owns_client:
+            await self.aclient.aclose()
+            for client in self._proxy_clients.values():
+                await client.aclose()
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.aclient.aclose()
+        await self.close()
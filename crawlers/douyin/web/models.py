@@ -2,6 +2,7 @@ from typing import Any, List
 from pydantic import BaseModel, Field
 
 from crawlers.douyin.web.utils import TokenManager, VerifyFpManager
+from crawlers.utils.token_pool import TokenPool
 
 
 # Base Model
@@ -39,7 +40,7 @@ class BaseRequestModel(BaseModel):
     time_list_query: str = "0"
     whale_cut_token: str = ""
     update_version_code: str = "170400"
-    msToken: str = TokenManager.gen_real_msToken()
+    msToken: str = Field(default_factory=TokenPool.factory("douyin", "msToken", TokenManager.gen_false_msToken))
 
 
 class BaseLiveModel(BaseModel):
@@ -68,7 +69,7 @@ class BaseLiveModel2(BaseModel):
     sec_user_id: str = ""
     version_code: str = "99.99.99"
     app_id: str = "1128"
-    msToken: str = TokenManager.gen_real_msToken()
+    msToken: str = Field(default_factory=TokenPool.factory("douyin", "msToken", TokenManager.gen_false_msToken))
 
 
 class BaseLoginModel(BaseModel):
@@ -31,13 +31,13 @@
 # - https://github.com/Johnserf-Seed
 #
 # ==============================================================================
-import asyncio
 import json
 import os
 import random
 import re
 import time
 import urllib
+from http.cookiejar import DefaultCookiePolicy
 from pathlib import Path
 from typing import Union
 from urllib.parse import urlencode, quote
@@ -59,6 +59,13 @@ from crawlers.utils.api_exceptions import (
     APINotFoundError,
 )
 from crawlers.utils.logger import logger
+from crawlers.utils.client_pool import ClientPool
+from crawlers.utils.token_pool import TokenPool
+from crawlers.utils.link_cache import LinkCache
+from crawlers.utils.redirect_resolver import RedirectResolver
+from crawlers.utils.id_extractor import IdExtractor
+from crawlers.utils.batch_resolver import BatchResolver
+from crawlers.utils.deadline import Deadline
 from crawlers.utils.utils import (
     gen_random_str,
     get_timestamp,
@@ -86,12 +93,28 @@ class TokenManager:
     }
 
     @classmethod
-    def gen_real_msToken(cls) -> str:
+    def _aclient(cls, proxies: dict = None):
         """
-        生成真实的msToken,当出现错误时返回虚假的值
-        (Generate a real msToken and return a false value when an error occurs)
+        令牌请求使用的异步客户端，优先复用共享客户端池
+        (Asynchronous client for token requests, reusing the shared client pool when possible)
         """
+        return ClientPool.borrow(
+            ClientPool.make_key("douyin_token", proxies or {}),
+            lambda: cls._create_aclient(proxies),
+            "douyin token",
+        )
 
+    @classmethod
+    def _create_aclient(cls, proxies: dict = None) -> httpx.AsyncClient:
+        client = httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(retries=5), proxies=proxies, timeout=10)
+        # 每次生成令牌都应是全新的会话，不保存响应设置的Cookie
+        # Every token generation should be a fresh session, so cookies set by responses are not kept
+        client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return client
+
+    @classmethod
+    def _msToken_request(cls) -> dict:
+        """msToken 请求参数 (msToken request arguments)"""
         payload = json.dumps(
             {
                 "magic": cls.token_conf["magic"],
@@ -105,56 +128,89 @@ class TokenManager:
             "User-Agent": cls.token_conf["User-Agent"],
             "Content-Type": "application/json",
         }
+        return {"url": cls.token_conf["url"], "content": payload, "headers": headers}
+
+    @classmethod
+    def _parse_msToken(cls, response: httpx.Response) -> str:
+        response.raise_for_status()
+
+        msToken = str(httpx.Cookies(response.cookies).get("msToken"))
+        if len(msToken) not in [120, 128]:
+            raise APIResponseError("响应内容：{0}， Douyin msToken API 的响应内容不符合要求。".format(msToken))
+
+        return msToken
+
+    @classmethod
+    def _msToken_fallback(cls, e: Exception) -> str:
+        # 返回虚假的msToken (Return a fake msToken)
+        logger.error("请求Douyin msToken API时发生错误：{0}".format(e))
+        logger.info("将使用本地生成的虚假msToken参数，以继续请求。")
+        return cls.gen_false_msToken()
+
+    @classmethod
+    def gen_real_msToken(cls) -> str:
+        """
+        生成真实的msToken,当出现错误时返回虚假的值
+        (Generate a real msToken and return a false value when an error occurs)
+        """
 
         transport = httpx.HTTPTransport(retries=5)
         with httpx.Client(transport=transport, proxies=cls.proxies) as client:
             try:
-                response = client.post(
-                    cls.token_conf["url"], content=payload, headers=headers
-                )
-                response.raise_for_status()
+                response = client.post(**cls._msToken_request())
+                return cls._parse_msToken(response)
 
-                msToken = str(httpx.Cookies(response.cookies).get("msToken"))
-                if len(msToken) not in [120, 128]:
-                    raise APIResponseError("响应内容：{0}， Douyin msToken API 的响应内容不符合要求。".format(msToken))
-
-                return msToken
-
-            # except httpx.RequestError as exc:
-            #     # 捕获所有与 httpx 请求相关的异常情况 (Captures all httpx request-related exceptions)
-            #     raise APIConnectionError(
-            #         "请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
-            #         .format(cls.token_conf["url"], cls.proxies, cls.__name__, exc)
-            #     )
-            #
-            # except httpx.HTTPStatusError as e:
-            #     # 捕获 httpx 的状态代码错误 (captures specific status code errors from httpx)
-            #     if e.response.status_code == 401:
-            #         raise APIUnauthorizedError(
-            #             "参数验证失败，请更新 Douyin_TikTok_Download_API 配置文件中的 {0}，以匹配 {1} 新规则"
-            #             .format("msToken", "douyin")
-            #         )
-            #
-            #     elif e.response.status_code == 404:
-            #         raise APINotFoundError("{0} 无法找到API端点".format("msToken"))
-            #     else:
-            #         raise APIResponseError(
-            #             "链接：{0}，状态码 {1}：{2} ".format(
-            #                 e.response.url, e.response.status_code, e.response.text
-            #             )
-            #         )
+            except Exception as e:
+                return cls._msToken_fallback(e)
+
+    @classmethod
+    async def agen_real_msToken(cls, fallback: bool = True) -> str:
+        """
+        异步生成真实的msToken,当出现错误时返回虚假的值，不阻塞事件循环
+        (Asynchronously generate a real msToken without blocking the event loop, return a false value on error)
+
+        Args:
+            fallback (bool): 出错时是否返回虚假的值，否则抛出异常 (Return a false value on error instead of raising)
+        """
+        async with cls._aclient(cls.proxies) as client:
+            try:
+                response = await client.post(**cls._msToken_request(), timeout=Deadline.timeout(10))
+                return cls._parse_msToken(response)
 
             except Exception as e:
-                # 返回虚假的msToken (Return a fake msToken)
-                logger.error("请求Douyin msToken API时发生错误：{0}".format(e))
-                logger.info("将使用本地生成的虚假msToken参数，以继续请求。")
-                return cls.gen_false_msToken()
+                if not fallback:
+                    raise
+                return cls._msToken_fallback(e)
 
     @classmethod
     def gen_false_msToken(cls) -> str:
         """生成随机msToken (Generate random msToken)"""
         return gen_random_str(126) + "=="
 
+    @classmethod
+    def _raise_ttwid_error(cls, exc: Exception):
+        if isinstance(exc, httpx.RequestError):
+            # 捕获所有与 httpx 请求相关的异常情况 (Captures all httpx request-related exceptions)
+            raise APIConnectionError(
+                "请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
+                .format(cls.ttwid_conf["url"], cls.proxies, cls.__name__, exc)
+            )
+
+        # 捕获 httpx 的状态代码错误 (captures specific status code errors from httpx)
+        if exc.response.status_code == 401:
+            raise APIUnauthorizedError(
+                "参数验证失败，请更新 Douyin_TikTok_Download_API 配置文件中的 {0}，以匹配 {1} 新规则"
+                .format("ttwid", "douyin")
+            )
+
+        elif exc.response.status_code == 404:
+            raise APINotFoundError("ttwid无法找到API端点")
+        else:
+            raise APIResponseError("链接：{0}，状态码 {1}：{2} ".format(
+                exc.response.url, exc.response.status_code, exc.response.text
+            )
+            )
+
     @classmethod
     def gen_ttwid(cls) -> str:
         """
@@ -173,28 +229,36 @@ class TokenManager:
                 ttwid = str(httpx.Cookies(response.cookies).get("ttwid"))
                 return ttwid
 
-            except httpx.RequestError as exc:
-                # 捕获所有与 httpx 请求相关的异常情况 (Captures all httpx request-related exceptions)
-                raise APIConnectionError(
-                    "请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
-                    .format(cls.ttwid_conf["url"], cls.proxies, cls.__name__, exc)
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                cls._raise_ttwid_error(exc)
+
+    @classmethod
+    async def agen_ttwid(cls) -> str:
+        """
+        异步生成请求必带的ttwid，不阻塞事件循环
+        (Asynchronously generate the essential ttwid for requests without blocking the event loop)
+        """
+        async with cls._aclient() as client:
+            try:
+                response = await client.post(
+                    cls.ttwid_conf["url"], content=cls.ttwid_conf["data"], timeout=Deadline.timeout(10)
                 )
+                response.raise_for_status()
 
-            except httpx.HTTPStatusError as e:
-                # 捕获 httpx 的状态代码错误 (captures specific status code errors from httpx)
-                if e.response.status_code == 401:
-                    raise APIUnauthorizedError(
-                        "参数验证失败，请更新 Douyin_TikTok_Download_API 配置文件中的 {0}，以匹配 {1} 新规则"
-                        .format("ttwid", "douyin")
-                    )
+                ttwid = httpx.Cookies(response.cookies).get("ttwid")
+                if ttwid is None:
+                    raise APIResponseError("{0} 内容不符合要求".format("ttwid"))
 
-                elif e.response.status_code == 404:
-                    raise APINotFoundError("ttwid无法找到API端点")
-                else:
-                    raise APIResponseError("链接：{0}，状态码 {1}：{2} ".format(
-                        e.response.url, e.response.status_code, e.response.text
-                    )
-                    )
+                return ttwid
+
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                cls._raise_ttwid_error(exc)
+
+
+
+# 注册令牌预热，由应用生命周期中的后台任务补充 (Register token pre-warming, refilled by the background task of the app lifespan)
+TokenPool.register("douyin", "msToken", lambda: TokenManager.agen_real_msToken(fallback=False),
+                   **TokenManager.douyin_manager.get("token_pool") or {})
 
 
 class VerifyFpManager:
@@ -309,8 +373,39 @@ class SecUserIdFetcher:
     _DOUYIN_URL_PATTERN = re.compile(r"user/([^/?]*)")
     _REDIRECT_URL_PATTERN = re.compile(r"sec_uid=([^&]*)")
 
+    @classmethod
+    def extract_sec_user_id(cls, url: str):
+        """
+        不请求网络，直接从用户主页链接中提取sec_user_id (Extract sec_user_id from a profile link without any request)
+
+        Args:
+            url (str): 输入的url (Input url)
+
+        Returns:
+            str: 匹配到的sec_user_id，无法离线提取时返回 None (Matched sec_user_id, None when it cannot be extracted offline)
+        """
+        return IdExtractor.extract(
+            url, [cls._DOUYIN_URL_PATTERN, cls._REDIRECT_URL_PATTERN], ("douyin.com", "iesdouyin.com"),
+            lambda value: value.startswith("MS4w")
+        )
+
     @classmethod
     async def get_sec_user_id(cls, url: str) -> str:
+        """
+        从单个url中获取sec_user_id，结果按规范化链接缓存 (Get sec_user_id from a single url, cached by normalized link)
+
+        Args:
+            url (str): 输入的url (Input url)
+
+        Returns:
+            str: 匹配到的sec_user_id (Matched sec_user_id)
+        """
+        return cls.extract_sec_user_id(url) or await LinkCache.resolve(
+            "douyin:sec_user_id", url, cls._resolve_sec_user_id
+        )
+
+    @classmethod
+    async def _resolve_sec_user_id(cls, url: str) -> str:
         """
         从单个url中获取sec_user_id (Get sec_user_id from a single url)
 
@@ -339,36 +434,31 @@ class SecUserIdFetcher:
         )
 
         try:
-            transport = httpx.AsyncHTTPTransport(retries=5)
-            async with httpx.AsyncClient(
-                    transport=transport, proxies=TokenManager.proxies, timeout=10
-            ) as client:
-                response = await client.get(url, follow_redirects=True)
-                # 444一般为Nginx拦截，不返回状态 (444 is generally intercepted by Nginx and does not return status)
-                if response.status_code in {200, 444}:
-                    match = pattern.search(str(response.url))
-                    if match:
-                        return match.group(1)
-                    else:
-                        raise APIResponseError(
-                            "未在响应的地址中找到sec_user_id，检查链接是否为用户主页类名：{0}"
-                            .format(cls.__name__)
-                        )
-
-                elif response.status_code == 401:
-                    raise APIUnauthorizedError("未授权的请求。类名：{0}".format(cls.__name__)
-                                               )
-                elif response.status_code == 404:
-                    raise APINotFoundError("未找到API端点。类名：{0}".format(cls.__name__)
+            # 只跟随重定向的 Location，匹配到 sec_user_id 即停止 (Only follow Location headers, stop once sec_user_id matches)
+            sec_user_id, response = await RedirectResolver.resolve(url, [pattern], proxies=TokenManager.proxies)
+            if sec_user_id:
+                return sec_user_id
+
+            # 444一般为Nginx拦截，不返回状态 (444 is generally intercepted by Nginx and does not return status)
+            if response.status_code in {200, 444}:
+                raise APIResponseError(
+                    "未在响应的地址中找到sec_user_id，检查链接是否为用户主页类名：{0}"
+                    .format(cls.__name__)
+                )
+            elif response.status_code == 401:
+                raise APIUnauthorizedError("未授权的请求。类名：{0}".format(cls.__name__)
                                            )
-                elif response.status_code == 503:
-                    raise APIUnavailableError("API服务不可用。类名：{0}".format(cls.__name__)
-                                              )
-                else:
-                    raise APIResponseError("链接：{0}，状态码 {1}：{2} ".format(
-                        response.url, response.status_code, response.text
-                    )
-                    )
+            elif response.status_code == 404:
+                raise APINotFoundError("未找到API端点。类名：{0}".format(cls.__name__)
+                                       )
+            elif response.status_code == 503:
+                raise APIUnavailableError("API服务不可用。类名：{0}".format(cls.__name__)
+                                          )
+            else:
+                raise APIResponseError("链接：{0}，状态码 {1}：{2} ".format(
+                    response.url, response.status_code, response.text
+                )
+                )
 
         except httpx.RequestError as exc:
             raise APIConnectionError("请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
@@ -376,15 +466,16 @@ class SecUserIdFetcher:
                                      )
 
     @classmethod
-    async def get_all_sec_user_id(cls, urls: list) -> list:
+    async def get_all_sec_user_id(cls, urls: list, stream: bool = False):
         """
         获取列表sec_user_id列表 (Get list sec_user_id list)
 
         Args:
             urls: list: 用户url列表 (User url list)
+            stream: bool: 是否返回按完成顺序产出结果的异步迭代器 (Return an async iterator yielding results in completion order)
 
         Return:
-            sec_user_ids: list: 用户sec_user_id列表 (User sec_user_id list)
+            results: list: 每个链接的解析结果，成功时 value 为ID，失败时包含 error_type 与 error (Per-link results, value holds the id on success, error_type and error on failure)
         """
 
         if not isinstance(urls, list):
@@ -399,8 +490,11 @@ class SecUserIdFetcher:
                                  )
             )
 
-        sec_user_ids = [cls.get_sec_user_id(url) for url in urls]
-        return await asyncio.gather(*sec_user_ids)
+        # 有并发上限地逐项解析，单项失败不影响其他结果 (Resolve item by item under a concurrency limit, one failure does not affect the others)
+        batch_conf = TokenManager.douyin_manager.get("batch") or {}
+        if stream:
+            return BatchResolver.iterate(urls, cls.get_sec_user_id, **batch_conf)
+        return await BatchResolver.resolve(urls, cls.get_sec_user_id, **batch_conf)
 
 
 class AwemeIdFetcher:
@@ -409,9 +503,42 @@ class AwemeIdFetcher:
     _DOUYIN_VIDEO_URL_PATTERN_NEW = re.compile(r"[?&]vid=(\d+)")
     _DOUYIN_NOTE_URL_PATTERN = re.compile(r"note/([^/?]*)")
     _DOUYIN_DISCOVER_URL_PATTERN = re.compile(r"modal_id=([0-9]+)")
+    # 按顺序尝试匹配的作品ID正则
+    _AWEME_ID_PATTERNS = [
+        _DOUYIN_VIDEO_URL_PATTERN,
+        _DOUYIN_VIDEO_URL_PATTERN_NEW,
+        _DOUYIN_NOTE_URL_PATTERN,
+        _DOUYIN_DISCOVER_URL_PATTERN
+    ]
+
+    @classmethod
+    def extract_aweme_id(cls, url: str):
+        """
+        不请求网络，直接从作品链接中提取aweme_id (Extract aweme_id from a post link without any request)
+
+        Args:
+            url (str): 输入的url (Input url)
+
+        Returns:
+            str: 匹配到的aweme_id，无法离线提取时返回 None (Matched aweme_id, None when it cannot be extracted offline)
+        """
+        return IdExtractor.extract(url, cls._AWEME_ID_PATTERNS, ("douyin.com", "iesdouyin.com"), str.isdigit)
 
     @classmethod
     async def get_aweme_id(cls, url: str) -> str:
+        """
+        从单个url中获取aweme_id，结果按规范化链接缓存 (Get aweme_id from a single url, cached by normalized link)
+
+        Args:
+            url (str): 输入的url (Input url)
+
+        Returns:
+            str: 匹配到的aweme_id (Matched aweme_id)
+        """
+        return cls.extract_aweme_id(url) or await LinkCache.resolve("douyin:aweme_id", url, cls._resolve_aweme_id)
+
+    @classmethod
+    async def _resolve_aweme_id(cls, url: str) -> str:
         """
         从单个url中获取aweme_id (Get aweme_id from a single url)
 
@@ -425,50 +552,36 @@ class AwemeIdFetcher:
         if not isinstance(url, str):
             raise TypeError("参数必须是字符串类型")
 
-        # 重定向到完整链接
-        transport = httpx.AsyncHTTPTransport(retries=5)
-        async with httpx.AsyncClient(
-                transport=transport, proxy=None, timeout=10
-        ) as client:
-            try:
-                response = await client.get(url, follow_redirects=True)
-                response.raise_for_status()
-
-                response_url = str(response.url)
-
-                # 按顺序尝试匹配视频ID
-                for pattern in [
-                    cls._DOUYIN_VIDEO_URL_PATTERN,
-                    cls._DOUYIN_VIDEO_URL_PATTERN_NEW,
-                    cls._DOUYIN_NOTE_URL_PATTERN,
-                    cls._DOUYIN_DISCOVER_URL_PATTERN
-                ]:
-                    match = pattern.search(response_url)
-                    if match:
-                        return match.group(1)
+        # 只跟随重定向的 Location，按顺序尝试匹配视频ID，匹配到即停止，不下载落地页
+        # Only follow Location headers and try the video id patterns in order, stop on the first match without downloading the landing page
+        try:
+            aweme_id, response = await RedirectResolver.resolve(url, cls._AWEME_ID_PATTERNS)
+        except httpx.RequestError as exc:
+            raise APIConnectionError(
+                f"请求端点失败，请检查当前网络环境。链接：{url}，代理：{TokenManager.proxies}，异常类名：{cls.__name__}，异常详细信息：{exc}"
+            )
 
-                raise APIResponseError("未在响应的地址中找到 aweme_id，检查链接是否为作品页")
+        if aweme_id:
+            return aweme_id
 
-            except httpx.RequestError as exc:
-                raise APIConnectionError(
-                    f"请求端点失败，请检查当前网络环境。链接：{url}，代理：{TokenManager.proxies}，异常类名：{cls.__name__}，异常详细信息：{exc}"
-                )
+        if response.status_code >= 400:
+            raise APIResponseError(
+                f"链接：{response.url}，状态码 {response.status_code}：{response.text}"
+            )
 
-            except httpx.HTTPStatusError as e:
-                raise APIResponseError(
-                    f"链接：{e.response.url}，状态码 {e.response.status_code}：{e.response.text}"
-                )
+        raise APIResponseError("未在响应的地址中找到 aweme_id，检查链接是否为作品页")
 
     @classmethod
-    async def get_all_aweme_id(cls, urls: list) -> list:
+    async def get_all_aweme_id(cls, urls: list, stream: bool = False):
         """
         获取视频aweme_id,传入列表url都可以解析出aweme_id (Get video aweme_id, pass in the list url can parse out aweme_id)
 
         Args:
             urls: list: 列表url (list url)
+            stream: bool: 是否返回按完成顺序产出结果的异步迭代器 (Return an async iterator yielding results in completion order)
 
         Return:
-            aweme_ids: list: 视频的唯一标识，返回列表 (The unique identifier of the video, return list)
+            results: list: 每个链接的解析结果，成功时 value 为ID，失败时包含 error_type 与 error (Per-link results, value holds the id on success, error_type and error on failure)
         """
 
         if not isinstance(urls, list):
@@ -483,8 +596,11 @@ class AwemeIdFetcher:
                                  )
             )
 
-        aweme_ids = [cls.get_aweme_id(url) for url in urls]
-        return await asyncio.gather(*aweme_ids)
+        # 有并发上限地逐项解析，单项失败不影响其他结果 (Resolve item by item under a concurrency limit, one failure does not affect the others)
+        batch_conf = TokenManager.douyin_manager.get("batch") or {}
+        if stream:
+            return BatchResolver.iterate(urls, cls.get_aweme_id, **batch_conf)
+        return await BatchResolver.resolve(urls, cls.get_aweme_id, **batch_conf)
 
 
 class MixIdFetcher:
@@ -529,9 +645,9 @@ class WebCastIdFetcher:
             # 重定向到完整链接
             transport = httpx.AsyncHTTPTransport(retries=5)
             async with httpx.AsyncClient(
-                    transport=transport, proxies=TokenManager.proxies, timeout=10
+                    transport=transport, proxies=TokenManager.proxies, timeout=Deadline.timeout(10)
             ) as client:
-                response = await client.get(url, follow_redirects=True)
+                response = await Deadline.wait(client.get(url, follow_redirects=True), url)
                 response.raise_for_status()
                 url = str(response.url)
 
@@ -567,15 +683,16 @@ class WebCastIdFetcher:
             )
 
     @classmethod
-    async def get_all_webcast_id(cls, urls: list) -> list:
+    async def get_all_webcast_id(cls, urls: list, stream: bool = False):
         """
         获取直播webcast_id,传入列表url都可以解析出webcast_id (Get live webcast_id, pass in the list url can parse out webcast_id)
 
         Args:
             urls: list: 列表url (list url)
+            stream: bool: 是否返回按完成顺序产出结果的异步迭代器 (Return an async iterator yielding results in completion order)
 
         Return:
-            webcast_ids: list: 直播的唯一标识，返回列表 (The unique identifier of the live, return list)
+            results: list: 每个链接的解析结果，成功时 value 为ID，失败时包含 error_type 与 error (Per-link results, value holds the id on success, error_type and error on failure)
         """
 
         if not isinstance(urls, list):
@@ -590,8 +707,11 @@ class WebCastIdFetcher:
                                  )
             )
 
-        webcast_ids = [cls.get_webcast_id(url) for url in urls]
-        return await asyncio.gather(*webcast_ids)
+        # 有并发上限地逐项解析，单项失败不影响其他结果 (Resolve item by item under a concurrency limit, one failure does not affect the others)
+        batch_conf = TokenManager.douyin_manager.get("batch") or {}
+        if stream:
+            return BatchResolver.iterate(urls, cls.get_webcast_id, **batch_conf)
+        return await BatchResolver.resolve(urls, cls.get_webcast_id, **batch_conf)
 
 
 def format_file_name(
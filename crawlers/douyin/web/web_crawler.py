@@ -41,6 +41,12 @@ import yaml  # 配置文件
 
 # 基础爬虫客户端和抖音API端点
 from crawlers.base_crawler import BaseCrawler
+from crawlers.utils.rate_limiter import RateLimiter
+from crawlers.utils.circuit_breaker import CircuitBreakerRegistry
+from crawlers.utils.proxy_pool import ProxyPool
+from crawlers.utils.cookie_pool import CookiePool
+from crawlers.utils.hedge import Hedge
+from crawlers.utils.singleflight import coalesce
 from crawlers.douyin.web.endpoints import DouyinAPIEndpoints
 # 抖音接口数据请求模型
 from crawlers.douyin.web.models import (
@@ -66,6 +72,22 @@ path = os.path.abspath(os.path.dirname(__file__))
 with open(f"{path}/config.yaml", "r", encoding="utf-8") as f:
     config = yaml.safe_load(f)
 
+# 按配置文件设置限流速率
+RateLimiter.configure("douyin_web", **config["TokenManager"]["douyin"].get("rate_limit") or {})
+
+# 按配置文件设置熔断参数
+CircuitBreakerRegistry.configure("douyin_web", **config["TokenManager"]["douyin"].get("circuit_breaker") or {})
+
+# 按配置文件设置代理池
+ProxyPool.configure("douyin_web", config["TokenManager"]["douyin"].get("proxy_pool"))
+
+# 按配置文件设置Cookie池
+CookiePool.configure("douyin_web", config["TokenManager"]["douyin"]["headers"]["Cookie"],
+                      **config["TokenManager"]["douyin"].get("cookie_pool") or {})
+
+# 按配置文件设置对冲请求
+Hedge.configure("douyin_web", **config["TokenManager"]["douyin"].get("hedge") or {})
+
 
 class DouyinWebCrawler:
 
@@ -77,20 +99,24 @@ class DouyinWebCrawler:
                 "Accept-Language": douyin_config["headers"]["Accept-Language"],
                 "User-Agent": douyin_config["headers"]["User-Agent"],
                 "Referer": douyin_config["headers"]["Referer"],
-                "Cookie": douyin_config["headers"]["Cookie"],
+                "Cookie": CookiePool.choose("douyin_web") or douyin_config["headers"]["Cookie"],
             },
             "proxies": {"http://": douyin_config["proxies"]["http"], "https://": douyin_config["proxies"]["https"]},
+            "http2": douyin_config.get("http2", False),
+            "platform": "douyin_web",
         }
         return kwargs
 
     "-------------------------------------------------------handler接口列表-------------------------------------------------------"
 
     # 获取单个作品数据
+    @coalesce
     async def fetch_one_video(self, aweme_id: str):
         # 获取抖音的实时Cookie
         kwargs = await self.get_douyin_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个作品详情的BaseModel参数
             params = PostDetail(aweme_id=aweme_id)
@@ -112,7 +138,8 @@ class DouyinWebCrawler:
     # 获取用户发布作品数据
     async def fetch_user_post_videos(self, sec_user_id: str, max_cursor: int, count: int):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = UserPost(sec_user_id=sec_user_id, max_cursor=max_cursor, count=count)
             # endpoint = BogusManager.xb_model_2_endpoint(
@@ -132,7 +159,8 @@ class DouyinWebCrawler:
     # 获取用户喜欢作品数据
     async def fetch_user_like_videos(self, sec_user_id: str, max_cursor: int, count: int):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = UserLike(sec_user_id=sec_user_id, max_cursor=max_cursor, count=count)
             # endpoint = BogusManager.xb_model_2_endpoint(
@@ -152,7 +180,8 @@ class DouyinWebCrawler:
     async def fetch_user_collection_videos(self, cookie: str, cursor: int = 0, count: int = 20):
         kwargs = await self.get_douyin_headers()
         kwargs["headers"]["Cookie"] = cookie
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = UserCollection(cursor=cursor, count=count)
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -164,7 +193,8 @@ class DouyinWebCrawler:
     # 获取用户合辑作品数据
     async def fetch_user_mix_videos(self, mix_id: str, cursor: int = 0, count: int = 20):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = UserMix(mix_id=mix_id, cursor=cursor, count=count)
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -176,7 +206,8 @@ class DouyinWebCrawler:
     # 获取用户直播流数据
     async def fetch_user_live_videos(self, webcast_id: str, room_id_str=""):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = UserLive(web_rid=webcast_id, room_id_str=room_id_str)
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -188,7 +219,8 @@ class DouyinWebCrawler:
     # 获取指定用户的直播流数据
     async def fetch_user_live_videos_by_room_id(self, room_id: str):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = UserLive2(room_id=room_id)
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -200,7 +232,8 @@ class DouyinWebCrawler:
     # 获取直播间送礼用户排行榜
     async def fetch_live_gift_ranking(self, room_id: str, rank_type: int = 30):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = LiveRoomRanking(room_id=room_id, rank_type=rank_type)
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -212,7 +245,8 @@ class DouyinWebCrawler:
     # 获取指定用户的信息
     async def handler_user_profile(self, sec_user_id: str):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = UserProfile(sec_user_id=sec_user_id)
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -224,7 +258,8 @@ class DouyinWebCrawler:
     # 获取指定视频的评论数据
     async def fetch_video_comments(self, aweme_id: str, cursor: int = 0, count: int = 20):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = PostComments(aweme_id=aweme_id, cursor=cursor, count=count)
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -236,7 +271,8 @@ class DouyinWebCrawler:
     # 获取指定视频的评论回复数据
     async def fetch_video_comments_reply(self, item_id: str, comment_id: str, cursor: int = 0, count: int = 20):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = PostCommentsReply(item_id=item_id, comment_id=comment_id, cursor=cursor, count=count)
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -248,7 +284,8 @@ class DouyinWebCrawler:
     # 获取抖音热榜数据
     async def fetch_hot_search_result(self):
         kwargs = await self.get_douyin_headers()
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             params = BaseRequestModel()
             endpoint = BogusManager.xb_model_2_endpoint(
@@ -262,14 +299,14 @@ class DouyinWebCrawler:
     # 生成真实msToken
     async def gen_real_msToken(self, ):
         result = {
-            "msToken": TokenManager().gen_real_msToken()
+            "msToken": await TokenManager.agen_real_msToken()
         }
         return result
 
     # 生成ttwid
     async def gen_ttwid(self, ):
         result = {
-            "ttwid": TokenManager().gen_ttwid()
+            "ttwid": await TokenManager.agen_ttwid()
         }
         return result
 
@@ -317,36 +354,36 @@ class DouyinWebCrawler:
         return await SecUserIdFetcher.get_sec_user_id(url)
 
     # 提取列表用户id
-    async def get_all_sec_user_id(self, urls: list):
+    async def get_all_sec_user_id(self, urls: list, stream: bool = False):
         # 提取有效URL
         urls = extract_valid_urls(urls)
 
         # 对于URL列表
-        return await SecUserIdFetcher.get_all_sec_user_id(urls)
+        return await SecUserIdFetcher.get_all_sec_user_id(urls, stream=stream)
 
     # 提取单个作品id
     async def get_aweme_id(self, url: str):
         return await AwemeIdFetcher.get_aweme_id(url)
 
     # 提取列表作品id
-    async def get_all_aweme_id(self, urls: list):
+    async def get_all_aweme_id(self, urls: list, stream: bool = False):
         # 提取有效URL
         urls = extract_valid_urls(urls)
 
         # 对于URL列表
-        return await AwemeIdFetcher.get_all_aweme_id(urls)
+        return await AwemeIdFetcher.get_all_aweme_id(urls, stream=stream)
 
     # 提取单个直播间号
     async def get_webcast_id(self, url: str):
         return await WebCastIdFetcher.get_webcast_id(url)
 
     # 提取列表直播间号
-    async def get_all_webcast_id(self, urls: list):
+    async def get_all_webcast_id(self, urls: list, stream: bool = False):
         # 提取有效URL
         urls = extract_valid_urls(urls)
 
         # 对于URL列表
-        return await WebCastIdFetcher.get_all_webcast_id(urls)
+        return await WebCastIdFetcher.get_all_webcast_id(urls, stream=stream)
 
     async def update_cookie(self, cookie: str):
         """
@@ -363,6 +400,8 @@ class DouyinWebCrawler:
         # 1. 更新内存中的配置（立即生效）
         config["TokenManager"][service]["headers"]["Cookie"] = cookie
         print('DouyinWebCrawler cookie updated', config["TokenManager"][service]["headers"]["Cookie"])
+        # 同步更新Cookie池，替换掉旧的Cookie
+        CookiePool.configure("douyin_web", cookie, **config["TokenManager"][service].get("cookie_pool") or {})
         # 2. 写入配置文件（持久化）
         config_path = f"{path}/config.yaml"
         with open(config_path, 'w', encoding='utf-8') as file:
@@ -0,0 +1,368 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+# 作品类型代码/Post type codes, $.aweme_detail.aweme_type, $.imagePost exists if aweme_type is photo
+URL_TYPE_CODES = {
+    # common
+    0: 'video',
+    # Douyin
+    2: 'image',
+    4: 'video',
+    68: 'image',
+    # TikTok
+    51: 'video',
+    55: 'video',
+    58: 'video',
+    61: 'video',
+    150: 'image'
+}
+
+"""
+以下为各平台最小数据的处理函数，签名均为 (data, platform, video_id) -> dict，如果你需要自定义数据处理请在这里修改。
+The following are the per-platform minimal data builders, all with the signature (data, platform, video_id) -> dict.
+If you need to customize data processing, please modify it here.
+"""
+
+
+def _aweme_base(data: dict, platform: str, video_id: str, url_type: str) -> dict:
+    """抖音与TikTok APP接口共用的字段/Fields shared by Douyin and the TikTok APP API"""
+    video = data.get("video", {})
+    return {
+        'type': url_type,
+        'platform': platform,
+        'video_id': video_id,  # 统一使用video_id字段，内容可能是aweme_id或bv_id
+        'desc': data.get("desc"),
+        'create_time': data.get("create_time"),
+        'author': data.get("author"),
+        'music': data.get("music"),
+        'statistics': data.get("statistics"),
+        'cover_data': {
+            'cover': video.get("cover"),
+            'origin_cover': video.get("origin_cover"),
+            'dynamic_cover': video.get("dynamic_cover")
+        },
+        'hashtags': data.get('text_extra'),
+    }
+
+
+def douyin_minimal_data(data: dict, platform: str, video_id: str) -> dict:
+    """抖音数据处理/Douyin data processing"""
+    url_type = URL_TYPE_CODES.get(data.get("aweme_type"), 'video')
+    result_data = _aweme_base(data, platform, video_id, url_type)
+    # 抖音视频数据处理/Douyin video data processing
+    if url_type == 'video':
+        play_addr = data['video']['play_addr']
+        uri = play_addr['uri']
+        wm_video_url_HQ = play_addr['url_list'][0]
+        result_data['video_data'] = {
+            'wm_video_url': f"https://aweme.snssdk.com/aweme/v1/playwm/?video_id={uri}&radio=1080p&line=0",
+            'wm_video_url_HQ': wm_video_url_HQ,
+            'nwm_video_url': f"https://aweme.snssdk.com/aweme/v1/play/?video_id={uri}&ratio=1080p&line=0",
+            'nwm_video_url_HQ': wm_video_url_HQ.replace('playwm', 'play')
+        }
+    # 抖音图片数据处理/Douyin image data processing
+    elif url_type == 'image':
+        images = data['images']
+        result_data['image_data'] = {
+            'no_watermark_image_list': [i['url_list'][0] for i in images],
+            'watermark_image_list': [i['download_url_list'][0] for i in images]
+        }
+    return result_data
+
+
+def tiktok_minimal_data(data: dict, platform: str, video_id: str) -> dict:
+    """TikTok APP接口数据处理/TikTok APP API data processing"""
+    url_type = URL_TYPE_CODES.get(data.get("aweme_type"), 'video')
+    result_data = _aweme_base(data, platform, video_id, url_type)
+    # TikTok视频数据处理/TikTok video data processing
+    if url_type == 'video':
+        wm_video = data.get('video', {}).get('download_addr', {}).get('url_list', [None])[0]
+        result_data['video_data'] = {
+            'wm_video_url': wm_video,
+            'wm_video_url_HQ': wm_video,
+            'nwm_video_url': data['video']['play_addr']['url_list'][0],
+            'nwm_video_url_HQ': data['video']['bit_rate'][0]['play_addr']['url_list'][0]
+        }
+    # TikTok图片数据处理/TikTok image data processing
+    elif url_type == 'image':
+        images = data['image_post_info']['images']
+        result_data['image_data'] = {
+            'no_watermark_image_list': [i['display_image']['url_list'][0] for i in images],
+            'watermark_image_list': [i['owner_watermark_image']['url_list'][0] for i in images]
+        }
+    return result_data
+
+
+def _dig(data, *keys):
+    """按键与下标逐层取值，不存在时返回 None/Walk keys and list indexes, None when missing"""
+    try:
+        for key in keys:
+            data = data[key]
+        return data
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _url_list(url: str):
+    """将Web接口的单个地址包装为APP接口的 {'url_list': [...]} 结构/Wrap a single Web API URL in the APP API's {'url_list': [...]} shape"""
+    return {'url_list': [url]} if url is not None else None
+
+
+def tiktok_web_minimal_data(data: dict, platform: str, video_id: str) -> dict:
+    """
+    TikTok Web接口 itemInfo.itemStruct 数据处理/TikTok Web API itemInfo.itemStruct data processing
+
+    嵌套字段按APP接口的蛇形命名与结构输出，无论哪个接口胜出最小数据的结构都相同；Web接口只作为备用，缺失的字段为 None。
+    (Nested fields follow the APP API's snake_case names and shapes, so the minimal data is the same whichever API wins.
+    The Web API is only a fallback, missing fields are None.)
+    """
+    url_type = 'image' if data.get("imagePost") else 'video'
+    author = data.get("author") or {}
+    music = data.get("music") or {}
+    stats = data.get("stats") or {}
+    video = data.get("video") or {}
+    result_data = {
+        'type': url_type,
+        'platform': platform,
+        'video_id': video_id,
+        'desc': data.get("desc"),
+        'create_time': data.get("createTime"),
+        'author': {
+            'uid': author.get("id"),
+            'unique_id': author.get("uniqueId"),
+            'sec_uid': author.get("secUid"),
+            'nickname': author.get("nickname"),
+            'signature': author.get("signature"),
+            'avatar_thumb': _url_list(author.get("avatarThumb")),
+            'avatar_medium': _url_list(author.get("avatarMedium")),
+            'avatar_larger': _url_list(author.get("avatarLarger")),
+        },
+        'music': {
+            'id': music.get("id"),
+            'title': music.get("title"),
+            'author': music.get("authorName"),
+            'album': music.get("album"),
+            'duration': music.get("duration"),
+            'original': music.get("original"),
+            'play_url': _url_list(music.get("playUrl")),
+            'cover_large': _url_list(music.get("coverLarge")),
+            'cover_medium': _url_list(music.get("coverMedium")),
+            'cover_thumb': _url_list(music.get("coverThumb")),
+        },
+        'statistics': {
+            'digg_count': stats.get("diggCount"),
+            'comment_count': stats.get("commentCount"),
+            'play_count': stats.get("playCount"),
+            'share_count': stats.get("shareCount"),
+            'collect_count': stats.get("collectCount"),
+        },
+        'cover_data': {
+            'cover': _url_list(video.get("cover")),
+            'origin_cover': _url_list(video.get("originCover")),
+            'dynamic_cover': _url_list(video.get("dynamicCover")),
+        },
+        'hashtags': [
+            {
+                'hashtag_name': tag.get("hashtagName"),
+                'hashtag_id': tag.get("hashtagId"),
+                'start': tag.get("start"),
+                'end': tag.get("end"),
+                'type': tag.get("type"),
+                'user_id': tag.get("userId"),
+                'sec_uid': tag.get("secUid"),
+            }
+            for tag in data.get("textExtra") or ()
+        ],
+    }
+    if url_type == 'video':
+        result_data['video_data'] = {
+            'wm_video_url': video.get("downloadAddr"),
+            'wm_video_url_HQ': video.get("downloadAddr"),
+            'nwm_video_url': video.get("playAddr"),
+            'nwm_video_url_HQ': _dig(video, "bitrateInfo", 0, "PlayAddr", "UrlList", 0),
+        }
+    else:
+        # Web接口只提供一种图片地址/The Web API only provides one image URL
+        image_list = [_dig(i, "imageURL", "urlList", 0) for i in _dig(data, "imagePost", "images") or ()]
+        result_data['image_data'] = {
+            'no_watermark_image_list': image_list,
+            'watermark_image_list': list(image_list),
+        }
+    return result_data
+
+
+def bilibili_minimal_data(data: dict, platform: str, video_id: str) -> dict:
+    """
+    Bilibili数据处理，只有视频类型，播放地址在 HybridCrawler.bilibili_video_data 中单独获取
+    (Bilibili data processing, there are only videos and playback URLs are fetched separately in HybridCrawler.bilibili_video_data)
+    """
+    pic = data.get("pic")  # Bilibili使用pic作为封面
+    return {
+        'type': 'video',
+        'platform': platform,
+        'video_id': video_id,
+        'desc': data.get("title"),  # Bilibili使用title
+        'create_time': data.get("pubdate"),  # Bilibili使用pubdate
+        'author': data.get("owner"),  # Bilibili使用owner
+        'music': None,  # Bilibili没有音乐信息
+        'statistics': data.get("stat"),  # Bilibili使用stat
+        'cover_data': {
+            'cover': pic,
+            'origin_cover': pic,
+            'dynamic_cover': pic
+        },
+        'hashtags': None,  # Bilibili没有hashtags概念
+    }
+
+
+MINIMAL_EXTRACTORS = {
+    'douyin': douyin_minimal_data,
+    'tiktok': tiktok_minimal_data,
+    # TikTok Web接口的数据结构与APP接口不同/TikTok Web API data is shaped differently from the APP API
+    'tiktok_web': tiktok_web_minimal_data,
+    'bilibili': bilibili_minimal_data,
+}
+
+
+if __name__ == "__main__":
+    # 微基准测试：python -m crawlers.hybrid.extractor [douyin:aweme_detail.json tiktok:aweme.json bilibili:view.json ...]
+    # 参数为录制的原始响应（hybrid_parsing_single_video 中 fetch_video_data 的返回值），未提供时使用内置样例。
+    # 对比改动前 hybrid_parsing_single_video 中的内联处理（old）与上面的处理函数（new），并先校验两者输出一致。
+    # Micro-benchmark, arguments are recorded raw responses (what fetch_video_data returns in
+    # hybrid_parsing_single_video), built-in samples are used when none are given. It compares the inline
+    # processing hybrid_parsing_single_video used to do (old) with the builders above (new), after checking
+    # that both give the same output.
+    import json
+    import sys
+    import timeit
+
+    def baseline_minimal_data(data, platform, video_id):
+        # 改动前的实现，每次调用都重建类型字典，不含Bilibili播放地址的请求
+        # The previous implementation, rebuilding the type dict on every call, without the Bilibili playback request
+        url_type_code_dict = {0: 'video', 2: 'image', 4: 'video', 68: 'image', 51: 'video', 55: 'video', 58: 'video',
+                              61: 'video', 150: 'image'}
+        aweme_type = 0 if platform == 'bilibili' else data.get("aweme_type")
+        url_type = url_type_code_dict.get(aweme_type, 'video')
+        if platform == 'bilibili':
+            result_data = {'type': url_type, 'platform': platform, 'video_id': video_id, 'desc': data.get("title"),
+                           'create_time': data.get("pubdate"), 'author': data.get("owner"), 'music': None,
+                           'statistics': data.get("stat"), 'cover_data': {}, 'hashtags': None}
+        else:
+            result_data = {'type': url_type, 'platform': platform, 'video_id': video_id, 'desc': data.get("desc"),
+                           'create_time': data.get("create_time"), 'author': data.get("author"),
+                           'music': data.get("music"), 'statistics': data.get("statistics"), 'cover_data': {},
+                           'hashtags': data.get('text_extra')}
+        api_data = {}
+        if platform == 'douyin':
+            result_data['cover_data'] = {'cover': data.get("video", {}).get("cover"),
+                                         'origin_cover': data.get("video", {}).get("origin_cover"),
+                                         'dynamic_cover': data.get("video", {}).get("dynamic_cover")}
+            if url_type == 'video':
+                uri = data['video']['play_addr']['uri']
+                wm_video_url_HQ = data['video']['play_addr']['url_list'][0]
+                wm_video_url = f"https://aweme.snssdk.com/aweme/v1/playwm/?video_id={uri}&radio=1080p&line=0"
+                nwm_video_url_HQ = wm_video_url_HQ.replace('playwm', 'play')
+                nwm_video_url = f"https://aweme.snssdk.com/aweme/v1/play/?video_id={uri}&ratio=1080p&line=0"
+                api_data = {'video_data': {'wm_video_url': wm_video_url, 'wm_video_url_HQ': wm_video_url_HQ,
+                                           'nwm_video_url': nwm_video_url, 'nwm_video_url_HQ': nwm_video_url_HQ}}
+            elif url_type == 'image':
+                no_watermark_image_list = []
+                watermark_image_list = []
+                for i in data['images']:
+                    no_watermark_image_list.append(i['url_list'][0])
+                    watermark_image_list.append(i['download_url_list'][0])
+                api_data = {'image_data': {'no_watermark_image_list': no_watermark_image_list,
+                                           'watermark_image_list': watermark_image_list}}
+        elif platform == 'tiktok':
+            result_data['cover_data'] = {'cover': data.get("video", {}).get("cover"),
+                                         'origin_cover': data.get("video", {}).get("origin_cover"),
+                                         'dynamic_cover': data.get("video", {}).get("dynamic_cover")}
+            if url_type == 'video':
+                wm_video = data.get('video', {}).get('download_addr', {}).get('url_list', [None])[0]
+                api_data = {'video_data': {'wm_video_url': wm_video, 'wm_video_url_HQ': wm_video,
+                                           'nwm_video_url': data['video']['play_addr']['url_list'][0],
+                                           'nwm_video_url_HQ': data['video']['bit_rate'][0]['play_addr']['url_list'][0]}}
+            elif url_type == 'image':
+                no_watermark_image_list = []
+                watermark_image_list = []
+                for i in data['image_post_info']['images']:
+                    no_watermark_image_list.append(i['display_image']['url_list'][0])
+                    watermark_image_list.append(i['owner_watermark_image']['url_list'][0])
+                api_data = {'image_data': {'no_watermark_image_list': no_watermark_image_list,
+                                           'watermark_image_list': watermark_image_list}}
+        elif platform == 'bilibili':
+            result_data['cover_data'] = {'cover': data.get("pic"), 'origin_cover': data.get("pic"),
+                                         'dynamic_cover': data.get("pic")}
+        result_data.update(api_data)
+        return result_data
+
+    if len(sys.argv) > 1:
+        corpus = []
+        for arg in sys.argv[1:]:
+            platform, _, filename = arg.partition(":")
+            with open(filename, "r", encoding="utf-8") as f:
+                corpus.append((platform, filename, json.load(f)))
+    else:
+        def addr(tag):
+            return {"uri": tag, "url_list": ["https://example.com/playwm/{0}/{1}".format(tag, i) for i in range(3)]}
+
+        video = {"play_addr": addr("p"), "download_addr": addr("d"), "cover": addr("c"), "origin_cover": addr("o"),
+                 "dynamic_cover": addr("y"), "bit_rate": [{"play_addr": addr("b{0}".format(i))} for i in range(4)]}
+        aweme = {"aweme_type": 0, "desc": "desc", "create_time": 1716000000, "author": {"nickname": "n"},
+                 "music": {"title": "m"}, "statistics": {"digg_count": 1}, "text_extra": [{"hashtag_name": "x"}], "video": video}
+        images = [{"url_list": ["https://i/{0}".format(i)], "download_url_list": ["https://w/{0}".format(i)],
+                   "display_image": {"url_list": ["https://i/{0}".format(i)]},
+                   "owner_watermark_image": {"url_list": ["https://w/{0}".format(i)]}} for i in range(9)]
+        corpus = [
+            ("douyin", "video", aweme),
+            ("douyin", "image", dict(aweme, aweme_type=68, images=images)),
+            ("tiktok", "video", dict(aweme, aweme_type=51)),
+            ("tiktok", "image", dict(aweme, aweme_type=150, image_post_info={"images": images})),
+            ("bilibili", "video", {"cid": 1, "title": "t", "pubdate": 1716000000, "owner": {"name": "n"},
+                                   "stat": {"view": 1}, "pic": "https://pic"}),
+        ]
+
+    runs = 20000
+    print("{0:<10} {1:<24} {2:>8} {3:>8}".format("platform", "sample", "old us", "new us"))
+    for platform, name, data in corpus:
+        extract = MINIMAL_EXTRACTORS[platform]
+        old = baseline_minimal_data(data, platform, "0")
+        new = extract(data, platform, "0")
+        if json.dumps(old) != json.dumps(new):
+            raise SystemExit("{0} {1}: output differs from the previous implementation".format(platform, name))
+        timings = []
+        for func in (baseline_minimal_data, extract):
+            seconds = min(timeit.repeat(lambda: func(data, platform, "0"), number=runs, repeat=5))
+            timings.append(seconds / runs * 1e6)
+        print("{0:<10} {1:<24} {2:8.2f} {3:8.2f}".format(platform, name, *timings))
@@ -32,35 +32,91 @@
 # ==============================================================================
 
 import asyncio
+import os
 import re
-import httpx
+import yaml
 
 from crawlers.douyin.web.web_crawler import DouyinWebCrawler  # 导入抖音Web爬虫
 from crawlers.tiktok.web.web_crawler import TikTokWebCrawler  # 导入TikTok Web爬虫
 from crawlers.tiktok.app.app_crawler import TikTokAPPCrawler  # 导入TikTok App爬虫
 from crawlers.bilibili.web.web_crawler import BilibiliWebCrawler  # 导入Bilibili Web爬虫
+from crawlers.utils.metadata_cache import MetadataCache  # 导入作品数据持久化缓存
+from crawlers.utils.link_cache import LinkCache  # 导入分享链接解析缓存
+from crawlers.utils.redirect_resolver import RedirectResolver  # 导入短链重定向解析器
+from crawlers.utils.id_extractor import IdExtractor  # 导入离线ID提取
+from crawlers.utils.batch_resolver import BatchResolver  # 导入批量解析器
+from crawlers.utils.hedge import Hedge  # 导入对冲请求
+from crawlers.hybrid.extractor import MINIMAL_EXTRACTORS  # 导入各平台最小数据处理函数
+
+# 配置文件路径
+path = os.path.abspath(os.path.dirname(__file__))
+
+# 读取配置文件
+with open(f"{path}/config.yaml", "r", encoding="utf-8") as f:
+    config = yaml.safe_load(f)
+
+# 进程内共享的作品数据缓存，接口、下载与Web界面共用
+# Video data cache shared in the process by the API, the download endpoint and the Web UI
+cache_config = config["MetadataCache"]
+metadata_cache = MetadataCache(
+    path=cache_config["path"],
+    ttl=cache_config["ttl"],
+    max_size_mb=cache_config["max_size_mb"],
+) if cache_config["enable"] else None
+
+# 分享链接解析缓存/Share-link resolution cache
+link_cache_config = config.get("LinkCache") or {}
+LinkCache.configure(
+    max_entries=link_cache_config.get("max_entries"),
+    ttl=link_cache_config.get("ttl"),
+    negative_ttl=link_cache_config.get("negative_ttl"),
+    path=link_cache_config.get("path") if link_cache_config.get("persistent") else None,
+)
+
+# 批量混合解析配置/Batch hybrid parsing settings
+batch_config = config.get("Batch") or {}
+
+# TikTok作品数据对冲请求配置/Hedged TikTok post fetch settings
+tiktok_hedge_config = config.get("TikTokHedge") or {}
 
 
 class HybridCrawler:
+    # 预编译BV号正则表达式
+    _BV_PATTERN = re.compile(r'(?:video\/|\/)(BV[A-Za-z0-9]+)')
+
     def __init__(self):
         self.DouyinWebCrawler = DouyinWebCrawler()
         self.TikTokWebCrawler = TikTokWebCrawler()
         self.TikTokAPPCrawler = TikTokAPPCrawler()
         self.BilibiliWebCrawler = BilibiliWebCrawler()
+        self.metadata_cache = metadata_cache
+
+    @classmethod
+    def extract_bilibili_bv_id(cls, url: str):
+        """
+        不请求网络，直接从 Bilibili 视频链接中提取 BV 号，无法离线提取时返回 None
+        """
+        return IdExtractor.extract(url, [cls._BV_PATTERN], ("bilibili.com",))
 
     async def get_bilibili_bv_id(self, url: str) -> str:
         """
-        从 Bilibili URL 中提取 BV 号，支持短链重定向
+        从 Bilibili URL 中提取 BV 号，支持短链重定向，结果按规范化链接缓存
         """
-        # 如果是 b23.tv 短链，需要重定向获取真实URL
+        return self.extract_bilibili_bv_id(url) or await LinkCache.resolve(
+            "bilibili:bv_id", url, self._resolve_bilibili_bv_id
+        )
+
+    async def _resolve_bilibili_bv_id(self, url: str) -> str:
+        # 如果是 b23.tv 短链，只跟随重定向的 Location，匹配到BV号即停止
+        # b23.tv short links only follow Location headers and stop once the BV id matches
         if "b23.tv" in url:
-            async with httpx.AsyncClient() as client:
-                response = await client.head(url, follow_redirects=True)
-                url = str(response.url)
-        
+            bv_id, response = await RedirectResolver.resolve(url, [self._BV_PATTERN], method="HEAD")
+            if bv_id:
+                return bv_id
+            url = str(response.url)
+
         # 从URL中提取BV号
-        bv_pattern = r'(?:video\/|\/)(BV[A-Za-z0-9]+)'
-        match = re.search(bv_pattern, url)
+        match = self._BV_PATTERN.search(url)
         if match:
             return match.group(1)
         else:
@@ -71,233 +127,160 @@ class HybridCrawler:
         if "douyin" in url:
             platform = "douyin"
             aweme_id = await self.DouyinWebCrawler.get_aweme_id(url)
-            data = await self.DouyinWebCrawler.fetch_one_video(aweme_id)
-            data = data.get("aweme_detail")
-            # $.aweme_detail.aweme_type
-            aweme_type = data.get("aweme_type")
         # 解析TikTok视频/Parse TikTok video
         elif "tiktok" in url:
             platform = "tiktok"
             aweme_id = await self.TikTokWebCrawler.get_aweme_id(url)
-
-            # 2024-09-14: Switch to TikTokAPPCrawler instead of TikTokWebCrawler
-            # data = await self.TikTokWebCrawler.fetch_one_video(aweme_id)
-            # data = data.get("itemInfo").get("itemStruct")
-
-            data = await self.TikTokAPPCrawler.fetch_one_video(aweme_id)
-            # $.imagePost exists if aweme_type is photo
-            aweme_type = data.get("aweme_type")
         # 解析Bilibili视频/Parse Bilibili video
         elif "bilibili" in url or "b23.tv" in url:
             platform = "bilibili"
             aweme_id = await self.get_bilibili_bv_id(url)  # BV号作为统一的video_id
-            response = await self.BilibiliWebCrawler.fetch_one_video(aweme_id)
-            data = response.get('data', {})  # 提取data部分
-            # Bilibili只有视频类型，aweme_type设为0(video)
-            aweme_type = 0
         else:
             raise ValueError("hybrid_parsing_single_video: Cannot judge the video source from the URL.")
 
+        # 优先读取持久化缓存/Read the persistent cache first
+        kind = "minimal" if minimal else "raw"
+        if self.metadata_cache is not None:
+            cached = await self.metadata_cache.get(platform, aweme_id, kind)
+            if cached is not None:
+                return cached
+            data = await self.metadata_cache.get(platform, aweme_id, "raw") if minimal else None
+        else:
+            data = None
+
+        if data is None:
+            data = await self.fetch_video_data(platform, aweme_id, minimal=minimal)
+            # TikTok Web接口的数据结构与APP接口不同，不作为原始数据缓存
+            # TikTok Web API data is shaped differently from the APP API, so it is not cached as raw data
+            if self.metadata_cache is not None and data and not self._is_tiktok_web(platform, data):
+                await self.metadata_cache.set(platform, aweme_id, data, "raw")
+
         # 检查是否需要返回最小数据/Check if minimal data is required
         if not minimal:
             return data
 
-        # 如果是最小数据，处理数据/If it is minimal data, process the data
-        url_type_code_dict = {
-            # common
-            0: 'video',
-            # Douyin
-            2: 'image',
-            4: 'video',
-            68: 'image',
-            # TikTok
-            51: 'video',
-            55: 'video',
-            58: 'video',
-            61: 'video',
-            150: 'image'
-        }
-        # 判断链接类型/Judge link type
-        url_type = url_type_code_dict.get(aweme_type, 'video')
-        # print(f"url_type: {url_type}")
+        result_data = await self.minimal_video_data(platform, aweme_id, data)
+        if self.metadata_cache is not None:
+            await self.metadata_cache.set(platform, aweme_id, result_data, "minimal")
+        return result_data
+
+    async def hybrid_parsing_batch(self, urls: list, minimal: bool = False):
+        """
+        批量混合解析，返回按完成顺序产出每个链接结果的异步迭代器
+        (Batch hybrid parsing, returns an async iterator yielding each link's result in completion order)
+        """
+        max_urls = batch_config.get("max_urls", 100)
+        if not urls:
+            raise ValueError("hybrid_parsing_batch: No URL provided.")
+        if len(urls) > max_urls:
+            raise ValueError(f"hybrid_parsing_batch: At most {max_urls} URLs per request, got {len(urls)}.")
+
+        return BatchResolver.iterate(
+            urls,
+            lambda url: self.hybrid_parsing_single_video(url, minimal=minimal),
+            concurrency=batch_config.get("concurrency"),
+            timeout=batch_config.get("timeout"),
+        )
 
+    async def fetch_video_data(self, platform: str, aweme_id: str, minimal: bool = False) -> dict:
         """
-        以下为(视频||图片)数据处理的四个方法,如果你需要自定义数据处理请在这里修改.
-        The following are four methods of (video || image) data processing. 
-        If you need to customize data processing, please modify it here.
+        获取作品原始数据/Fetch raw video data
+
+        只有 minimal 为 True 时TikTok才会与Web接口竞速，原始数据始终是APP接口的结构
+        (TikTok only races the Web API when minimal is True, so raw data always has the APP API's shape)
         """
+        if platform == "douyin":
+            data = await self.DouyinWebCrawler.fetch_one_video(aweme_id)
+            return data.get("aweme_detail")
+        elif platform == "tiktok":
+            # 2024-09-14: Switch to TikTokAPPCrawler instead of TikTokWebCrawler
+            if not minimal or not tiktok_hedge_config.get("enable", True):
+                return await self.TikTokAPPCrawler.fetch_one_video(aweme_id)
+            # APP接口优先，超过delay秒未成功或失败时同时请求Web接口，取最先返回的有效结果。
+            # 竞速的调用绕过方法级的请求合并（__wrapped__），输掉的一方被取消时其重试循环随之停止。
+            # APP API first, race the Web API when it has not succeeded within delay seconds or fails, the first valid result wins.
+            # The raced calls bypass method-level coalescing (__wrapped__), so cancelling the loser also stops its retry loop.
+            return await Hedge.race(
+                "tiktok_video",
+                lambda: self.TikTokAPPCrawler.fetch_one_video.__wrapped__(self.TikTokAPPCrawler, aweme_id),
+                lambda: self.fetch_tiktok_web_video(aweme_id, coalesced=False),
+                delay=tiktok_hedge_config.get("delay", 2.0),
+            )
+        elif platform == "bilibili":
+            response = await self.BilibiliWebCrawler.fetch_one_video(aweme_id)
+            return response.get('data', {})  # 提取data部分
+        raise ValueError(f"fetch_video_data: Unsupported platform: {platform}")
 
+    async def fetch_tiktok_web_video(self, aweme_id: str, coalesced: bool = True) -> dict:
         """
-        创建已知数据字典(索引相同)，稍后使用.update()方法更新数据
-        Create a known data dictionary (index the same), 
-        and then use the .update() method to update the data
+        通过TikTok Web接口获取作品原始数据，结构与APP接口不同/Fetch raw TikTok post data from the Web API, shaped differently from the APP API
         """
+        fetch = self.TikTokWebCrawler.fetch_one_video
+        if coalesced:
+            data = await fetch(aweme_id)
+        else:
+            data = await fetch.__wrapped__(self.TikTokWebCrawler, aweme_id)
+        return (data.get("itemInfo") or {}).get("itemStruct")
 
-        # 根据平台适配字段映射
-        if platform == 'bilibili':
-            result_data = {
-                'type': url_type,
-                'platform': platform,
-                'video_id': aweme_id,
-                'desc': data.get("title"),  # Bilibili使用title
-                'create_time': data.get("pubdate"),  # Bilibili使用pubdate
-                'author': data.get("owner"),  # Bilibili使用owner
-                'music': None,  # Bilibili没有音乐信息
-                'statistics': data.get("stat"),  # Bilibili使用stat
-                'cover_data': {},  # 将在各平台处理中填充
-                'hashtags': None,  # Bilibili没有hashtags概念
-            }
+    @staticmethod
+    def _is_tiktok_web(platform: str, data: dict) -> bool:
+        """数据是否来自TikTok Web接口，Web接口的数据没有aweme_id字段/Whether the data comes from the TikTok Web API, which has no aweme_id field"""
+        return platform == 'tiktok' and 'aweme_id' not in data
+
+    async def minimal_video_data(self, platform: str, aweme_id: str, data: dict) -> dict:
+        """
+        将原始数据处理为统一的最小数据/Normalize raw data into the unified minimal data
+        """
+        # TikTok数据可能来自APP或Web接口/TikTok data may come from the APP or the Web API
+        if self._is_tiktok_web(platform, data):
+            extractor = MINIMAL_EXTRACTORS['tiktok_web']
         else:
-            result_data = {
-                'type': url_type,
-                'platform': platform,
-                'video_id': aweme_id,  # 统一使用video_id字段，内容可能是aweme_id或bv_id
-                'desc': data.get("desc"),
-                'create_time': data.get("create_time"),
-                'author': data.get("author"),
-                'music': data.get("music"),
-                'statistics': data.get("statistics"),
-                'cover_data': {},  # 将在各平台处理中填充
-                'hashtags': data.get('text_extra'),
-            }
-        # 创建一个空变量，稍后使用.update()方法更新数据/Create an empty variable and use the .update() method to update the data
-        api_data = None
-        # 判断链接类型并处理数据/Judge link type and process data
-        # 抖音数据处理/Douyin data processing
-        if platform == 'douyin':
-            # 填充封面数据
-            result_data['cover_data'] = {
-                'cover': data.get("video", {}).get("cover"),
-                'origin_cover': data.get("video", {}).get("origin_cover"),
-                'dynamic_cover': data.get("video", {}).get("dynamic_cover")
-            }
-            # 抖音视频数据处理/Douyin video data processing
-            if url_type == 'video':
-                # 将信息储存在字典中/Store information in a dictionary
-                uri = data['video']['play_addr']['uri']
-                wm_video_url_HQ = data['video']['play_addr']['url_list'][0]
-                wm_video_url = f"https://aweme.snssdk.com/aweme/v1/playwm/?video_id={uri}&radio=1080p&line=0"
-                nwm_video_url_HQ = wm_video_url_HQ.replace('playwm', 'play')
-                nwm_video_url = f"https://aweme.snssdk.com/aweme/v1/play/?video_id={uri}&ratio=1080p&line=0"
-                api_data = {
-                    'video_data':
-                        {
-                            'wm_video_url': wm_video_url,
-                            'wm_video_url_HQ': wm_video_url_HQ,
-                            'nwm_video_url': nwm_video_url,
-                            'nwm_video_url_HQ': nwm_video_url_HQ
-                        }
-                }
-            # 抖音图片数据处理/Douyin image data processing
-            elif url_type == 'image':
-                # 无水印图片列表/No watermark image list
-                no_watermark_image_list = []
-                # 有水印图片列表/With watermark image list
-                watermark_image_list = []
-                # 遍历图片列表/Traverse image list
-                for i in data['images']:
-                    no_watermark_image_list.append(i['url_list'][0])
-                    watermark_image_list.append(i['download_url_list'][0])
-                api_data = {
-                    'image_data':
-                        {
-                            'no_watermark_image_list': no_watermark_image_list,
-                            'watermark_image_list': watermark_image_list
-                        }
+            extractor = MINIMAL_EXTRACTORS.get(platform)
+        if extractor is None:
+            raise ValueError(f"minimal_video_data: Unsupported platform: {platform}")
+        result_data = extractor(data, platform, aweme_id)
+
+        # Bilibili只有视频，播放地址需要额外调用API/Bilibili playback URLs need an extra API call
+        if platform == 'bilibili':
+            result_data.update(await self.bilibili_video_data(aweme_id, data.get('cid')))
+        return result_data
+
+    async def bilibili_video_data(self, bv_id: str, cid) -> dict:
+        """
+        获取Bilibili视频播放地址/Fetch Bilibili video playback URLs
+        """
+        if not cid:
+            return {
+                'video_data': {
+                    'wm_video_url': None,
+                    'wm_video_url_HQ': None,
+                    'nwm_video_url': None,
+                    'nwm_video_url_HQ': None,
+                    'error': 'Failed to get cid for video playback'
                 }
-        # TikTok数据处理/TikTok data processing
-        elif platform == 'tiktok':
-            # 填充封面数据
-            result_data['cover_data'] = {
-                'cover': data.get("video", {}).get("cover"),
-                'origin_cover': data.get("video", {}).get("origin_cover"),
-                'dynamic_cover': data.get("video", {}).get("dynamic_cover")
             }
-            # TikTok视频数据处理/TikTok video data processing
-            if url_type == 'video':
-                # 将信息储存在字典中/Store information in a dictionary
-                # wm_video = data['video']['downloadAddr']
-                # wm_video = data['video']['download_addr']['url_list'][0]
-                wm_video = (
-                    data.get('video', {})
-                    .get('download_addr', {})
-                    .get('url_list', [None])[0]
-                )
-
-                api_data = {
-                    'video_data':
-                        {
-                            'wm_video_url': wm_video,
-                            'wm_video_url_HQ': wm_video,
-                            # 'nwm_video_url': data['video']['playAddr'],
-                            'nwm_video_url': data['video']['play_addr']['url_list'][0],
-                            # 'nwm_video_url_HQ': data['video']['bitrateInfo'][0]['PlayAddr']['UrlList'][0]
-                            'nwm_video_url_HQ': data['video']['bit_rate'][0]['play_addr']['url_list'][0]
-                        }
-                }
-            # TikTok图片数据处理/TikTok image data processing
-            elif url_type == 'image':
-                # 无水印图片列表/No watermark image list
-                no_watermark_image_list = []
-                # 有水印图片列表/With watermark image list
-                watermark_image_list = []
-                for i in data['image_post_info']['images']:
-                    no_watermark_image_list.append(i['display_image']['url_list'][0])
-                    watermark_image_list.append(i['owner_watermark_image']['url_list'][0])
-                api_data = {
-                    'image_data':
-                        {
-                            'no_watermark_image_list': no_watermark_image_list,
-                            'watermark_image_list': watermark_image_list
-                        }
-                }
-        # Bilibili数据处理/Bilibili data processing
-        elif platform == 'bilibili':
-            # 填充封面数据
-            result_data['cover_data'] = {
-                'cover': data.get("pic"),  # Bilibili使用pic作为封面
-                'origin_cover': data.get("pic"),
-                'dynamic_cover': data.get("pic")
+
+        # 获取播放链接，cid需要转换为字符串
+        playurl_data = await self.BilibiliWebCrawler.fetch_video_playurl(bv_id, str(cid))
+        # 从播放数据中提取URL
+        dash = playurl_data.get('data', {}).get('dash', {})
+        video_list = dash.get('video', [])
+        audio_list = dash.get('audio', [])
+
+        # 选择最高质量的视频流
+        video_url = video_list[0].get('baseUrl') if video_list else None
+        audio_url = audio_list[0].get('baseUrl') if audio_list else None
+
+        return {
+            'video_data': {
+                'wm_video_url': video_url,
+                'wm_video_url_HQ': video_url,
+                'nwm_video_url': video_url,  # Bilibili没有水印概念
+                'nwm_video_url_HQ': video_url,
+                'audio_url': audio_url,  # Bilibili音视频分离
+                'cid': cid,  # 保存cid供后续使用
             }
-            # Bilibili只有视频，直接处理视频数据
-            if url_type == 'video':
-                # 获取视频播放地址需要额外调用API
-                cid = data.get('cid')  # 获取cid
-                if cid:
-                    # 获取播放链接，cid需要转换为字符串
-                    playurl_data = await self.BilibiliWebCrawler.fetch_video_playurl(aweme_id, str(cid))
-                    # 从播放数据中提取URL
-                    dash = playurl_data.get('data', {}).get('dash', {})
-                    video_list = dash.get('video', [])
-                    audio_list = dash.get('audio', [])
-                    
-                    # 选择最高质量的视频流
-                    video_url = video_list[0].get('baseUrl') if video_list else None
-                    audio_url = audio_list[0].get('baseUrl') if audio_list else None
-                    
-                    api_data = {
-                        'video_data': {
-                            'wm_video_url': video_url,
-                            'wm_video_url_HQ': video_url,
-                            'nwm_video_url': video_url,  # Bilibili没有水印概念
-                            'nwm_video_url_HQ': video_url,
-                            'audio_url': audio_url,  # Bilibili音视频分离
-                            'cid': cid,  # 保存cid供后续使用
-                        }
-                    }
-                else:
-                    api_data = {
-                        'video_data': {
-                            'wm_video_url': None,
-                            'wm_video_url_HQ': None,
-                            'nwm_video_url': None,
-                            'nwm_video_url_HQ': None,
-                            'error': 'Failed to get cid for video playback'
-                        }
-                    }
-        # 更新数据/Update data
-        result_data.update(api_data)
-        return result_data
+        }
 
     async def main(self):
         # 测试混合解析单一视频接口/Test hybrid parsing single video endpoint
@@ -40,6 +40,12 @@ import os  # 系统操作
 
 # 基础爬虫客户端和TikTokAPI端点
 from crawlers.base_crawler import BaseCrawler
+from crawlers.utils.rate_limiter import RateLimiter
+from crawlers.utils.circuit_breaker import CircuitBreakerRegistry
+from crawlers.utils.proxy_pool import ProxyPool
+from crawlers.utils.cookie_pool import CookiePool
+from crawlers.utils.singleflight import coalesce
+from crawlers.utils.deadline import Deadline
 from crawlers.tiktok.app.endpoints import TikTokAPIEndpoints
 from crawlers.utils.utils import model_to_query_string
 
@@ -61,6 +67,19 @@ path = os.path.abspath(os.path.dirname(__file__))
 with open(f"{path}/config.yaml", "r", encoding="utf-8") as f:
     config = yaml.safe_load(f)
 
+# 按配置文件设置限流速率
+RateLimiter.configure("tiktok_app", **config["TokenManager"]["tiktok"].get("rate_limit") or {})
+
+# 按配置文件设置熔断参数
+CircuitBreakerRegistry.configure("tiktok_app", **config["TokenManager"]["tiktok"].get("circuit_breaker") or {})
+
+# 按配置文件设置代理池
+ProxyPool.configure("tiktok_app", config["TokenManager"]["tiktok"].get("proxy_pool"))
+
+# 按配置文件设置Cookie池
+CookiePool.configure("tiktok_app", config["TokenManager"]["tiktok"]["headers"]["Cookie"],
+                      **config["TokenManager"]["tiktok"].get("cookie_pool") or {})
+
 
 class TikTokAPPCrawler:
 
@@ -71,11 +90,13 @@ class TikTokAPPCrawler:
             "headers": {
                 "User-Agent": tiktok_config["headers"]["User-Agent"],
                 "Referer": tiktok_config["headers"]["Referer"],
-                "Cookie": tiktok_config["headers"]["Cookie"],
+                "Cookie": CookiePool.choose("tiktok_app") or tiktok_config["headers"]["Cookie"],
                 "x-ladon": "Hello From Evil0ctal!",
             },
             "proxies": {"http://": tiktok_config["proxies"]["http"],
-                        "https://": tiktok_config["proxies"]["https"]}
+                        "https://": tiktok_config["proxies"]["https"]},
+            "http2": tiktok_config.get("http2", False),
+            "platform": "tiktok_app",
         }
         return kwargs
 
@@ -83,7 +104,9 @@ class TikTokAPPCrawler:
 
     # 获取单个作品数据
     # @deprecated("TikTok APP fetch_one_video is deprecated and will be removed in a future release. Use Web API instead. | TikTok APP fetch_one_video 已弃用，将在将来的版本中删除。请改用Web API。")
-    @retry(stop=stop_after_attempt(10), wait=wait_fixed(1))
+    @coalesce
+    # 超过请求截止时间后不再重试 / Stop retrying once the request deadline has passed
+    @retry(stop=stop_any(stop_after_attempt(10), Deadline.stop), wait=wait_fixed(1))
     async def fetch_one_video(self, aweme_id: str):
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
@@ -91,7 +114,8 @@ class TikTokAPPCrawler:
         param_str = model_to_query_string(params)
         url = f"{TikTokAPIEndpoints.HOME_FEED}?{param_str}"
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             response = await crawler.fetch_get_json(url)
             response = response.get("aweme_list")[0]
@@ -1,8 +1,9 @@
 from typing import Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from urllib.parse import quote, unquote
 
 from crawlers.tiktok.web.utils import TokenManager
+from crawlers.utils.token_pool import TokenPool
 from crawlers.utils.utils import get_timestamp
 
 
@@ -41,7 +42,7 @@ class BaseRequestModel(BaseModel):
     webcast_language: str = "en"
     tz_name: str = quote("America/Tijuana", safe="")
     # verifyFp: str = VerifyFpManager.gen_verify_fp()
-    msToken: str = TokenManager.gen_real_msToken()
+    msToken: str = Field(default_factory=TokenPool.factory("tiktok", "msToken", TokenManager.gen_false_msToken))
 
 
 # router model
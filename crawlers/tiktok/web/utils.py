@@ -3,12 +3,19 @@ import re
 import json
 import yaml
 import httpx
-import asyncio
 
 from typing import Union
 from pathlib import Path
+from http.cookiejar import DefaultCookiePolicy
 
 from crawlers.utils.logger import logger
+from crawlers.utils.client_pool import ClientPool
+from crawlers.utils.token_pool import TokenPool
+from crawlers.utils.link_cache import LinkCache
+from crawlers.utils.redirect_resolver import RedirectResolver
+from crawlers.utils.id_extractor import IdExtractor
+from crawlers.utils.batch_resolver import BatchResolver
+from crawlers.utils.deadline import Deadline
 from crawlers.douyin.web.xbogus import XBogus as XB
 from crawlers.utils.utils import (
     gen_random_str,
@@ -45,12 +52,51 @@ class TokenManager:
     }
 
     @classmethod
-    def gen_real_msToken(cls) -> str:
+    def _aclient(cls):
         """
-        生成真实的msToken,当出现错误时返回虚假的值
-        (Generate a real msToken and return a false value when an error occurs)
+        令牌请求使用的异步客户端，优先复用共享客户端池
+        (Asynchronous client for token requests, reusing the shared client pool when possible)
         """
+        return ClientPool.borrow(
+            ClientPool.make_key("tiktok_token", cls.proxies),
+            cls._create_aclient,
+            "tiktok token",
+        )
 
+    @classmethod
+    def _create_aclient(cls) -> httpx.AsyncClient:
+        client = httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(retries=5), proxies=cls.proxies, timeout=10)
+        # 每次生成令牌都应是全新的会话，不保存响应设置的Cookie
+        # Every token generation should be a fresh session, so cookies set by responses are not kept
+        client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return client
+
+    @classmethod
+    def _raise_token_error(cls, name: str, url: str, exc: Exception):
+        """将 httpx 异常转换为 API 异常 (Convert httpx exceptions into API exceptions)"""
+        if isinstance(exc, httpx.RequestError):
+            # 捕获所有与 httpx 请求相关的异常情况 (Captures all httpx request-related exceptions)
+            raise APIConnectionError("请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
+                                     .format(url, cls.proxies, cls.__name__, exc)
+                                     )
+
+        # 捕获 httpx 的状态代码错误 (captures specific status code errors from httpx)
+        if exc.response.status_code == 401:
+            raise APIUnauthorizedError("参数验证失败，请更新 Douyin_TikTok_Download_API 配置文件中的 {0}，以匹配 {1} 新规则"
+                                       .format(name, "tiktok")
+                                       )
+
+        elif exc.response.status_code == 404:
+            raise APINotFoundError("{0} 无法找到API端点".format(name))
+        else:
+            raise APIResponseError("链接：{0}，状态码 {1}：{2} ".format(
+                exc.response.url, exc.response.status_code, exc.response.text
+            )
+            )
+
+    @classmethod
+    def _msToken_request(cls) -> dict:
+        """msToken 请求参数 (msToken request arguments)"""
         payload = json.dumps(
             {
                 "magic": cls.token_conf["magic"],
@@ -65,53 +111,92 @@ class TokenManager:
             "User-Agent": cls.token_conf["User-Agent"],
             "Content-Type": "application/json",
         }
+        return {"url": cls.token_conf["url"], "headers": headers, "content": payload}
+
+    @classmethod
+    def _msToken_fallback(cls, e: Exception) -> str:
+        # 返回虚假的msToken (Return a fake msToken)
+        logger.error("生成TikTok msToken API错误：{0}".format(e))
+        logger.info("当前网络无法正常访问TikTok服务器，已经使用虚假msToken以继续运行。")
+        logger.info("并且TikTok相关API大概率无法正常使用，请在(/tiktok/web/config.yaml)中更新代理。")
+        logger.info("如果你不需要使用TikTok相关API，请忽略此消息。")
+        return cls.gen_false_msToken()
+
+    @classmethod
+    def gen_real_msToken(cls) -> str:
+        """
+        生成真实的msToken,当出现错误时返回虚假的值
+        (Generate a real msToken and return a false value when an error occurs)
+        """
 
         transport = httpx.HTTPTransport(retries=5)
         with httpx.Client(transport=transport, proxies=cls.proxies) as client:
             try:
-                response = client.post(
-                    cls.token_conf["url"], headers=headers, content=payload
-                )
+                response = client.post(**cls._msToken_request())
                 response.raise_for_status()
 
                 msToken = str(httpx.Cookies(response.cookies).get("msToken"))
 
                 return msToken
 
-            # except httpx.RequestError as exc:
-            #     # 捕获所有与 httpx 请求相关的异常情况 (Captures all httpx request-related exceptions)
-            #     raise APIConnectionError("请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
-            #                              .format(cls.token_conf["url"], cls.proxies, cls.__name__, exc)
-            #                              )
-            #
-            # except httpx.HTTPStatusError as e:
-            #     # 捕获 httpx 的状态代码错误 (captures specific status code errors from httpx)
-            #     if response.status_code == 401:
-            #         raise APIUnauthorizedError("参数验证失败，请更新 Douyin_TikTok_Download_API 配置文件中的 {0}，以匹配 {1} 新规则"
-            #                                    .format("msToken", "tiktok")
-            #                                    )
-            #
-            #     elif response.status_code == 404:
-            #         raise APINotFoundError("{0} 无法找到API端点".format("msToken"))
-            #     else:
-            #         raise APIResponseError("链接：{0}，状态码 {1}：{2} ".format(
-            #             e.response.url, e.response.status_code, e.response.text
-            #         )
-            #         )
+            except Exception as e:
+                return cls._msToken_fallback(e)
+
+    @classmethod
+    async def agen_real_msToken(cls, fallback: bool = True) -> str:
+        """
+        异步生成真实的msToken,当出现错误时返回虚假的值，不阻塞事件循环
+        (Asynchronously generate a real msToken without blocking the event loop, return a false value on error)
+
+        Args:
+            fallback (bool): 出错时是否返回虚假的值，否则抛出异常 (Return a false value on error instead of raising)
+        """
+        async with cls._aclient() as client:
+            try:
+                response = await client.post(**cls._msToken_request(), timeout=Deadline.timeout(10))
+                response.raise_for_status()
+
+                msToken = httpx.Cookies(response.cookies).get("msToken")
+                if msToken is None:
+                    raise APIResponseError("{0} 内容不符合要求".format("msToken"))
+
+                return msToken
 
             except Exception as e:
-                # 返回虚假的msToken (Return a fake msToken)
-                logger.error("生成TikTok msToken API错误：{0}".format(e))
-                logger.info("当前网络无法正常访问TikTok服务器，已经使用虚假msToken以继续运行。")
-                logger.info("并且TikTok相关API大概率无法正常使用，请在(/tiktok/web/config.yaml)中更新代理。")
-                logger.info("如果你不需要使用TikTok相关API，请忽略此消息。")
-                return cls.gen_false_msToken()
+                if not fallback:
+                    raise
+                return cls._msToken_fallback(e)
 
     @classmethod
     def gen_false_msToken(cls) -> str:
         """生成随机msToken (Generate random msToken)"""
         return gen_random_str(146) + "=="
 
+    @classmethod
+    def _ttwid_request(cls, cookie: str) -> dict:
+        """ttwid 请求参数 (ttwid request arguments)"""
+        return {
+            "url": cls.ttwid_conf["url"],
+            "content": cls.ttwid_conf["data"],
+            "headers": {
+                "Cookie": cookie,
+                "Content-Type": "text/plain",
+            },
+        }
+
+    @classmethod
+    def _parse_ttwid(cls, response: httpx.Response) -> str:
+        response.raise_for_status()
+
+        ttwid = httpx.Cookies(response.cookies).get("ttwid")
+
+        if ttwid is None:
+            raise APIResponseError(
+                "ttwid: 检查没有通过, 请更新配置文件中的ttwid"
+            )
+
+        return ttwid
+
     @classmethod
     def gen_ttwid(cls, cookie: str) -> str:
         """
@@ -120,45 +205,33 @@ class TokenManager:
         transport = httpx.HTTPTransport(retries=5)
         with httpx.Client(transport=transport, proxies=cls.proxies) as client:
             try:
-                response = client.post(
-                    cls.ttwid_conf["url"],
-                    content=cls.ttwid_conf["data"],
-                    headers={
-                        "Cookie": cookie,
-                        "Content-Type": "text/plain",
-                    },
-                )
-                response.raise_for_status()
+                return cls._parse_ttwid(client.post(**cls._ttwid_request(cookie)))
 
-                ttwid = httpx.Cookies(response.cookies).get("ttwid")
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                cls._raise_token_error("ttwid", cls.ttwid_conf["url"], exc)
 
-                if ttwid is None:
-                    raise APIResponseError(
-                        "ttwid: 检查没有通过, 请更新配置文件中的ttwid"
-                    )
+    @classmethod
+    async def agen_ttwid(cls, cookie: str) -> str:
+        """
+        异步生成请求必带的ttwid，不阻塞事件循环 (Asynchronously generate the essential ttwid without blocking the event loop)
+        """
+        async with cls._aclient() as client:
+            try:
+                return cls._parse_ttwid(await client.post(**cls._ttwid_request(cookie), timeout=Deadline.timeout(10)))
 
-                return ttwid
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                cls._raise_token_error("ttwid", cls.ttwid_conf["url"], exc)
 
-            except httpx.RequestError as exc:
-                # 捕获所有与 httpx 请求相关的异常情况 (Captures all httpx request-related exceptions)
-                raise APIConnectionError("请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
-                                         .format(cls.ttwid_conf["url"], cls.proxies, cls.__name__, exc)
-                                         )
+    @classmethod
+    def _parse_odin_tt(cls, response: httpx.Response) -> str:
+        response.raise_for_status()
 
-            except httpx.HTTPStatusError as e:
-                # 捕获 httpx 的状态代码错误 (captures specific status code errors from httpx)
-                if response.status_code == 401:
-                    raise APIUnauthorizedError("参数验证失败，请更新 Douyin_TikTok_Download_API 配置文件中的 {0}，以匹配 {1} 新规则"
-                                               .format("ttwid", "tiktok")
-                                               )
+        odin_tt = httpx.Cookies(response.cookies).get("odin_tt")
 
-                elif response.status_code == 404:
-                    raise APINotFoundError("{0} 无法找到API端点".format("ttwid"))
-                else:
-                    raise APIResponseError("链接：{0}，状态码 {1}：{2} ".format(
-                        e.response.url, e.response.status_code, e.response.text
-                    )
-                    )
+        if odin_tt is None:
+            raise APIResponseError("{0} 内容不符合要求".format("odin_tt"))
+
+        return odin_tt
 
     @classmethod
     def gen_odin_tt(cls):
@@ -168,36 +241,28 @@ class TokenManager:
         transport = httpx.HTTPTransport(retries=5)
         with httpx.Client(transport=transport, proxies=cls.proxies) as client:
             try:
-                response = client.get(cls.odin_tt_conf["url"])
-                response.raise_for_status()
+                return cls._parse_odin_tt(client.get(cls.odin_tt_conf["url"]))
 
-                odin_tt = httpx.Cookies(response.cookies).get("odin_tt")
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                cls._raise_token_error("odin_tt", cls.odin_tt_conf["url"], exc)
 
-                if odin_tt is None:
-                    raise APIResponseError("{0} 内容不符合要求".format("odin_tt"))
+    @classmethod
+    async def agen_odin_tt(cls):
+        """
+        异步生成请求必带的odin_tt，不阻塞事件循环 (Asynchronously generate the essential odin_tt without blocking the event loop)
+        """
+        async with cls._aclient() as client:
+            try:
+                return cls._parse_odin_tt(await client.get(cls.odin_tt_conf["url"], timeout=Deadline.timeout(10)))
 
-                return odin_tt
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                cls._raise_token_error("odin_tt", cls.odin_tt_conf["url"], exc)
 
-            except httpx.RequestError as exc:
-                # 捕获所有与 httpx 请求相关的异常情况 (Captures all httpx request-related exceptions)
-                raise APIConnectionError("请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
-                                         .format(cls.odin_tt_conf["url"], cls.proxies, cls.__name__, exc)
-                                         )
 
-            except httpx.HTTPStatusError as e:
-                # 捕获 httpx 的状态代码错误 (captures specific status code errors from httpx)
-                if response.status_code == 401:
-                    raise APIUnauthorizedError("参数验证失败，请更新 Douyin_TikTok_Download_API 配置文件中的 {0}，以匹配 {1} 新规则"
-                                               .format("odin_tt", "tiktok")
-                                               )
 
-                elif response.status_code == 404:
-                    raise APINotFoundError("{0} 无法找到API端点".format("odin_tt"))
-                else:
-                    raise APIResponseError("链接：{0}，状态码 {1}：{2} ".format(
-                        e.response.url, e.response.status_code, e.response.text
-                    )
-                    )
+# 注册令牌预热，由应用生命周期中的后台任务补充 (Register token pre-warming, refilled by the background task of the app lifespan)
+TokenPool.register("tiktok", "msToken", lambda: TokenManager.agen_real_msToken(fallback=False),
+                   **TokenManager.tiktok_manager.get("token_pool") or {})
 
 
 class BogusManager:
@@ -250,6 +315,19 @@ class SecUserIdFetcher:
 
     @classmethod
     async def get_secuid(cls, url: str) -> str:
+        """
+        获取TikTok用户sec_uid，结果按规范化链接缓存 (Get the sec_uid of a TikTok user, cached by normalized link)
+
+        Args:
+            url (str): 输入的url (Input url)
+
+        Returns:
+            str: 用户唯一标识 (User sec_uid)
+        """
+        return await LinkCache.resolve("tiktok:sec_uid", url, cls._resolve_secuid)
+
+    @classmethod
+    async def _resolve_secuid(cls, url: str) -> str:
         """
         获取TikTok用户sec_uid
         Args:
@@ -272,10 +350,10 @@ class SecUserIdFetcher:
 
         transport = httpx.AsyncHTTPTransport(retries=5)
         async with httpx.AsyncClient(
-                transport=transport, proxies=TokenManager.proxies, timeout=10
+                transport=transport, proxies=TokenManager.proxies, timeout=Deadline.timeout(10)
         ) as client:
             try:
-                response = await client.get(url, follow_redirects=True)
+                response = await Deadline.wait(client.get(url, follow_redirects=True), url)
                 # 444一般为Nginx拦截，不返回状态 (444 is generally intercepted by Nginx and does not return status)
                 if response.status_code in {200, 444}:
                     if cls._TIKTOK_NOTFOUND_PARREN.search(str(response.url)):
@@ -312,15 +390,16 @@ class SecUserIdFetcher:
                                          )
 
     @classmethod
-    async def get_all_secuid(cls, urls: list) -> list:
+    async def get_all_secuid(cls, urls: list, stream: bool = False):
         """
         获取列表secuid列表 (Get list sec_user_id list)
 
         Args:
             urls: list: 用户url列表 (User url list)
+            stream: bool: 是否返回按完成顺序产出结果的异步迭代器 (Return an async iterator yielding results in completion order)
 
         Return:
-            secuids: list: 用户secuid列表 (User secuid list)
+            results: list: 每个链接的解析结果，成功时 value 为ID，失败时包含 error_type 与 error (Per-link results, value holds the id on success, error_type and error on failure)
         """
 
         if not isinstance(urls, list):
@@ -336,8 +415,11 @@ class SecUserIdFetcher:
                 )
             )
 
-        secuids = [cls.get_secuid(url) for url in urls]
-        return await asyncio.gather(*secuids)
+        # 有并发上限地逐项解析，单项失败不影响其他结果 (Resolve item by item under a concurrency limit, one failure does not affect the others)
+        batch_conf = TokenManager.tiktok_manager.get("batch") or {}
+        if stream:
+            return BatchResolver.iterate(urls, cls.get_secuid, **batch_conf)
+        return await BatchResolver.resolve(urls, cls.get_secuid, **batch_conf)
 
     @classmethod
     async def get_uniqueid(cls, url: str) -> str:
@@ -363,10 +445,10 @@ class SecUserIdFetcher:
 
         transport = httpx.AsyncHTTPTransport(retries=5)
         async with httpx.AsyncClient(
-                transport=transport, proxies=TokenManager.proxies, timeout=10
+                transport=transport, proxies=TokenManager.proxies, timeout=Deadline.timeout(10)
         ) as client:
             try:
-                response = await client.get(url, follow_redirects=True)
+                response = await Deadline.wait(client.get(url, follow_redirects=True), url)
 
                 if response.status_code in {200, 444}:
                     if cls._TIKTOK_NOTFOUND_PARREN.search(str(response.url)):
@@ -399,15 +481,16 @@ class SecUserIdFetcher:
                                          )
 
     @classmethod
-    async def get_all_uniqueid(cls, urls: list) -> list:
+    async def get_all_uniqueid(cls, urls: list, stream: bool = False):
         """
         获取列表unique_id列表 (Get list sec_user_id list)
 
         Args:
             urls: list: 用户url列表 (User url list)
+            stream: bool: 是否返回按完成顺序产出结果的异步迭代器 (Return an async iterator yielding results in completion order)
 
         Return:
-            unique_ids: list: 用户unique_id列表 (User unique_id list)
+            results: list: 每个链接的解析结果，成功时 value 为ID，失败时包含 error_type 与 error (Per-link results, value holds the id on success, error_type and error on failure)
         """
 
         if not isinstance(urls, list):
@@ -423,8 +506,11 @@ class SecUserIdFetcher:
                 )
             )
 
-        unique_ids = [cls.get_uniqueid(url) for url in urls]
-        return await asyncio.gather(*unique_ids)
+        # 有并发上限地逐项解析，单项失败不影响其他结果 (Resolve item by item under a concurrency limit, one failure does not affect the others)
+        batch_conf = TokenManager.tiktok_manager.get("batch") or {}
+        if stream:
+            return BatchResolver.iterate(urls, cls.get_uniqueid, **batch_conf)
+        return await BatchResolver.resolve(urls, cls.get_uniqueid, **batch_conf)
 
 
 class AwemeIdFetcher:
@@ -437,8 +523,34 @@ class AwemeIdFetcher:
     _TIKTOK_PHOTOID_PATTERN = re.compile(r"photo/(\d+)")
     _TIKTOK_NOTFOUND_PATTERN = re.compile(r"notfound")
 
+    @classmethod
+    def extract_aweme_id(cls, url: str):
+        """
+        不请求网络，直接从作品链接中提取aweme_id或photo_id (Extract aweme_id or photo_id from a post link without any request)
+
+        Args:
+            url (str): 输入的url (Input url)
+
+        Returns:
+            str: 作品唯一标识，无法离线提取时返回 None (Post aweme_id, None when it cannot be extracted offline)
+        """
+        return IdExtractor.extract(url, [cls._TIKTOK_AWEMEID_PATTERN, cls._TIKTOK_PHOTOID_PATTERN], ("tiktok.com",))
+
     @classmethod
     async def get_aweme_id(cls, url: str) -> str:
+        """
+        获取TikTok作品aweme_id或photo_id，结果按规范化链接缓存 (Get the aweme_id or photo_id of a TikTok post, cached by normalized link)
+
+        Args:
+            url (str): 输入的url (Input url)
+
+        Returns:
+            str: 作品唯一标识 (Post aweme_id)
+        """
+        return cls.extract_aweme_id(url) or await LinkCache.resolve("tiktok:aweme_id", url, cls._resolve_aweme_id)
+
+    @classmethod
+    async def _resolve_aweme_id(cls, url: str) -> str:
         """
         获取TikTok作品aweme_id或photo_id
         Args:
@@ -473,52 +585,43 @@ class AwemeIdFetcher:
 
             return aweme_id
 
-        # 处理短连接的情况，根据重定向后的链接获取aweme_id
+        # 处理短连接的情况，只跟随重定向的 Location，匹配到 aweme_id 即停止，不下载落地页
+        # Short links: only follow Location headers and stop once aweme_id matches, without downloading the landing page
         print(f"输入的URL需要重定向: {url}")
-        transport = httpx.AsyncHTTPTransport(retries=10)
-        async with httpx.AsyncClient(
-                transport=transport, proxies=TokenManager.proxies, timeout=10
-        ) as client:
-            try:
-                response = await client.get(url, follow_redirects=True)
-
-                if response.status_code in {200, 444}:
-                    if cls._TIKTOK_NOTFOUND_PATTERN.search(str(response.url)):
-                        raise APINotFoundError("页面不可用，可能是由于区域限制（代理）造成的。类名: {0}"
-                                               .format(cls.__name__)
-                                               )
-
-                    video_match = cls._TIKTOK_AWEMEID_PATTERN.search(str(response.url))
-                    photo_match = cls._TIKTOK_PHOTOID_PATTERN.search(str(response.url))
-
-                    if not video_match and not photo_match:
-                        raise APIResponseError("未在响应中找到 aweme_id 或 photo_id")
-
-                    aweme_id = video_match.group(1) if video_match else photo_match.group(1)
-
-                    if aweme_id is None:
-                        raise RuntimeError("获取 aweme_id 或 photo_id 失败，{0}".format(response.url))
+        try:
+            aweme_id, response = await RedirectResolver.resolve(
+                url, [cls._TIKTOK_AWEMEID_PATTERN, cls._TIKTOK_PHOTOID_PATTERN],
+                proxies=TokenManager.proxies, retries=10
+            )
+        except httpx.RequestError as exc:
+            # 捕获所有与 httpx 请求相关的异常情况
+            raise APIConnectionError("请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
+                                     .format(url, TokenManager.proxies, cls.__name__, exc)
+                                     )
 
-                    return aweme_id
-                else:
-                    raise ConnectionError("接口状态码异常 {0}，请检查重试".format(response.status_code))
+        if aweme_id:
+            return aweme_id
 
-            except httpx.RequestError as exc:
-                # 捕获所有与 httpx 请求相关的异常情况
-                raise APIConnectionError("请求端点失败，请检查当前网络环境。 链接：{0}，代理：{1}，异常类名：{2}，异常详细信息：{3}"
-                                         .format(url, TokenManager.proxies, cls.__name__, exc)
-                                         )
+        if response.status_code in {200, 444}:
+            if cls._TIKTOK_NOTFOUND_PATTERN.search(str(response.url)):
+                raise APINotFoundError("页面不可用，可能是由于区域限制（代理）造成的。类名: {0}"
+                                       .format(cls.__name__)
+                                       )
+            raise APIResponseError("未在响应中找到 aweme_id 或 photo_id")
+        else:
+            raise ConnectionError("接口状态码异常 {0}，请检查重试".format(response.status_code))
 
     @classmethod
-    async def get_all_aweme_id(cls, urls: list) -> list:
+    async def get_all_aweme_id(cls, urls: list, stream: bool = False):
         """
         获取视频aweme_id,传入列表url都可以解析出aweme_id (Get video aweme_id, pass in the list url can parse out aweme_id)
 
         Args:
             urls: list: 列表url (list url)
+            stream: bool: 是否返回按完成顺序产出结果的异步迭代器 (Return an async iterator yielding results in completion order)
 
         Return:
-            aweme_ids: list: 视频的唯一标识，返回列表 (The unique identifier of the video, return list)
+            results: list: 每个链接的解析结果，成功时 value 为ID，失败时包含 error_type 与 error (Per-link results, value holds the id on success, error_type and error on failure)
         """
 
         if not isinstance(urls, list):
@@ -534,8 +637,11 @@ class AwemeIdFetcher:
                 )
             )
 
-        aweme_ids = [cls.get_aweme_id(url) for url in urls]
-        return await asyncio.gather(*aweme_ids)
+        # 有并发上限地逐项解析，单项失败不影响其他结果 (Resolve item by item under a concurrency limit, one failure does not affect the others)
+        batch_conf = TokenManager.tiktok_manager.get("batch") or {}
+        if stream:
+            return BatchResolver.iterate(urls, cls.get_aweme_id, **batch_conf)
+        return await BatchResolver.resolve(urls, cls.get_aweme_id, **batch_conf)
 
 
 def format_file_name(
@@ -40,6 +40,12 @@ import os  # 系统操作
 
 # 基础爬虫客户端和TikTokAPI端点
 from crawlers.base_crawler import BaseCrawler
+from crawlers.utils.rate_limiter import RateLimiter
+from crawlers.utils.circuit_breaker import CircuitBreakerRegistry
+from crawlers.utils.proxy_pool import ProxyPool
+from crawlers.utils.cookie_pool import CookiePool
+from crawlers.utils.hedge import Hedge
+from crawlers.utils.singleflight import coalesce
 from crawlers.tiktok.web.endpoints import TikTokAPIEndpoints
 from crawlers.utils.utils import extract_valid_urls
 
@@ -74,6 +80,22 @@ path = os.path.abspath(os.path.dirname(__file__))
 with open(f"{path}/config.yaml", "r", encoding="utf-8") as f:
     config = yaml.safe_load(f)
 
+# 按配置文件设置限流速率
+RateLimiter.configure("tiktok_web", **config["TokenManager"]["tiktok"].get("rate_limit") or {})
+
+# 按配置文件设置熔断参数
+CircuitBreakerRegistry.configure("tiktok_web", **config["TokenManager"]["tiktok"].get("circuit_breaker") or {})
+
+# 按配置文件设置代理池
+ProxyPool.configure("tiktok_web", config["TokenManager"]["tiktok"].get("proxy_pool"))
+
+# 按配置文件设置Cookie池
+CookiePool.configure("tiktok_web", config["TokenManager"]["tiktok"]["headers"]["Cookie"],
+                      **config["TokenManager"]["tiktok"].get("cookie_pool") or {})
+
+# 按配置文件设置对冲请求
+Hedge.configure("tiktok_web", **config["TokenManager"]["tiktok"].get("hedge") or {})
+
 
 class TikTokWebCrawler:
 
@@ -87,21 +109,25 @@ class TikTokWebCrawler:
             "headers": {
                 "User-Agent": tiktok_config["headers"]["User-Agent"],
                 "Referer": tiktok_config["headers"]["Referer"],
-                "Cookie": tiktok_config["headers"]["Cookie"],
+                "Cookie": CookiePool.choose("tiktok_web") or tiktok_config["headers"]["Cookie"],
             },
             "proxies": {"http://": tiktok_config["proxies"]["http"],
-                        "https://": tiktok_config["proxies"]["https"]}
+                        "https://": tiktok_config["proxies"]["https"]},
+            "http2": tiktok_config.get("http2", False),
+            "platform": "tiktok_web",
         }
         return kwargs
 
     """-------------------------------------------------------handler接口列表-------------------------------------------------------"""
 
     # 获取单个作品数据
+    @coalesce
     async def fetch_one_video(self, itemId: str):
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个作品详情的BaseModel参数
             params = PostDetail(itemId=itemId)
@@ -117,7 +143,8 @@ class TikTokWebCrawler:
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个用户详情的BaseModel参数
             params = UserProfile(secUid=secUid, uniqueId=uniqueId)
@@ -134,7 +161,8 @@ class TikTokWebCrawler:
         kwargs = await self.get_tiktok_headers()
         # proxies = {"http://": 'http://43.159.29.191:24144', "https://": 'http://43.159.29.191:24144'}
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个用户作品的BaseModel参数
             params = UserPost(secUid=secUid, cursor=cursor, count=count, coverFormat=coverFormat)
@@ -150,7 +178,8 @@ class TikTokWebCrawler:
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个用户点赞的BaseModel参数
             params = UserLike(secUid=secUid, cursor=cursor, count=count, coverFormat=coverFormat)
@@ -168,7 +197,8 @@ class TikTokWebCrawler:
         kwargs = await self.get_tiktok_headers()
         kwargs["headers"]["Cookie"] = cookie
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个用户收藏的BaseModel参数
             params = UserCollect(cookie=cookie, secUid=secUid, cursor=cursor, count=count, coverFormat=coverFormat)
@@ -184,7 +214,8 @@ class TikTokWebCrawler:
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个用户播放列表的BaseModel参数
             params = UserPlayList(secUid=secUid, cursor=cursor, count=count)
@@ -200,7 +231,8 @@ class TikTokWebCrawler:
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个用户合辑的BaseModel参数
             params = UserMix(mixId=mixId, cursor=cursor, count=count)
@@ -217,7 +249,8 @@ class TikTokWebCrawler:
         kwargs = await self.get_tiktok_headers()
         # proxies = {"http://": 'http://43.159.18.174:25263', "https://": 'http://43.159.18.174:25263'}
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个作品评论的BaseModel参数
             params = PostComment(aweme_id=aweme_id, cursor=cursor, count=count, current_region=current_region)
@@ -234,7 +267,8 @@ class TikTokWebCrawler:
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个作品评论的BaseModel参数
             params = PostCommentReply(item_id=item_id, comment_id=comment_id, cursor=cursor, count=count,
@@ -251,7 +285,8 @@ class TikTokWebCrawler:
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个用户关注的BaseModel参数
             params = UserFans(secUid=secUid, count=count, maxCursor=maxCursor, minCursor=minCursor)
@@ -267,7 +302,8 @@ class TikTokWebCrawler:
         # 获取TikTok的实时Cookie
         kwargs = await self.get_tiktok_headers()
         # 创建一个基础爬虫
-        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"])
+        base_crawler = BaseCrawler(proxies=kwargs["proxies"], crawler_headers=kwargs["headers"], http2=kwargs["http2"],
+                                   platform=kwargs["platform"])
         async with base_crawler as crawler:
             # 创建一个用户关注的BaseModel参数
             params = UserFollow(secUid=secUid, count=count, maxCursor=maxCursor, minCursor=minCursor)
@@ -283,14 +319,14 @@ class TikTokWebCrawler:
     # 生成真实msToken
     async def fetch_real_msToken(self):
         result = {
-            "msToken": TokenManager().gen_real_msToken()
+            "msToken": await TokenManager.agen_real_msToken()
         }
         return result
 
     # 生成ttwid
     async def gen_ttwid(self, cookie: str):
         result = {
-            "ttwid": TokenManager().gen_ttwid(cookie)
+            "ttwid": await TokenManager.agen_ttwid(cookie)
         }
         return result
 
@@ -309,36 +345,36 @@ class TikTokWebCrawler:
         return await SecUserIdFetcher.get_secuid(url)
 
     # 提取列表用户id
-    async def get_all_sec_user_id(self, urls: list):
+    async def get_all_sec_user_id(self, urls: list, stream: bool = False):
         # 提取有效URL
         urls = extract_valid_urls(urls)
 
         # 对于URL列表
-        return await SecUserIdFetcher.get_all_secuid(urls)
+        return await SecUserIdFetcher.get_all_secuid(urls, stream=stream)
 
     # 提取单个作品id
     async def get_aweme_id(self, url: str):
         return await AwemeIdFetcher.get_aweme_id(url)
 
     # 提取列表作品id
-    async def get_all_aweme_id(self, urls: list):
+    async def get_all_aweme_id(self, urls: list, stream: bool = False):
         # 提取有效URL
         urls = extract_valid_urls(urls)
 
         # 对于URL列表
-        return await AwemeIdFetcher.get_all_aweme_id(urls)
+        return await AwemeIdFetcher.get_all_aweme_id(urls, stream=stream)
 
     # 获取用户unique_id
     async def get_unique_id(self, url: str):
         return await SecUserIdFetcher.get_uniqueid(url)
 
     # 获取列表unique_id列表
-    async def get_all_unique_id(self, urls: list):
+    async def get_all_unique_id(self, urls: list, stream: bool = False):
         # 提取有效URL
         urls = extract_valid_urls(urls)
 
         # 对于URL列表
-        return await SecUserIdFetcher.get_all_uniqueid(urls)
+        return await SecUserIdFetcher.get_all_uniqueid(urls, stream=stream)
 
     """-------------------------------------------------------main接口列表-------------------------------------------------------"""
 
@@ -0,0 +1,142 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from crawlers.utils.deadline import Deadline
+from crawlers.utils.utils import project_fields
+
+
+class BatchResolver:
+    """
+    有并发上限的批量解析器 (Batch resolver with a concurrency limit)
+
+    固定数量的 worker 依次从输入中取任务，因此 1000 个链接的批量请求最多同时打开 concurrency 个连接；
+    每一项单独计时并单独返回成功或失败，某一项失败不会丢弃其他结果。
+    (A fixed number of workers take items one at a time, so a 1,000-link batch opens at most
+    concurrency connections at once; every item has its own timeout and its own success or error
+    result, and one failure never discards the others.)
+
+    每一项的单项超时取代整个请求的截止时间，否则长批量（尤其是流式输出）的尾部会全部超时。
+    (Each item's timeout replaces the deadline of the whole request, otherwise the tail of a long
+    batch, streamed output in particular, would all time out.)
+    """
+
+    # 默认并发上限 (Default concurrency limit)
+    concurrency = 16
+    # 默认单项超时（秒）(Default per-item timeout in seconds)
+    timeout = 15.0
+
+    @staticmethod
+    async def _run_one(index: int, item, resolver, timeout: float) -> dict:
+        try:
+            # 单项超时同时作为该项的请求截止时间 (The per-item timeout is also the item's request deadline)
+            with Deadline.scope(timeout, reset=True):
+                value = await asyncio.wait_for(resolver(item), timeout)
+            return {"index": index, "input": item, "ok": True, "value": value}
+        except asyncio.TimeoutError:
+            return {"index": index, "input": item, "ok": False, "error_type": "TimeoutError",
+                    "error": "解析超时 {0} 秒 (Timed out after {0} seconds)".format(timeout)}
+        except Exception as exc:
+            return {"index": index, "input": item, "ok": False, "error_type": type(exc).__name__, "error": str(exc)}
+
+    @classmethod
+    async def iterate(cls, items: list, resolver, concurrency: int = None, timeout: float = None) -> AsyncIterator[dict]:
+        """
+        按完成顺序逐项产出解析结果 (Yield per-item results in completion order)
+
+        Args:
+            items (list): 待解析的输入 (Inputs to resolve)
+            resolver (callable): 单项异步解析函数 (Async resolver for one item)
+            concurrency (int): 并发上限 (Concurrency limit)
+            timeout (float): 单项超时（秒）(Per-item timeout in seconds)
+
+        Yields:
+            dict: {"index", "input", "ok", "value"} 或失败时 {"index", "input", "ok", "error_type", "error"}
+                  ({"index", "input", "ok", "value"}, or {"index", "input", "ok", "error_type", "error"} on failure)
+        """
+        concurrency = max(1, concurrency or cls.concurrency)
+        timeout = timeout or cls.timeout
+        pending = iter(enumerate(items))
+        results = asyncio.Queue()
+
+        async def worker():
+            for index, item in pending:
+                await results.put(await cls._run_one(index, item, resolver, timeout))
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(items)))]
+        try:
+            for _ in range(len(items)):
+                yield await results.get()
+        finally:
+            # 调用方提前停止迭代（如客户端断开）时取消剩余任务 (Cancel the rest when the caller stops early, e.g. a client disconnect)
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    @classmethod
+    async def resolve(cls, items: list, resolver, concurrency: int = None, timeout: float = None) -> list:
+        """
+        解析全部输入，结果按输入顺序排列 (Resolve every input, results follow the input order)
+
+        Args:
+            items (list): 待解析的输入 (Inputs to resolve)
+            resolver (callable): 单项异步解析函数 (Async resolver for one item)
+            concurrency (int): 并发上限 (Concurrency limit)
+            timeout (float): 单项超时（秒）(Per-item timeout in seconds)
+
+        Returns:
+            list: 每一项的解析结果 (Per-item results)
+        """
+        results = [None] * len(items)
+        async for result in cls.iterate(items, resolver, concurrency, timeout):
+            results[result["index"]] = result
+        return results
+
+    @staticmethod
+    async def ndjson(results: AsyncIterator[dict], fields: dict = None) -> AsyncIterator[bytes]:
+        """
+        将逐项结果编码为 NDJSON 行，可直接用于 StreamingResponse
+        (Encode per-item results as NDJSON lines, ready for a StreamingResponse)
+
+        Args:
+            results (AsyncIterator[dict]): 逐项结果 (Per-item results)
+            fields (dict): 对成功结果的 value 应用的字段树 (Field tree applied to the value of successful results)
+        """
+        async for result in results:
+            if fields and result["ok"]:
+                result["value"] = project_fields(result["value"], fields)
+            yield (json.dumps(result, ensure_ascii=False, default=str) + "\n").encode("utf-8")
@@ -0,0 +1,232 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from crawlers.utils.logger import logger
+
+
+class CircuitBreaker:
+    """
+    单个上游域名的熔断器 (Circuit breaker of a single upstream host)
+
+    - closed: 正常放行，统计最近请求的失败率 (Requests pass, the recent failure rate is tracked)
+    - open: 失败率超过阈值后快速失败 (Fail fast once the failure rate exceeds the threshold)
+    - half_open: 冷却结束后放行少量探测请求 (Let a few probe requests through after the cool-down)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+            self,
+            host: str,
+            window_size: int = 20,
+            min_requests: int = 10,
+            failure_rate_threshold: float = 0.5,
+            open_seconds: float = 30.0,
+            half_open_probes: int = 1,
+    ):
+        """
+        Args:
+            host (str): 上游域名 (Upstream host)
+            window_size (int): 统计失败率的最近请求数 (Number of recent requests used for the failure rate)
+            min_requests (int): 计算失败率所需的最少请求数 (Minimum requests before the failure rate counts)
+            failure_rate_threshold (float): 打开熔断的失败率 (Failure rate that opens the circuit)
+            open_seconds (float): 熔断打开的持续时间 (How long the circuit stays open)
+            half_open_probes (int): 半开状态下允许的并发探测数 (Concurrent probes allowed while half open)
+        """
+        self.host = host
+        self.min_requests = min_requests
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._outcomes = deque(maxlen=window_size)
+        self._probes = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def failure_rate(self) -> float:
+        """最近请求的失败率 (Failure rate of recent requests)"""
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def allow_request(self) -> bool:
+        """
+        是否允许发送请求，半开状态下会占用一个探测名额
+        (Whether a request may be sent, takes a probe slot while half open)
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+            self._probes = 0
+            logger.info("熔断器进入半开状态: {0} (Circuit half open)".format(self.host))
+
+        if self.state == self.HALF_OPEN:
+            # 探测请求被取消时不会回报结果，超时后重新发放探测名额
+            # A cancelled probe never reports back, so probe slots are handed out again after a timeout
+            if time.monotonic() - self.opened_at >= self.open_seconds:
+                self.opened_at = time.monotonic()
+                self._probes = 0
+            if self._probes >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self._probes += 1
+
+        return True
+
+    def record_success(self) -> None:
+        """记录一次成功 (Record a success)"""
+        if self.state == self.HALF_OPEN:
+            self._close()
+            return
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """记录一次失败 (Record a failure)"""
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(False)
+        if (
+                self.state == self.CLOSED
+                and len(self._outcomes) >= self.min_requests
+                and self.failure_rate() >= self.failure_rate_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._probes = 0
+        logger.warning("熔断器已打开: {0}, 失败率: {1:.0%} (Circuit opened)".format(self.host, self.failure_rate()))
+
+    def _close(self) -> None:
+        self.state = self.CLOSED
+        self._outcomes.clear()
+        self._probes = 0
+        logger.info("熔断器已关闭: {0} (Circuit closed)".format(self.host))
+
+    def stats(self) -> dict:
+        """熔断器状态 (Circuit breaker statistics)"""
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+        return {
+            "host": self.host,
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "window": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 1),
+        }
+
+
+class CircuitBreakerRegistry:
+    """
+    按上游域名管理熔断器，熔断参数按平台配置 (Circuit breakers keyed by upstream host, with settings configured per platform)
+
+    新建某个域名的熔断器时使用发起请求的平台的参数。
+    (A host's breaker is created with the settings of the platform that makes the request.)
+    """
+
+    _breakers: dict = {}
+    _settings: dict = {}
+
+    @classmethod
+    def configure(
+            cls,
+            platform: str,
+            window_size: int = None,
+            min_requests: int = None,
+            failure_rate_threshold: float = None,
+            open_seconds: float = None,
+            half_open_probes: int = None,
+    ) -> None:
+        """
+        设置平台的熔断参数，留空的参数使用 CircuitBreaker 的默认值
+        (Set the breaker settings of a platform, empty values use the CircuitBreaker defaults)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            window_size (int): 统计失败率的最近请求数 (Number of recent requests used for the failure rate)
+            min_requests (int): 计算失败率所需的最少请求数 (Minimum requests before the failure rate counts)
+            failure_rate_threshold (float): 打开熔断的失败率 (Failure rate that opens the circuit)
+            open_seconds (float): 熔断打开的持续时间 (How long the circuit stays open)
+            half_open_probes (int): 半开状态下允许的并发探测数 (Concurrent probes allowed while half open)
+        """
+        settings = {
+            "window_size": window_size,
+            "min_requests": min_requests,
+            "failure_rate_threshold": failure_rate_threshold,
+            "open_seconds": open_seconds,
+            "half_open_probes": half_open_probes,
+        }
+        cls._settings[platform] = {key: value for key, value in settings.items() if value is not None}
+
+    @classmethod
+    def get(cls, url: str, platform: str = None) -> CircuitBreaker:
+        """
+        获取URL对应域名的熔断器 (Get the breaker of the URL's host)
+
+        Args:
+            url (str): 端点URL (Endpoint URL)
+            platform (str): 发起请求的平台，决定新建熔断器的参数 (Platform making the request, decides the settings of a new breaker)
+
+        Returns:
+            CircuitBreaker: 熔断器 (Circuit breaker)
+        """
+        host = urlparse(url).netloc
+        breaker = cls._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, **cls._settings.get(platform, {}))
+            cls._breakers[host] = breaker
+        return breaker
+
+    @classmethod
+    def stats(cls) -> list:
+        """所有熔断器的状态 (Statistics of every breaker)"""
+        return [breaker.stats() for breaker in cls._breakers.values()]
@@ -0,0 +1,204 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+
+from crawlers.utils.logger import logger
+
+# HTTP/2 需要安装 h2 (HTTP/2 requires the h2 package: pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class ClientPool:
+    """
+    进程级共享的 httpx.AsyncClient 池 (Process-wide shared httpx.AsyncClient pool)
+
+    客户端按 代理/请求头/连接参数 分组复用，保持长连接，避免每次调用都重新进行 TCP+TLS 握手。
+    池在 FastAPI 生命周期 (lifespan) 中打开与关闭，只在打开它的事件循环中生效；
+    在其他事件循环中（例如 Web UI 中的 asyncio.run）调用方应自行创建并关闭客户端。
+
+    (Clients are grouped and reused by proxy/header/connection profile, keeping connections alive so
+    that every call does not pay a new TCP+TLS handshake. The pool is opened and closed by the FastAPI
+    lifespan and is only active on the event loop that opened it; callers on other loops, such as
+    asyncio.run in the Web UI, should create and close their own clients.)
+    """
+
+    _clients: dict = {}
+    _labels: dict = {}
+    _metrics: dict = {}
+    _loop = None
+
+    @classmethod
+    async def startup(cls) -> None:
+        """打开客户端池 (Open the client pool)"""
+        cls._loop = asyncio.get_running_loop()
+        logger.info("共享客户端池已启动 (Shared client pool started)")
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """关闭池中所有客户端 (Close every client in the pool)"""
+        clients = list(cls._clients.values())
+        cls._clients.clear()
+        cls._labels.clear()
+        cls._loop = None
+        for client in clients:
+            await client.aclose()
+        logger.info("共享客户端池已关闭，共关闭 {0} 个客户端 (Shared client pool closed)".format(len(clients)))
+
+    @classmethod
+    def is_active(cls) -> bool:
+        """
+        当前事件循环是否可以使用共享客户端 (Whether the current event loop can use shared clients)
+        """
+        if cls._loop is None:
+            return False
+        try:
+            return asyncio.get_running_loop() is cls._loop
+        except RuntimeError:
+            return False
+
+    @staticmethod
+    def make_key(*parts) -> tuple:
+        """
+        根据连接配置生成客户端键，字典会被转换为有序元组
+        (Build a client key from the connection profile, dicts are turned into sorted tuples)
+        """
+        return tuple(
+            tuple(sorted((str(k), str(v)) for k, v in part.items())) if isinstance(part, dict) else part
+            for part in parts
+        )
+
+    @classmethod
+    def get_client(cls, key: tuple, factory, label: str = None) -> httpx.AsyncClient:
+        """
+        获取或创建指定键的共享客户端 (Get or create the shared client for a key)
+
+        Args:
+            key (tuple): 客户端键 (Client key)
+            factory (callable): 创建新客户端的工厂函数 (Factory that builds a new client)
+            label (str): 用于状态展示的名称 (Name shown in the statistics)
+
+        Returns:
+            httpx.AsyncClient: 共享客户端 (Shared client)
+        """
+        client = cls._clients.get(key)
+        if client is None or client.is_closed:
+            client = factory()
+            cls._clients[key] = client
+            cls._labels[key] = label or "default"
+        return client
+
+    @classmethod
+    @asynccontextmanager
+    async def borrow(cls, key: tuple, factory, label: str = None):
+        """
+        借用客户端：池已打开时返回共享客户端，否则创建临时客户端并在用完后关闭
+        (Borrow a client: the shared client while the pool is open, otherwise a temporary client
+        that is closed afterwards)
+
+        Args:
+            key (tuple): 客户端键 (Client key)
+            factory (callable): 创建新客户端的工厂函数 (Factory that builds a new client)
+            label (str): 用于状态展示的名称 (Name shown in the statistics)
+
+        Yields:
+            httpx.AsyncClient: 异步客户端 (Asynchronous client)
+        """
+        if cls.is_active():
+            yield cls.get_client(key, factory, label)
+            return
+
+        client = factory()
+        try:
+            yield client
+        finally:
+            await client.aclose()
+
+    @classmethod
+    @contextmanager
+    def track(cls, key: tuple):
+        """
+        记录客户端的请求数与并发流数 (Record request count and concurrent streams of a client)
+
+        Args:
+            key (tuple): 客户端键 (Client key)
+        """
+        metrics = cls._metrics.setdefault(key, {"requests": 0, "in_flight": 0, "peak_in_flight": 0})
+        metrics["requests"] += 1
+        metrics["in_flight"] += 1
+        metrics["peak_in_flight"] = max(metrics["peak_in_flight"], metrics["in_flight"])
+        try:
+            yield
+        finally:
+            metrics["in_flight"] -= 1
+
+    @staticmethod
+    def _connections(client: httpx.AsyncClient) -> list:
+        """获取客户端底层连接池中的连接 (Get the connections of the underlying connection pools)"""
+        transports = [getattr(client, "_transport", None)]
+        transports.extend(getattr(client, "_mounts", {}).values())
+        connections = []
+        for transport in transports:
+            pool = getattr(transport, "_pool", None)
+            connections.extend(getattr(pool, "connections", []))
+        return connections
+
+    @classmethod
+    def stats(cls) -> dict:
+        """客户端池状态 (Client pool statistics)"""
+        clients = []
+        for key, client in cls._clients.items():
+            connections = cls._connections(client)
+            metrics = cls._metrics.get(key, {})
+            clients.append({
+                "label": cls._labels.get(key),
+                "connections": len(connections),
+                "http2_connections": sum(1 for conn in connections if conn.info().startswith("HTTP/2")),
+                "requests": metrics.get("requests", 0),
+                "in_flight_streams": metrics.get("in_flight", 0),
+                "peak_in_flight_streams": metrics.get("peak_in_flight", 0),
+            })
+        return {
+            "active": cls._loop is not None,
+            "http2_available": HTTP2_AVAILABLE,
+            "clients": clients,
+        }
@@ -0,0 +1,207 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import time
+from contextlib import contextmanager
+
+from crawlers.utils.logger import logger
+from crawlers.utils.rate_limiter import RateLimiter
+
+
+class CookieState:
+    """
+    单个 Cookie 的使用状态 (Usage state of a single cookie)
+    """
+
+    def __init__(self, cookie: str):
+        self.cookie = cookie
+        self.identity = RateLimiter.identity(cookie)
+        self.requests = 0
+        self.in_flight = 0
+        self.failures = 0
+        self.cooldowns = 0
+        self.cooldown_until = 0.0
+
+    def is_cooling(self, now: float = None) -> bool:
+        return (now or time.monotonic()) < self.cooldown_until
+
+    def stats(self) -> dict:
+        """Cookie 状态，只展示摘要 (Cookie statistics, only the digest is shown)"""
+        now = time.monotonic()
+        return {
+            "identity": self.identity,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "failures": self.failures,
+            "cooldowns": self.cooldowns,
+            "cooling": self.is_cooling(now),
+            "cooldown_left_seconds": round(max(0.0, self.cooldown_until - now), 1),
+        }
+
+
+class CookiePool:
+    """
+    按平台管理的多账号 Cookie 池 (Multi-account cookie pools keyed by platform)
+
+    get_*_headers 每次从池中选择一个 Cookie，策略为轮询 (round_robin) 或最少并发 (least_loaded)。
+    Cookie 收到 429 或空响应后进入冷却，冷却期间不参与选择。
+    (get_*_headers picks a cookie from the pool each time, either round robin or least loaded.
+    A cookie that receives a 429 or an empty response cools down and is skipped meanwhile.)
+    """
+
+    STRATEGIES = ("round_robin", "least_loaded")
+
+    _pools: dict = {}
+    _settings: dict = {}
+    _cursors: dict = {}
+
+    @classmethod
+    def configure(cls, platform: str, default_cookie: str = None, cookies: list = None,
+                  strategy: str = "round_robin", cooldown_seconds: float = 60) -> None:
+        """
+        设置平台的 Cookie 列表，已有 Cookie 的计数会被保留 (Set the cookies of a platform, existing counters are kept)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            default_cookie (str): 配置文件 headers 中的 Cookie (Cookie from the headers section of the config)
+            cookies (list): 额外的账号 Cookie (Additional account cookies)
+            strategy (str): 选择策略 (Selection strategy)
+            cooldown_seconds (float): 冷却时长 (Cooldown duration)
+        """
+        if strategy not in cls.STRATEGIES:
+            raise ValueError("未知的Cookie选择策略: {0} (Unknown cookie strategy)".format(strategy))
+
+        ordered = []
+        for cookie in [default_cookie] + list(cookies or []):
+            if cookie and cookie not in ordered:
+                ordered.append(cookie)
+        if not ordered:
+            cls._pools.pop(platform, None)
+            return
+
+        existing = {state.cookie: state for state in cls._pools.get(platform, [])}
+        cls._pools[platform] = [existing.get(cookie) or CookieState(cookie) for cookie in ordered]
+        cls._settings[platform] = (strategy, float(cooldown_seconds))
+
+    @classmethod
+    def contains(cls, platform: str, cookie: str) -> bool:
+        """Cookie 是否来自该平台的池 (Whether the cookie belongs to the platform's pool)"""
+        return cls._find(platform, cookie) is not None
+
+    @classmethod
+    def _find(cls, platform: str, cookie: str):
+        for state in cls._pools.get(platform, []):
+            if state.cookie == cookie:
+                return state
+        return None
+
+    @classmethod
+    def choose(cls, platform: str):
+        """
+        按策略选择一个 Cookie (Pick a cookie by strategy)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+
+        Returns:
+            str | None: 选中的 Cookie，未配置时返回 None (Chosen cookie, None when nothing is configured)
+        """
+        pool = cls._pools.get(platform)
+        if not pool:
+            return None
+        strategy, _ = cls._settings[platform]
+
+        now = time.monotonic()
+        available = [state for state in pool if not state.is_cooling(now)]
+        if not available:
+            # 全部冷却时使用最早恢复的 Cookie / Use the cookie that recovers soonest when all are cooling down
+            return min(pool, key=lambda state: state.cooldown_until).cookie
+
+        if strategy == "least_loaded":
+            return min(available, key=lambda state: (state.in_flight, state.requests)).cookie
+
+        cursor = cls._cursors.get(platform, 0)
+        cls._cursors[platform] = cursor + 1
+        return available[cursor % len(available)].cookie
+
+    @classmethod
+    @contextmanager
+    def track(cls, platform: str, cookie: str):
+        """
+        记录一次使用 Cookie 的请求 (Record one request made with a cookie)
+
+        Yields:
+            CookieState | None: Cookie 状态，不在池中时为 None (Cookie state, None when it is not pooled)
+        """
+        state = cls._find(platform, cookie)
+        if state is None:
+            yield None
+            return
+
+        state.requests += 1
+        state.in_flight += 1
+        try:
+            yield state
+        finally:
+            state.in_flight -= 1
+
+    @classmethod
+    def record_failure(cls, platform: str, state: CookieState) -> None:
+        """
+        Cookie 被限流或返回空响应，进入冷却 (The cookie was throttled or got an empty response, cool it down)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            state (CookieState): Cookie 状态 (Cookie state)
+        """
+        state.failures += 1
+        if state.is_cooling():
+            return
+        _, cooldown_seconds = cls._settings[platform]
+        state.cooldown_until = time.monotonic() + cooldown_seconds
+        state.cooldowns += 1
+        logger.warning("Cookie {0} 进入冷却 {1} 秒 (Cookie cooling down): {2}".format(
+            state.identity, cooldown_seconds, platform
+        ))
+
+    @classmethod
+    def stats(cls) -> dict:
+        """所有 Cookie 池的状态 (Statistics of every pool)"""
+        return {
+            platform: {
+                "strategy": cls._settings[platform][0],
+                "cookies": [state.stats() for state in pool],
+            }
+            for platform, pool in cls._pools.items()
+        }
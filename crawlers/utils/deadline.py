@@ -0,0 +1,223 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from crawlers.utils.api_exceptions import APITimeoutError
+
+
+class SharedDeadline:
+    """
+    可延长的截止时间，供多个调用方共享的任务使用，取所有调用方中最晚的截止时间
+    (Extendable deadline for a task shared by several callers, the latest deadline among the callers wins)
+    """
+
+    def __init__(self, deadline: float = None):
+        """
+        Args:
+            deadline (float): 第一个调用方的绝对截止时间，为 None 时不限时 (Absolute deadline of the first caller, unbounded when None)
+        """
+        self.deadline = deadline
+
+    def extend(self, deadline: float = None) -> None:
+        """
+        加入新的调用方，截止时间只会延后 (Add a caller, the deadline only moves later)
+
+        Args:
+            deadline (float): 新调用方的绝对截止时间，为 None 时不再限时 (Absolute deadline of the new caller, unbounded when None)
+        """
+        if self.deadline is not None:
+            self.deadline = None if deadline is None else max(self.deadline, deadline)
+
+
+class Deadline:
+    """
+    请求级截止时间 (Request-scoped deadline)
+
+    API 层为每个请求设置一个绝对截止时间，爬虫各层的请求、重试与等待都只使用剩余的时间预算，
+    预算耗尽时抛出 APITimeoutError，不再为已放弃的请求继续工作。
+    (The API layer sets an absolute deadline for every request. Fetches, retries and sleeps in every
+    crawler layer only use the remaining budget and raise APITimeoutError once it is spent, so no more
+    work is done for requests the client has given up on.)
+
+    未设置截止时间时（例如 Web 界面与命令行调用）所有方法都保持原有行为。
+    (Without a deadline, e.g. in the web UI or command line calls, every method keeps the original behavior.)
+    """
+
+    _deadline: ContextVar = ContextVar("request_deadline", default=None)
+    _metrics: dict = {"scopes": 0, "expired": 0}
+
+    @classmethod
+    @contextmanager
+    def scope(cls, seconds: float = None, reset: bool = False):
+        """
+        在上下文内设置截止时间，嵌套时取更早的截止时间 (Set the deadline within the context, the earlier one wins when nested)
+
+        Args:
+            seconds (float): 时间预算，为空或不大于0时不设置 (Time budget, no deadline when empty or not positive)
+            reset (bool): 忽略外层的截止时间，seconds 为空时清除截止时间 (Ignore the outer deadline, clear it when seconds is empty)
+        """
+        deadline = time.monotonic() + seconds if seconds and seconds > 0 else None
+        if deadline is None and not reset:
+            yield
+            return
+        current = None if reset else cls.current()
+        if current is not None:
+            deadline = min(deadline, current)
+        if deadline is not None:
+            cls._metrics["scopes"] += 1
+        token = cls._deadline.set(deadline)
+        try:
+            yield
+        finally:
+            cls._deadline.reset(token)
+
+    @classmethod
+    @contextmanager
+    def shared(cls, deadline: float = None):
+        """
+        在上下文内使用可延长的截止时间，用于创建多个调用方共享的任务
+        (Use an extendable deadline within the context, for creating a task shared by several callers)
+
+        Args:
+            deadline (float): 第一个调用方的绝对截止时间 (Absolute deadline of the first caller)
+
+        Yields:
+            SharedDeadline: 后续调用方通过 extend 延长截止时间 (Later callers extend the deadline through it)
+        """
+        shared = SharedDeadline(deadline)
+        token = cls._deadline.set(shared)
+        try:
+            yield shared
+        finally:
+            cls._deadline.reset(token)
+
+    @classmethod
+    def current(cls):
+        """绝对截止时间（time.monotonic），未设置时为 None (Absolute deadline on time.monotonic, None when unset)"""
+        deadline = cls._deadline.get()
+        if isinstance(deadline, SharedDeadline):
+            return deadline.deadline
+        return deadline
+
+    @classmethod
+    def remaining(cls):
+        """剩余秒数，未设置截止时间时为 None (Seconds left, None without a deadline)"""
+        deadline = cls.current()
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+
+    @classmethod
+    def check(cls, what: str = "请求 (request)"):
+        """
+        预算耗尽时抛出异常 (Raise once the budget is spent)
+
+        Returns:
+            float: 剩余秒数，未设置截止时间时为 None (Seconds left, None without a deadline)
+
+        Raises:
+            APITimeoutError: 已超过截止时间 (The deadline has passed)
+        """
+        remaining = cls.remaining()
+        if remaining is not None and remaining <= 0:
+            cls._metrics["expired"] += 1
+            raise APITimeoutError("{0} 超过请求截止时间 (Exceeded the request deadline)".format(what))
+        return remaining
+
+    @classmethod
+    def timeout(cls, default: float) -> float:
+        """
+        取默认超时与剩余预算中较小的一个 (The smaller of the default timeout and the remaining budget)
+
+        Args:
+            default (float): 默认超时秒数 (Default timeout in seconds)
+        """
+        remaining = cls.check()
+        if remaining is None:
+            return default
+        return min(default, remaining)
+
+    @classmethod
+    async def sleep(cls, delay: float, what: str = "重试等待 (retry wait)"):
+        """
+        等待 delay 秒，等待结束时已超过截止时间则立即抛出异常 (Sleep for delay seconds, raise at once when the
+        deadline would pass before the sleep ends)
+        """
+        remaining = cls.check(what)
+        if remaining is not None and delay >= remaining:
+            cls._metrics["expired"] += 1
+            raise APITimeoutError("{0} {1:.2f} 秒将超过请求截止时间 (Waiting {1:.2f}s would exceed the request deadline)"
+                                  .format(what, delay))
+        await asyncio.sleep(delay)
+
+    @classmethod
+    async def wait(cls, awaitable, what: str = "请求 (request)"):
+        """
+        在剩余预算内等待 awaitable，超时时取消并抛出异常 (Await within the remaining budget, cancel and raise on timeout)
+
+        用于包含内部重试、单次超时无法约束总时长的调用，例如带重试的传输层。
+        (Meant for calls with internal retries whose total time a single timeout cannot bound, e.g. retrying transports.)
+        """
+        try:
+            remaining = cls.check(what)
+        except APITimeoutError:
+            # 关闭未开始的协程、取消未等待的 Future，避免 never awaited / never retrieved 警告
+            # Close the coroutine that never started and cancel the unawaited future to avoid never awaited / never retrieved warnings
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            elif asyncio.isfuture(awaitable):
+                awaitable.cancel()
+            raise
+        if remaining is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            cls._metrics["expired"] += 1
+            raise APITimeoutError("{0} 超过请求截止时间 (Exceeded the request deadline)".format(what))
+
+    @classmethod
+    def stop(cls, retry_state=None) -> bool:
+        """tenacity 停止条件，超过截止时间时停止重试 (tenacity stop condition, stop retrying past the deadline)"""
+        remaining = cls.remaining()
+        return remaining is not None and remaining <= 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        """截止时间状态 (Deadline statistics)"""
+        return dict(cls._metrics)
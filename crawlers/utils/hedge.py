@@ -0,0 +1,195 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import asyncio
+from collections import deque
+
+from crawlers.utils.api_exceptions import APIResponseError
+
+
+class Hedge:
+    """
+    对冲请求：主请求在 delay 秒内未成功或失败时，再发起备用请求，取最先返回的有效结果
+    (Hedged requests: when the primary call has not succeeded within delay seconds, or has failed, a
+    fallback call is started and the first valid result wins)
+
+    输掉的一方会被取消。fired 为发起备用请求的次数，won 为备用请求胜出的次数。
+    (The losing call is cancelled. fired counts started fallbacks, won counts fallbacks that won.)
+
+    通过 configure 启用的名称会记录近期耗时，delay 返回其分位数作为发起备用请求前的等待时间。
+    (Names enabled through configure record recent latencies, delay returns their percentile as the wait
+    before the fallback is started.)
+    """
+
+    _stats: dict = {}
+    _settings: dict = {}
+    _latencies: dict = {}
+
+    @classmethod
+    def configure(cls, name: str, enable: bool = False, percentile: float = 95, min_delay: float = 0.2,
+                  max_delay: float = 3.0, window: int = 200, min_samples: int = 20, switch_cookie: bool = True) -> None:
+        """
+        按分位数延迟启用对冲 (Enable hedging with a percentile-based delay)
+
+        Args:
+            name (str): 名称，通常为平台名称 (Name, usually the platform name)
+            enable (bool): 是否启用 (Whether hedging is enabled)
+            percentile (float): 近期耗时的分位数 (Percentile of recent latencies)
+            min_delay (float): 最短等待秒数 (Shortest wait in seconds)
+            max_delay (float): 最长等待秒数，样本不足时使用 (Longest wait in seconds, used until there are enough samples)
+            window (int): 保留的耗时样本数 (Number of latency samples kept)
+            min_samples (int): 使用分位数前需要的样本数 (Samples needed before the percentile is used)
+            switch_cookie (bool): 备用请求是否从Cookie池换用其他Cookie (Whether the fallback takes another cookie from the cookie pool)
+        """
+        if not enable:
+            cls._settings.pop(name, None)
+            return
+        cls._settings[name] = {
+            "percentile": float(percentile),
+            "min_delay": float(min_delay),
+            "max_delay": float(max_delay),
+            "min_samples": int(min_samples),
+            "switch_cookie": bool(switch_cookie),
+        }
+        cls._latencies[name] = deque(cls._latencies.get(name, ()), maxlen=int(window))
+
+    @classmethod
+    def settings(cls, name: str):
+        """对冲设置，未启用时返回 None (Hedging settings, None when not enabled)"""
+        return cls._settings.get(name)
+
+    @classmethod
+    def observe(cls, name: str, seconds: float) -> None:
+        """记录一次调用的耗时 (Record the latency of one call)"""
+        window = cls._latencies.get(name)
+        if window is not None:
+            window.append(seconds)
+
+    @classmethod
+    def delay(cls, name: str) -> float:
+        """
+        发起备用请求前的等待秒数 (Seconds to wait before starting the fallback)
+
+        取近期耗时的分位数并限制在 [min_delay, max_delay] 内，样本不足时为 max_delay。
+        (The percentile of recent latencies clamped to [min_delay, max_delay], max_delay until there are enough samples.)
+        """
+        settings = cls._settings[name]
+        window = cls._latencies[name]
+        if len(window) < settings["min_samples"]:
+            return settings["max_delay"]
+        ordered = sorted(window)
+        value = ordered[min(len(ordered) - 1, int(len(ordered) * settings["percentile"] / 100))]
+        return min(settings["max_delay"], max(settings["min_delay"], value))
+
+    @staticmethod
+    def _outcome(task: asyncio.Task, valid) -> tuple:
+        """取出已完成任务的结果或异常 (Take the result or error of a finished task)"""
+        if task.cancelled():
+            return None, asyncio.CancelledError()
+        if task.exception() is not None:
+            return None, task.exception()
+        result = task.result()
+        if valid is not None and not valid(result):
+            return None, APIResponseError("返回了无效的数据 (Returned invalid data)")
+        return result, None
+
+    @classmethod
+    async def race(cls, name: str, primary, fallback, delay: float, valid=bool, fire_on_error: bool = True):
+        """
+        执行对冲请求 (Run a hedged call)
+
+        Args:
+            name (str): 统计名称 (Statistics name)
+            primary (callable): 主请求，无参数的异步函数 (Primary call, an async function without arguments)
+            fallback (callable): 备用请求，无参数的异步函数 (Fallback call, an async function without arguments)
+            delay (float): 发起备用请求前等待主请求的秒数 (Seconds to wait for the primary before starting the fallback)
+            valid (callable): 判断结果是否有效，默认为 bool (Tells whether a result is valid, bool by default)
+            fire_on_error (bool): 主请求提前失败时是否立即发起备用请求，否则直接抛出 (Whether an early primary failure starts
+                the fallback at once, otherwise the error is raised)
+
+        Returns:
+            最先返回的有效结果 (The first valid result)
+
+        Raises:
+            两个请求都失败时抛出主请求的异常，备用请求的异常作为其 __cause__
+            (The primary's error when both calls fail, with the fallback's error as its __cause__)
+        """
+        stats = cls._stats.setdefault(name, {"calls": 0, "fired": 0, "won": 0, "failed": 0})
+        stats["calls"] += 1
+
+        primary_task = asyncio.ensure_future(primary())
+        fallback_task = None
+        pending = {primary_task}
+        # 按请求记录异常，无论完成顺序如何都抛出主请求的异常 (Errors by call, the primary's is raised whatever the completion order)
+        errors = {}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            while True:
+                for task in done:
+                    pending.discard(task)
+                    result, error = cls._outcome(task, valid)
+                    if error is None:
+                        if task is fallback_task:
+                            stats["won"] += 1
+                        return result
+                    errors[task] = error
+
+                if fallback_task is None:
+                    if errors and not fire_on_error:
+                        stats["failed"] += 1
+                        raise errors[primary_task]
+                    stats["fired"] += 1
+                    fallback_task = asyncio.ensure_future(fallback())
+                    pending.add(fallback_task)
+
+                if not pending:
+                    stats["failed"] += 1
+                    raise errors[primary_task] from errors[fallback_task]
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                if task.done():
+                    # 同时完成但未被采用的结果，取出异常以免产生警告 (Retrieve unused errors to avoid warnings)
+                    task.cancelled() or task.exception()
+                else:
+                    task.cancel()
+
+    @classmethod
+    def stats(cls) -> dict:
+        """对冲请求统计 (Hedged request statistics)"""
+        stats = {name: dict(values) for name, values in cls._stats.items()}
+        for name in cls._settings:
+            stats.setdefault(name, {"calls": 0, "fired": 0, "won": 0, "failed": 0})["delay"] = round(cls.delay(name), 3)
+        return stats
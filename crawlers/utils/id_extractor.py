@@ -0,0 +1,146 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+from typing import Optional
+from urllib.parse import urlsplit
+
+from crawlers.utils.link_cache import LinkCache
+from crawlers.utils.utils import extract_valid_urls
+
+
+class IdExtractor:
+    """
+    不发起网络请求的ID预解析 (Id pre-resolution without any network request)
+
+    规范链接（如 https://www.douyin.com/video/<id>、https://www.bilibili.com/video/BV...）本身就包含ID，
+    直接用各抓取器已有的预编译正则提取即可，无需重定向，也无需查缓存。短链域名上的链接永远走网络解析。
+    (Canonical links such as https://www.douyin.com/video/<id> or https://www.bilibili.com/video/BV...
+    already contain the id, so it is extracted with the fetcher's existing compiled patterns without
+    any redirect or cache lookup. Links on short-link hosts always go through network resolution.)
+    """
+
+    _metrics = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def extract(cls, url: str, patterns: list, hosts: tuple, check=None) -> Optional[str]:
+        """
+        从链接中直接提取ID (Extract the id directly from a link)
+
+        Args:
+            url (str): 链接或包含链接的文本 (Link or text containing it)
+            patterns (list): 按优先级排列的已编译正则，第一个分组为ID (Compiled patterns in priority order, group 1 is the id)
+            hosts (tuple): 允许的域名，包括其子域名 (Allowed hosts, including their subdomains)
+            check (callable): 校验提取结果的函数，如 str.isdigit (Validates the extracted value, e.g. str.isdigit)
+
+        Returns:
+            Optional[str]: 提取到的ID，无法离线提取时返回 None (Extracted id, None when it cannot be extracted offline)
+        """
+        url = extract_valid_urls(url) if isinstance(url, str) else None
+        if url:
+            host = (urlsplit(url).hostname or "").lower()
+            if host not in LinkCache.SHORT_HOSTS and any(host == h or host.endswith("." + h) for h in hosts):
+                for pattern in patterns:
+                    match = pattern.search(url)
+                    if match and match.group(1) and (check is None or check(match.group(1))):
+                        cls._metrics["hits"] += 1
+                        return match.group(1)
+        cls._metrics["misses"] += 1
+        return None
+
+    @classmethod
+    def stats(cls) -> dict:
+        """离线提取状态 (Offline extraction statistics)"""
+        return dict(cls._metrics)
+
+
+if __name__ == "__main__":
+    # 微基准测试：python -m crawlers.utils.id_extractor
+    # Micro-benchmark: python -m crawlers.utils.id_extractor
+    import timeit
+
+    from crawlers.douyin.web.utils import AwemeIdFetcher as DouyinAwemeIdFetcher, SecUserIdFetcher
+    from crawlers.tiktok.web.utils import AwemeIdFetcher as TikTokAwemeIdFetcher
+    from crawlers.hybrid.hybrid_crawler import HybridCrawler
+
+    extractors = {
+        "douyin:aweme_id": DouyinAwemeIdFetcher.extract_aweme_id,
+        "douyin:sec_user_id": SecUserIdFetcher.extract_sec_user_id,
+        "tiktok:aweme_id": TikTokAwemeIdFetcher.extract_aweme_id,
+        "bilibili:bv_id": HybridCrawler.extract_bilibili_bv_id,
+    }
+    corpus = {
+        "douyin:aweme_id": [
+            "https://www.douyin.com/video/7372484719365098803",
+            "https://www.douyin.com/video/7372484719365098803?previous_page=app_code_link",
+            "https://www.douyin.com/note/7341234567890123456",
+            "https://www.douyin.com/discover?modal_id=7372484719365098803",
+            "https://www.douyin.com/jingxuan?modal_id=7372484719365098803",
+            "https://www.iesdouyin.com/share/video/7372484719365098803/?region=CN&mid=7372484808284032806",
+            "https://www.douyin.com/user/MS4wLjABAAAA?vid=7372484719365098803",
+            "7.43 pda:/ 让你在几秒钟之内记住我  https://v.douyin.com/L5pbfdP/ 复制此链接，打开Dou音搜索，直接观看视频！",
+            "https://v.douyin.com/iRNBho6u/",
+        ],
+        "douyin:sec_user_id": [
+            "https://www.douyin.com/user/MS4wLjABAAAANXSltcLCzDGmdNFI2Q_QixVTr67NiYzjKOIP5s03CAE",
+            "https://www.douyin.com/user/MS4wLjABAAAANXSltcLCzDGmdNFI2Q_QixVTr67NiYzjKOIP5s03CAE?from_tab_name=main",
+            "https://v.douyin.com/idFqvUms/",
+        ],
+        "tiktok:aweme_id": [
+            "https://www.tiktok.com/@scarlettjonesuk/video/7255716763118226715",
+            "https://www.tiktok.com/@scarlettjonesuk/video/7255716763118226715?is_from_webapp=1&sender_device=pc",
+            "https://www.tiktok.com/@zoyapea5/photo/7370061866879454469",
+            "https://m.tiktok.com/v/7255716763118226715.html",
+            "https://vm.tiktok.com/ZMhvqjqjA/",
+            "https://vt.tiktok.com/ZSYKN1Fyq/",
+        ],
+        "bilibili:bv_id": [
+            "https://www.bilibili.com/video/BV1M1421t7hT",
+            "https://www.bilibili.com/video/BV1M1421t7hT/?spm_id_from=333.1007.tianma.1-1-1.click",
+            "https://m.bilibili.com/video/BV1M1421t7hT",
+            "https://b23.tv/Ya65brl",
+        ],
+    }
+
+    runs = 20000
+    total_hits = total_urls = 0
+    for kind, urls in corpus.items():
+        extract = extractors[kind]
+        hits = sum(1 for url in urls if extract(url))
+        per_url = timeit.timeit(lambda: [extract(url) for url in urls], number=runs) / runs / len(urls)
+        normalize = timeit.timeit(lambda: [LinkCache.normalize(url) for url in urls], number=runs) / runs / len(urls)
+        total_hits += hits
+        total_urls += len(urls)
+        print("{0:<20} offline {1}/{2}  extract {3:6.2f} us/url  (LinkCache.normalize alone {4:6.2f} us/url)".format(
+            kind, hits, len(urls), per_url * 1e6, normalize * 1e6))
+    print("resolved offline: {0}/{1} urls, no network request for any of them".format(total_hits, total_urls))
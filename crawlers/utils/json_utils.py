@@ -0,0 +1,113 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import json
+
+# 优先使用 orjson，未安装时回退到标准库 (Prefer orjson, fall back to the standard library when it is not installed)
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+    JSONDecodeError = (orjson.JSONDecodeError, json.JSONDecodeError)
+
+    def loads(data):
+        """解析 JSON，支持 bytes 与 str (Parse JSON from bytes or str)"""
+        return orjson.loads(data)
+
+except ImportError:
+    JSON_BACKEND = "json"
+    JSONDecodeError = (json.JSONDecodeError,)
+
+    def loads(data):
+        """解析 JSON，支持 bytes 与 str (Parse JSON from bytes or str)"""
+        return json.loads(data)
+
+_decoder = json.JSONDecoder()
+
+
+def find_json_object(text: str, max_candidates: int = 3):
+    """
+    从第一个左括号开始解析出完整的 JSON 对象，用于 JSONP 或带有前缀/后缀的响应体
+    (Decode the first complete JSON object starting at a brace, used for JSONP or bodies with a prefix/suffix)
+
+    使用 raw_decode 单次线性扫描并忽略尾部内容，最多尝试 max_candidates 个起始位置，耗时有上界。
+    (raw_decode does a single linear pass and ignores trailing content; at most max_candidates start
+    positions are tried, so the cost is bounded.)
+
+    Args:
+        text (str): 响应文本 (Response text)
+        max_candidates (int): 最多尝试的起始位置数 (Maximum start positions to try)
+
+    Returns:
+        dict | None: 解析到的对象，找不到时返回 None (Parsed object, None if nothing is found)
+    """
+    start = text.find("{")
+    candidates = 0
+    while start != -1 and candidates < max_candidates:
+        candidates += 1
+        try:
+            return _decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            start = text.find("{", start + 1)
+    return None
+
+
+if __name__ == "__main__":
+    # 微基准测试：python -m crawlers.utils.json_utils [payload.json ...]
+    # Micro-benchmark: python -m crawlers.utils.json_utils [payload.json ...]
+    import re
+    import sys
+    import timeit
+
+    if len(sys.argv) > 1:
+        payloads = {name: open(name, "rb").read() for name in sys.argv[1:]}
+    else:
+        item = {"aweme_id": "7372484719365098803", "desc": "示例 {描述} \"quoted\"", "statistics": {"digg_count": 1}}
+        payloads = {"synthetic": json.dumps({"aweme_list": [item] * 2000}, ensure_ascii=False).encode("utf-8")}
+
+    for name, payload in payloads.items():
+        prefixed = b"jsonp_callback(" + payload + b");"
+        text = payload.decode("utf-8")
+        runs = 20
+        results = {
+            "stdlib json.loads(text)": timeit.timeit(lambda: json.loads(text), number=runs),
+            "{0} loads(bytes)".format(JSON_BACKEND): timeit.timeit(lambda: loads(payload), number=runs),
+            "regex recovery": timeit.timeit(
+                lambda: json.loads(re.search(r"\{.*\}", prefixed.decode("utf-8")).group()), number=runs
+            ),
+            "raw_decode recovery": timeit.timeit(lambda: find_json_object(prefixed.decode("utf-8")), number=runs),
+        }
+        print("{0} ({1} KB)".format(name, len(payload) // 1024))
+        for label, seconds in results.items():
+            print("  {0:<28} {1:8.3f} ms".format(label, seconds / runs * 1000))
@@ -0,0 +1,298 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from crawlers.utils.logger import logger
+from crawlers.utils.singleflight import SingleFlight
+from crawlers.utils.utils import extract_valid_urls
+from crawlers.utils.api_exceptions import APINotFoundError, APIResponseError
+
+
+class LinkStore:
+    """
+    短链解析结果的持久化层 (Persistent tier of share-link resolutions)
+
+    使用 SQLite 保存，重启后仍可命中，读写在锁内完成以便多线程共享连接。
+    (Stored in SQLite so hits survive restarts, reads and writes happen under a lock so threads can
+    share the connection.)
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): 数据库文件路径 (Database file path)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS link_cache ("
+            "kind TEXT NOT NULL, url TEXT NOT NULL, value TEXT, error_type TEXT, error TEXT, "
+            "expires_at REAL NOT NULL, PRIMARY KEY (kind, url))"
+        )
+
+    def get(self, kind: str, url: str):
+        """读取未过期的记录 (Read an unexpired record)"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, error_type, error, expires_at FROM link_cache WHERE kind = ? AND url = ?",
+                    (kind, url),
+                ).fetchone()
+                if row is not None and row[3] <= time.time():
+                    self._conn.execute("DELETE FROM link_cache WHERE kind = ? AND url = ?", (kind, url))
+                    return None
+                return row
+        except sqlite3.Error as e:
+            logger.warning("读取短链缓存失败: {0} (Failed to read the link cache)".format(e))
+            return None
+
+    def set(self, kind: str, url: str, value, error_type, error, expires_at: float) -> None:
+        """写入一条记录 (Write a record)"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO link_cache (kind, url, value, error_type, error, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (kind, url, value, error_type, error, expires_at),
+                )
+        except sqlite3.Error as e:
+            logger.warning("写入短链缓存失败: {0} (Failed to write the link cache)".format(e))
+
+    def purge(self) -> None:
+        """删除过期记录 (Delete expired records)"""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM link_cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning("清理短链缓存失败: {0} (Failed to purge the link cache)".format(e))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LinkCache:
+    """
+    分享链接到 ID 的两级缓存 (Two-tier cache from share links to ids)
+
+    第一级为内存 LRU，第二级为可选的 SQLite；成功结果长期缓存，无效链接（找不到 ID、链接不合法）短期负缓存，
+    网络错误不缓存。并发解析同一链接时只请求一次上游。
+    (The first tier is an in-memory LRU and the second an optional SQLite store. Resolved ids are kept for
+    a long time, invalid links (no id found, malformed link) are negatively cached for a short time and
+    network errors are never cached. Concurrent resolutions of the same link hit upstream once.)
+    """
+
+    # 短链域名，查询参数只是分享追踪信息 / Short-link hosts, their query strings only carry share tracking
+    SHORT_HOSTS = ("v.douyin.com", "vm.tiktok.com", "vt.tiktok.com", "b23.tv")
+    # 不影响解析结果的追踪参数 / Tracking parameters that do not change the result
+    TRACKING_PARAMS = frozenset({
+        "is_from_webapp", "sender_device", "sender_web_id", "web_id", "share_app_id", "share_item_id",
+        "share_link_id", "share_sign", "share_version", "share_token", "share_source", "share_medium",
+        "share_plat", "share_session_id", "share_tag", "share_from", "timestamp", "utm_source",
+        "utm_medium", "utm_campaign", "utm_content", "utm_term", "u_code", "did", "iid", "_r", "_t",
+        "checksum", "spm_id_from", "vd_source", "tt_from", "previous_page", "enter_from",
+    })
+    # 可负缓存的异常：链接本身无效 / Exceptions that may be cached negatively: the link itself is invalid
+    NEGATIVE_ERRORS = (APINotFoundError, APIResponseError, ValueError)
+
+    _entries: OrderedDict = OrderedDict()
+    _store = None
+
+    max_entries: int = 50000
+    ttl: float = 7 * 24 * 3600
+    negative_ttl: float = 600
+
+    _lookups = 0
+    _hits = 0
+    _negative_hits = 0
+    _store_hits = 0
+    _misses = 0
+    _evictions = 0
+
+    @classmethod
+    def configure(cls, max_entries: int = None, ttl: float = None, negative_ttl: float = None,
+                  path: str = None) -> None:
+        """
+        设置缓存参数 (Configure the cache)
+
+        Args:
+            max_entries (int): 内存中最多保存的链接数 (Maximum links kept in memory)
+            ttl (float): 成功结果的有效期（秒） (Lifetime of resolved ids in seconds)
+            negative_ttl (float): 无效链接的有效期（秒） (Lifetime of invalid links in seconds)
+            path (str): SQLite 文件路径，为空时不持久化 (SQLite file path, empty disables persistence)
+        """
+        if max_entries is not None:
+            cls.max_entries = max_entries
+        if ttl is not None:
+            cls.ttl = ttl
+        if negative_ttl is not None:
+            cls.negative_ttl = negative_ttl
+        if cls._store is not None:
+            cls._store.close()
+            cls._store = None
+        if path:
+            cls._store = LinkStore(path)
+            cls._store.purge()
+
+    @classmethod
+    def normalize(cls, url: str) -> str:
+        """
+        规范化分享链接：提取文本中的链接，统一协议与域名大小写，去掉片段与追踪参数
+        (Normalize a share link: extract it from text, lower-case scheme and host, drop the fragment and
+        tracking parameters)
+        """
+        url = (extract_valid_urls(url) or url).strip() if isinstance(url, str) else str(url)
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        path = parts.path.rstrip("/") or "/"
+        if host in cls.SHORT_HOSTS:
+            query = ""
+        else:
+            query = urlencode(sorted(
+                (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in cls.TRACKING_PARAMS
+            ))
+        return urlunsplit(("https", host, path, query, ""))
+
+    @classmethod
+    async def resolve(cls, kind: str, url: str, resolver) -> str:
+        """
+        通过缓存解析链接 (Resolve a link through the cache)
+
+        Args:
+            kind (str): 解析类型，如 douyin:aweme_id (Resolution kind, e.g. douyin:aweme_id)
+            url (str): 分享链接或包含链接的文本 (Share link or text containing it)
+            resolver (callable): 未命中时调用的异步解析函数，参数为 url (Async resolver called on a miss with url)
+
+        Returns:
+            str: 解析出的 ID (Resolved id)
+        """
+        cls._lookups += 1
+        key = (kind, cls.normalize(url))
+        entry = cls._get(key)
+        if entry is not None:
+            return cls._unwrap(entry)
+
+        return await SingleFlight.do(("link",) + key, cls._resolve, key, url, resolver)
+
+    @classmethod
+    async def _resolve(cls, key: tuple, url: str, resolver) -> str:
+        cls._misses += 1
+        try:
+            value = await resolver(url)
+        except cls.NEGATIVE_ERRORS as e:
+            cls._set(key, None, e)
+            raise
+        if value:
+            cls._set(key, str(value), None)
+        return value
+
+    @classmethod
+    def _get(cls, key: tuple):
+        entry = cls._entries.get(key)
+        if entry is not None:
+            if entry[3] > time.time():
+                cls._entries.move_to_end(key)
+                return entry
+            del cls._entries[key]
+
+        if cls._store is not None:
+            row = cls._store.get(*key)
+            if row is not None:
+                cls._store_hits += 1
+                cls._put(key, tuple(row))
+                return tuple(row)
+        return None
+
+    @classmethod
+    def _unwrap(cls, entry: tuple) -> str:
+        value, error_type, error, _ = entry
+        if value is not None:
+            cls._hits += 1
+            return value
+
+        cls._negative_hits += 1
+        exc_type = next((t for t in cls.NEGATIVE_ERRORS if t.__name__ == error_type), APIResponseError)
+        raise exc_type(error)
+
+    @classmethod
+    def _set(cls, key: tuple, value, error) -> None:
+        ttl = cls.ttl if error is None else cls.negative_ttl
+        error_type = type(error).__name__ if error is not None else None
+        message = (error.args[0] if error.args else str(error)) if error is not None else None
+        entry = (value, error_type, message, time.time() + ttl)
+        cls._put(key, entry)
+        if cls._store is not None:
+            cls._store.set(*key, *entry)
+
+    @classmethod
+    def _put(cls, key: tuple, entry: tuple) -> None:
+        cls._entries[key] = entry
+        cls._entries.move_to_end(key)
+        while len(cls._entries) > cls.max_entries:
+            cls._entries.popitem(last=False)
+            cls._evictions += 1
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空内存缓存 (Clear the in-memory tier)"""
+        cls._entries.clear()
+
+    @classmethod
+    def stats(cls) -> dict:
+        """缓存统计 (Cache statistics)"""
+        # 未命中但与进行中的解析合并的请求 / Lookups that missed but joined an in-flight resolution
+        coalesced = cls._lookups - cls._hits - cls._negative_hits - cls._misses
+        return {
+            "entries": len(cls._entries),
+            "max_entries": cls.max_entries,
+            "persistent": cls._store is not None,
+            "hit_rate": round(1 - cls._misses / cls._lookups, 4) if cls._lookups else 0.0,
+            "lookups": cls._lookups,
+            "hits": cls._hits,
+            "negative_hits": cls._negative_hits,
+            "persistent_hits": cls._store_hits,
+            "coalesced": max(0, coalesced),
+            "misses": cls._misses,
+            "evictions": cls._evictions,
+        }
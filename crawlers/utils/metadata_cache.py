@@ -0,0 +1,225 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from crawlers.utils.logger import logger
+
+
+class MetadataCache:
+    """
+    基于 SQLite (WAL 模式) 的作品数据持久化缓存，按 (平台, 作品ID) 存储原始数据与精简数据
+    (Persistent cache of video data backed by SQLite in WAL mode, storing raw and minimal data by (platform, video_id))
+
+    WAL 模式允许多个进程同时读取，因此多 worker 部署可以共享同一个缓存文件。
+    (WAL mode lets several processes read at the same time, so multi-worker deployments can share one cache file.)
+
+    SQLite 调用是阻塞的（写锁最多等待 5 秒），对外的 get/set/stats 均在线程中执行，不占用事件循环。
+    (SQLite calls block, waiting up to 5 seconds for the write lock, so the public get/set/stats run in a thread
+    instead of on the event loop.)
+    """
+
+    KINDS = ("raw", "minimal")
+
+    def __init__(self, path: str, ttl: int = 3600, max_size_mb: int = 256, evict_every: int = 100):
+        """
+        Args:
+            path (str): 数据库文件路径 (Database file path)
+            ttl (int): 过期秒数 (TTL in seconds)
+            max_size_mb (int): 数据总大小上限，单位MB (Upper bound of stored data in MB)
+            evict_every (int): 每写入多少次检查一次容量 (Check the size budget every N writes)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.evict_every = evict_every
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS video_cache (
+                platform TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                raw TEXT,
+                minimal TEXT,
+                size INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (platform, video_id)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_video_cache_accessed ON video_cache (accessed_at)")
+
+    async def get(self, platform: str, video_id: str, kind: str = "raw"):
+        """
+        读取缓存 (Read the cache)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            video_id (str): 作品ID (Video id)
+            kind (str): raw 或 minimal (raw or minimal)
+
+        Returns:
+            缓存的数据，未命中或已过期时返回 None (Cached data, None on a miss or when expired)
+        """
+        if kind not in self.KINDS:
+            raise ValueError("kind 必须是 raw 或 minimal")
+        return await asyncio.to_thread(self._get, platform, str(video_id), kind)
+
+    def _get(self, platform: str, video_id: str, kind: str):
+        """在工作线程中读取缓存 (Read the cache in a worker thread)"""
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT {0}, created_at FROM video_cache WHERE platform = ? AND video_id = ?".format(kind),
+                    (platform, str(video_id)),
+                ).fetchone()
+                if row is None or row[0] is None:
+                    return None
+                if now - row[1] > self.ttl:
+                    self._conn.execute(
+                        "DELETE FROM video_cache WHERE platform = ? AND video_id = ?", (platform, str(video_id))
+                    )
+                    return None
+                self._conn.execute(
+                    "UPDATE video_cache SET accessed_at = ? WHERE platform = ? AND video_id = ?",
+                    (now, platform, str(video_id)),
+                )
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning("读取作品缓存失败：{0}".format(e))
+            return None
+
+    async def set(self, platform: str, video_id: str, data, kind: str = "raw") -> None:
+        """
+        写入缓存，写入原始数据时会清除旧的精简数据
+        (Write the cache, writing raw data drops the previous minimal data)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            video_id (str): 作品ID (Video id)
+            data: 要缓存的数据 (Data to cache)
+            kind (str): raw 或 minimal (raw or minimal)
+        """
+        if kind not in self.KINDS:
+            raise ValueError("kind 必须是 raw 或 minimal")
+        await asyncio.to_thread(self._set, platform, str(video_id), data, kind)
+
+    def _set(self, platform: str, video_id: str, data, kind: str) -> None:
+        """在工作线程中写入缓存 (Write the cache in a worker thread)"""
+        now = time.time()
+        value = json.dumps(data, ensure_ascii=False)
+        try:
+            with self._lock:
+                if kind == "raw":
+                    self._conn.execute(
+                        """
+                        INSERT INTO video_cache (platform, video_id, raw, minimal, size, created_at, accessed_at)
+                        VALUES (?, ?, ?, NULL, ?, ?, ?)
+                        ON CONFLICT (platform, video_id) DO UPDATE SET
+                            raw = excluded.raw, minimal = NULL, size = excluded.size,
+                            created_at = excluded.created_at, accessed_at = excluded.accessed_at
+                        """,
+                        (platform, str(video_id), value, len(value), now, now),
+                    )
+                else:
+                    self._conn.execute(
+                        """
+                        INSERT INTO video_cache (platform, video_id, raw, minimal, size, created_at, accessed_at)
+                        VALUES (?, ?, NULL, ?, ?, ?, ?)
+                        ON CONFLICT (platform, video_id) DO UPDATE SET
+                            minimal = excluded.minimal, size = length(coalesce(raw, '')) + excluded.size,
+                            accessed_at = excluded.accessed_at
+                        """,
+                        (platform, str(video_id), value, len(value), now, now),
+                    )
+                self._writes += 1
+                if self._writes % self.evict_every == 0:
+                    self._evict(now)
+        except sqlite3.Error as e:
+            logger.warning("写入作品缓存失败：{0}".format(e))
+
+    def _evict(self, now: float) -> None:
+        """删除过期条目，并按最近访问时间淘汰超出容量的条目 (Drop expired rows, then evict least recently used rows over budget)"""
+        self._conn.execute("DELETE FROM video_cache WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM video_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT platform, video_id, size FROM video_cache ORDER BY accessed_at")
+        evicted = []
+        for platform, video_id, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((platform, video_id))
+            total -= size
+        self._conn.executemany("DELETE FROM video_cache WHERE platform = ? AND video_id = ?", evicted)
+        logger.info("作品缓存超出容量，已淘汰 {0} 条 (Metadata cache evicted entries)".format(len(evicted)))
+
+    async def stats(self) -> dict:
+        """缓存统计 (Cache statistics)"""
+        return await asyncio.to_thread(self._stats)
+
+    def _stats(self) -> dict:
+        """在工作线程中统计缓存 (Collect cache statistics in a worker thread)"""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM video_cache"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+        }
+
+    def close(self) -> None:
+        """关闭数据库连接 (Close the database connection)"""
+        with self._lock:
+            self._conn.close()
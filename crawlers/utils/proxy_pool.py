@@ -0,0 +1,188 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import random
+import time
+from urllib.parse import urlparse
+
+from crawlers.utils.logger import logger
+
+
+class ProxyState:
+    """
+    单个代理的健康评分 (Health score of a single proxy)
+
+    用指数加权移动平均 (EWMA) 记录延迟与错误率，权重 = 成功率 / 延迟。
+    连续失败达到阈值后隔离一段时间，隔离期间不参与选择。
+    (Latency and error rate are tracked as EWMAs and the weight is success rate / latency.
+    After enough consecutive failures the proxy is quarantined and skipped for a while.)
+    """
+
+    def __init__(self, url: str, alpha: float = 0.3, initial_latency: float = 1.0,
+                 quarantine_failures: int = 3, quarantine_seconds: float = 60):
+        """
+        Args:
+            url (str): 代理地址 (Proxy URL)
+            alpha (float): EWMA 平滑系数 (EWMA smoothing factor)
+            initial_latency (float): 未测量前的延迟估计，单位秒 (Latency estimate before any sample, in seconds)
+            quarantine_failures (int): 触发隔离的连续失败次数 (Consecutive failures that trigger quarantine)
+            quarantine_seconds (float): 隔离时长 (Quarantine duration)
+        """
+        self.url = url
+        self.proxies = {"http://": url, "https://": url}
+        self.alpha = alpha
+        self.quarantine_failures = quarantine_failures
+        self.quarantine_seconds = quarantine_seconds
+
+        self.latency = initial_latency
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.quarantined_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.times_quarantined = 0
+
+    @property
+    def label(self) -> str:
+        """不含账号密码的代理地址 (Proxy address without credentials)"""
+        parsed = urlparse(self.url)
+        return "{0}://{1}".format(parsed.scheme, parsed.hostname) + (":{0}".format(parsed.port) if parsed.port else "")
+
+    def is_quarantined(self, now: float = None) -> bool:
+        return (now or time.monotonic()) < self.quarantined_until
+
+    def weight(self) -> float:
+        """选择权重，成功率越高、延迟越低权重越大 (Selection weight, higher for lower error rate and latency)"""
+        return max(1.0 - self.error_rate, 0.01) / max(self.latency, 0.01)
+
+    def record(self, latency: float, ok: bool) -> None:
+        """
+        记录一次请求结果 (Record the outcome of one request)
+
+        Args:
+            latency (float): 请求耗时，单位秒 (Request duration in seconds)
+            ok (bool): 是否成功 (Whether the request succeeded)
+        """
+        self.requests += 1
+        self.latency += self.alpha * (latency - self.latency)
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            self.consecutive_failures = 0
+            return
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.quarantine_failures and not self.is_quarantined():
+            self.quarantined_until = time.monotonic() + self.quarantine_seconds
+            self.times_quarantined += 1
+            # 解除隔离后从中性错误率重新开始 / Start again from a neutral error rate once released
+            self.error_rate = 0.5
+            self.consecutive_failures = 0
+            logger.warning("代理已隔离 {0} 秒: {1} (Proxy quarantined)".format(self.quarantine_seconds, self.label))
+
+    def stats(self) -> dict:
+        """代理状态 (Proxy statistics)"""
+        now = time.monotonic()
+        return {
+            "proxy": self.label,
+            "weight": round(self.weight(), 3),
+            "latency_ms": round(self.latency * 1000, 1),
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "quarantined": self.is_quarantined(now),
+            "quarantine_left_seconds": round(max(0.0, self.quarantined_until - now), 1),
+            "times_quarantined": self.times_quarantined,
+        }
+
+
+class ProxyPool:
+    """
+    按平台管理的代理池 (Proxy pools keyed by platform)
+
+    每次请求按健康权重随机选择一个未隔离的代理，未配置代理池的平台使用配置文件中的固定代理。
+    (Each request picks a non-quarantined proxy at random weighted by health, platforms without a pool
+    keep using the static proxies from their config file.)
+    """
+
+    _pools: dict = {}
+
+    # 新建代理状态的默认参数 / Default settings for new proxy states
+    settings: dict = {}
+
+    @classmethod
+    def configure(cls, platform: str, proxies: list = None) -> None:
+        """
+        设置平台的代理列表，已有代理的评分会被保留 (Set the proxies of a platform, existing scores are kept)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            proxies (list): 代理地址列表，为空时关闭代理池 (Proxy URLs, empty disables the pool)
+        """
+        proxies = [proxy for proxy in proxies or [] if proxy]
+        if not proxies:
+            cls._pools.pop(platform, None)
+            return
+        existing = {state.url: state for state in cls._pools.get(platform, [])}
+        cls._pools[platform] = [existing.get(url) or ProxyState(url, **cls.settings) for url in proxies]
+
+    @classmethod
+    def enabled(cls, platform: str) -> bool:
+        return platform in cls._pools
+
+    @classmethod
+    def choose(cls, platform: str):
+        """
+        按权重选择代理 (Pick a proxy by weight)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+
+        Returns:
+            ProxyState | None: 选中的代理，未配置代理池时返回 None (Chosen proxy, None when no pool is configured)
+        """
+        pool = cls._pools.get(platform)
+        if not pool:
+            return None
+        now = time.monotonic()
+        available = [state for state in pool if not state.is_quarantined(now)]
+        if not available:
+            # 全部隔离时使用最早解除隔离的代理 / Use the proxy released soonest when all are quarantined
+            return min(pool, key=lambda state: state.quarantined_until)
+        return random.choices(available, weights=[state.weight() for state in available])[0]
+
+    @classmethod
+    def stats(cls) -> dict:
+        """所有代理池的状态 (Statistics of every pool)"""
+        return {platform: [state.stats() for state in pool] for platform, pool in cls._pools.items()}
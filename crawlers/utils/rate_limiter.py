@@ -0,0 +1,161 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import hashlib
+import time
+
+from crawlers.utils.deadline import Deadline
+
+
+class TokenBucket:
+    """
+    令牌桶 (Token bucket)
+
+    以固定速率补充令牌，最多累积 burst 个，请求前消耗一个令牌，令牌不足时等待。
+    (Tokens refill at a fixed rate up to burst, each request consumes one and waits when none is left.)
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate (float): 每秒补充的令牌数 (Tokens added per second)
+            burst (int): 令牌桶容量 (Bucket capacity)
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """
+        获取一个令牌，必要时等待 (Take one token, waiting if necessary)
+
+        令牌不足时先预支，余额为负表示排队中的请求，每个请求按预支的顺序等待。
+        (When empty the token is borrowed in advance, a negative balance stands for queued requests
+        and each request waits according to its place in the queue.)
+
+        等待遵守请求截止时间；被取消或超过截止时间时归还预支的令牌，不拖慢后面的请求。
+        (The wait respects the request deadline; when it is cancelled or would pass the deadline the
+        borrowed token is returned, so later requests are not slowed down.)
+        """
+        self._refill()
+        self.tokens -= 1
+        self.acquired += 1
+        if self.tokens < 0:
+            delay = -self.tokens / self.rate
+            try:
+                await Deadline.sleep(delay, "限流等待 (rate limit wait)")
+            except BaseException:
+                self.tokens += 1
+                self.acquired -= 1
+                raise
+            self.waited_seconds += delay
+
+
+class RateLimiter:
+    """
+    按 平台 + Cookie 身份 管理令牌桶的限流器 (Rate limiter with token buckets keyed by platform and cookie identity)
+
+    每个平台通过 configure 设置速率，未配置的平台不限流。
+    (Each platform sets its rate through configure, platforms that are not configured are not limited.)
+    """
+
+    _settings: dict = {}
+    _buckets: dict = {}
+
+    @classmethod
+    def configure(cls, platform: str, rate: float = None, burst: int = None) -> None:
+        """
+        设置平台的限流速率 (Set the rate of a platform)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            rate (float): 每秒请求数，为空或 0 时不限流 (Requests per second, empty or 0 disables limiting)
+            burst (int): 突发请求数，默认与 rate 相同 (Burst size, defaults to rate)
+        """
+        if not rate:
+            cls._settings.pop(platform, None)
+            return
+        cls._settings[platform] = (float(rate), int(burst or max(1, rate)))
+
+    @staticmethod
+    def identity(cookie: str) -> str:
+        """Cookie 身份标识，只保留摘要 (Cookie identity, only a digest is kept)"""
+        if not cookie:
+            return "anonymous"
+        return hashlib.sha1(cookie.encode("utf-8")).hexdigest()[:8]
+
+    @classmethod
+    async def acquire(cls, platform: str, cookie: str = None) -> None:
+        """
+        请求前获取令牌 (Take a token before a request)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            cookie (str): 请求使用的 Cookie (Cookie used by the request)
+        """
+        settings = cls._settings.get(platform)
+        if settings is None:
+            return
+
+        key = (platform, cls.identity(cookie))
+        bucket = cls._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(*settings)
+            cls._buckets[key] = bucket
+        await bucket.acquire()
+
+    @classmethod
+    def stats(cls) -> list:
+        """所有令牌桶的状态 (Statistics of every bucket)"""
+        stats = []
+        for (platform, identity), bucket in cls._buckets.items():
+            bucket._refill()
+            stats.append({
+                "platform": platform,
+                "identity": identity,
+                "rate": bucket.rate,
+                "burst": bucket.burst,
+                "tokens": round(bucket.tokens, 2),
+                "acquired": bucket.acquired,
+                "waited_seconds": round(bucket.waited_seconds, 3),
+            })
+        return stats
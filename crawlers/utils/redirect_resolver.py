@@ -0,0 +1,139 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+from http.cookiejar import DefaultCookiePolicy
+
+import httpx
+
+from crawlers.utils.client_pool import ClientPool
+from crawlers.utils.deadline import Deadline
+
+
+class RedirectResolver:
+    """
+    只读取 Location 响应头的短链重定向解析器 (Share-link redirect resolver that only reads Location headers)
+
+    手动逐跳跟随重定向，每一跳只读取响应头，不下载响应体；一旦某一跳的地址匹配到作品/用户ID的正则就立即停止，
+    从而不必下载最终落地页的完整HTML。
+    (Redirects are followed hop by hop by hand, reading only the headers of each response and never
+    the body; as soon as a hop's address matches one of the id patterns the walk stops, so the full
+    HTML of the final landing page is never downloaded.)
+    """
+
+    # 最大重定向次数 (Maximum number of redirects)
+    max_redirects = 10
+
+    _metrics = {"resolves": 0, "hops": 0, "early_stops": 0, "landings": 0}
+
+    @classmethod
+    def _create_client(cls, proxies: dict = None, retries: int = 5, timeout: int = 10) -> httpx.AsyncClient:
+        client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(retries=retries), proxies=proxies, timeout=timeout
+        )
+        # 重定向链之间不共享Cookie，每条链的Cookie由 resolve 单独保存
+        # Cookies are not shared between chains, each chain keeps its own cookies in resolve
+        client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return client
+
+    @staticmethod
+    def _match(patterns: list, url: str):
+        """按顺序匹配ID正则 (Try the id patterns in order)"""
+        for pattern in patterns:
+            match = pattern.search(url)
+            if match:
+                return match.group(1)
+        return None
+
+    @classmethod
+    async def resolve(
+            cls,
+            url: str,
+            patterns: list,
+            proxies: dict = None,
+            retries: int = 5,
+            timeout: int = 10,
+            method: str = "GET",
+    ) -> tuple:
+        """
+        跟随重定向直到某一跳的地址匹配到ID (Follow redirects until a hop's address matches an id)
+
+        Args:
+            url (str): 起始链接 (Starting url)
+            patterns (list): 按优先级排列的已编译正则，第一个分组为ID (Compiled patterns in priority order, group 1 is the id)
+            proxies (dict): 代理 (Proxies)
+            retries (int): 连接重试次数 (Connection retries)
+            timeout (int): 超时时间 (Timeout)
+            method (str): 请求方法，GET 或 HEAD (Request method, GET or HEAD)
+
+        Returns:
+            tuple: (匹配到的ID或None, 最后一跳的响应) ((Matched id or None, response of the last hop))
+                   最后一跳的响应体只在状态码 >= 400 时读取 (The body of the last hop is only read when its status is >= 400)
+
+        Raises:
+            httpx.RequestError: 请求失败或重定向次数过多 (Request failed or too many redirects)
+            APITimeoutError: 超过请求截止时间 (Exceeded the request deadline)
+        """
+        cls._metrics["resolves"] += 1
+        key = ClientPool.make_key("redirect", proxies or {}, retries, timeout)
+        async with ClientPool.borrow(key, lambda: cls._create_client(proxies, retries, timeout), "redirect") as client:
+            cookies = httpx.Cookies()
+            for _ in range(cls.max_redirects + 1):
+                # 每一跳连同传输层重试都只使用剩余的请求预算 (Every hop, transport retries included, only uses the remaining request budget)
+                request = client.build_request(method, url, cookies=cookies, timeout=Deadline.timeout(timeout))
+                response = await Deadline.wait(client.send(request, stream=True), url)
+                cls._metrics["hops"] += 1
+                try:
+                    if not response.is_redirect:
+                        # 落地页只保留响应头，错误页读取响应体以便报错 (Keep only headers of the landing page, read error pages for the message)
+                        if response.status_code >= 400:
+                            await response.aread()
+                        cls._metrics["landings"] += 1
+                        return cls._match(patterns, str(response.url)), response
+                    cookies.extract_cookies(response)
+                    url = response.url.join(response.headers["Location"])
+                finally:
+                    await response.aclose()
+
+                matched = cls._match(patterns, str(url))
+                if matched:
+                    cls._metrics["early_stops"] += 1
+                    return matched, response
+
+            raise httpx.TooManyRedirects("重定向次数超过 {0} 次 (Exceeded {0} redirects)".format(cls.max_redirects),
+                                         request=request)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """重定向解析状态 (Redirect resolution statistics)"""
+        return {"max_redirects": cls.max_redirects, **cls._metrics}
@@ -0,0 +1,207 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+
+class ResponseCache:
+    """
+    爬虫 JSON 响应的内存缓存，按字节数限制容量，按端点类型设置过期时间，超出容量时淘汰最久未使用的条目
+    (In-memory cache of crawler JSON responses, bounded by bytes, with per-endpoint-type TTLs and LRU eviction)
+
+    缓存的结果是共享对象，调用方不应修改它。
+    (Cached results are shared objects, so callers must not mutate them.)
+    """
+
+    # 端点类型规则：(路径片段, 类型, 过期秒数)，按顺序匹配，未匹配的端点不缓存
+    # Endpoint type rules: (path fragment, type, TTL seconds), matched in order, unmatched endpoints are not cached
+    TTL_RULES = [
+        # 评论 / Comments
+        ("/comment/", "comment", 30),
+        ("/x/v2/reply", "comment", 30),
+        # 用户信息 / Profiles
+        ("/user/profile/", "profile", 1800),
+        ("/im/user/info/", "profile", 1800),
+        ("/api/user/detail/", "profile", 1800),
+        ("/x/space/wbi/acc/info", "profile", 1800),
+        # 作品详情 / Video detail
+        ("/aweme/detail/", "video", 300),
+        ("/api/item/detail/", "video", 300),
+        ("/x/web-interface/view", "video", 300),
+        ("/x/player/wbi/playurl", "video", 300),
+    ]
+
+    # 业务状态码字段，非 0 时不缓存 / Business status fields, responses with a non-zero value are not cached
+    STATUS_FIELDS = ("status_code", "statusCode", "code")
+
+    # 内容被删除、屏蔽或风控时出现的字段，非空时不缓存 / Fields present when content is removed, blocked or risk-controlled, not cached when non-empty
+    FILTER_FIELDS = ("filter_detail", "filter_list")
+
+    # 主体数据字段（点路径），顶层字段存在但路径的值为空时不缓存
+    # Payload fields as dotted paths, not cached when the top-level field is present but the value at the path is empty
+    PAYLOAD_FIELDS = ("aweme_detail", "itemInfo.itemStruct", "data", "user", "userInfo")
+
+    max_bytes = 64 * 1024 * 1024
+
+    _entries: OrderedDict = OrderedDict()
+    _bytes = 0
+    _stats: dict = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @classmethod
+    def configure(cls, max_bytes: int = None, ttl_rules: list = None) -> None:
+        """
+        修改缓存容量与过期规则 (Change the cache budget and TTL rules)
+
+        Args:
+            max_bytes (int): 缓存容量，单位字节 (Cache budget in bytes)
+            ttl_rules (list): 端点类型规则 (Endpoint type rules)
+        """
+        if max_bytes is not None:
+            cls.max_bytes = max_bytes
+            cls._evict()
+        if ttl_rules is not None:
+            cls.TTL_RULES = list(ttl_rules)
+
+    @classmethod
+    def ttl_for(cls, url: str) -> int:
+        """
+        端点的过期秒数，0 表示不缓存 (TTL of an endpoint in seconds, 0 means not cached)
+        """
+        path = urlsplit(url).path
+        for fragment, _, ttl in cls.TTL_RULES:
+            if fragment in path:
+                return ttl
+        return 0
+
+    @classmethod
+    def get(cls, key):
+        """
+        读取缓存，未命中或已过期时返回 None (Read the cache, None on a miss or when expired)
+        """
+        entry = cls._entries.get(key)
+        if entry is None:
+            cls._stats["misses"] += 1
+            return None
+
+        value, size, expires_at = entry
+        if expires_at <= time.monotonic():
+            cls._remove(key)
+            cls._stats["expirations"] += 1
+            cls._stats["misses"] += 1
+            return None
+
+        cls._entries.move_to_end(key)
+        cls._stats["hits"] += 1
+        return value
+
+    @classmethod
+    def set(cls, key, url: str, value, size: int) -> None:
+        """
+        写入缓存 (Write the cache)
+
+        Args:
+            key: 缓存键 (Cache key)
+            url (str): 端点URL，用于确定过期时间 (Endpoint URL, decides the TTL)
+            value: 解析后的JSON数据 (Parsed JSON data)
+            size (int): 响应体字节数 (Response body size in bytes)
+        """
+        ttl = cls.ttl_for(url)
+        if ttl <= 0 or size > cls.max_bytes or not cls._cacheable(value):
+            return
+
+        if key in cls._entries:
+            cls._remove(key)
+        cls._entries[key] = (value, size, time.monotonic() + ttl)
+        cls._bytes += size
+        cls._evict()
+
+    @classmethod
+    def _cacheable(cls, value) -> bool:
+        """
+        只缓存业务状态正常且带有主体数据的响应 (Only cache responses whose business status is OK and that carry a payload)
+
+        状态码为 0 但主体为空或带有过滤信息的响应（作品被删除、屏蔽或风控）不缓存，否则会在整个过期时间内返回空结果。
+        (Responses with status 0 but an empty payload or filter details, i.e. removed, blocked or
+        risk-controlled content, are not cached, otherwise the empty result would be served for the whole TTL.)
+        """
+        if not isinstance(value, dict) or not value:
+            return False
+        for field in cls.STATUS_FIELDS:
+            if field in value and value[field] not in (0, "0"):
+                return False
+        for field in cls.FILTER_FIELDS:
+            if value.get(field):
+                return False
+        for path in cls.PAYLOAD_FIELDS:
+            keys = path.split(".")
+            if keys[0] not in value:
+                continue
+            payload = value
+            for key in keys:
+                payload = payload.get(key) if isinstance(payload, dict) else None
+            if not payload:
+                return False
+        return True
+
+    @classmethod
+    def _remove(cls, key) -> None:
+        _, size, _ = cls._entries.pop(key)
+        cls._bytes -= size
+
+    @classmethod
+    def _evict(cls) -> None:
+        while cls._bytes > cls.max_bytes and cls._entries:
+            key = next(iter(cls._entries))
+            cls._remove(key)
+            cls._stats["evictions"] += 1
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空缓存 (Clear the cache)"""
+        cls._entries.clear()
+        cls._bytes = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        """缓存统计 (Cache statistics)"""
+        lookups = cls._stats["hits"] + cls._stats["misses"]
+        return {
+            "entries": len(cls._entries),
+            "bytes": cls._bytes,
+            "max_bytes": cls.max_bytes,
+            "hit_rate": round(cls._stats["hits"] / lookups, 3) if lookups else 0.0,
+            **cls._stats,
+        }
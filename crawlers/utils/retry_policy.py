@@ -0,0 +1,155 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+
+class RetryPolicy:
+    """
+    重试策略：指数退避 + 随机抖动，并遵循 Retry-After 响应头
+    (Retry policy: exponential backoff with jitter, honoring the Retry-After header)
+    """
+
+    # 默认可重试的状态码 / Retryable status codes by default
+    DEFAULT_RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+    # 默认可重试的异常 / Retryable exceptions by default
+    DEFAULT_RETRY_EXCEPTIONS = (
+        httpx.TimeoutException,
+        httpx.NetworkError,
+        httpx.RemoteProtocolError,
+    )
+
+    def __init__(
+            self,
+            max_retries: int = 3,
+            backoff_base: float = 0.2,
+            backoff_cap: float = 5.0,
+            jitter: bool = True,
+            retry_statuses: frozenset = None,
+            retry_exceptions: tuple = None,
+            respect_retry_after: bool = True,
+            retry_after_cap: float = 30.0,
+    ):
+        """
+        Args:
+            max_retries (int): 最大尝试次数 (Maximum number of attempts)
+            backoff_base (float): 退避基数，单位秒 (Backoff base in seconds)
+            backoff_cap (float): 单次退避上限，单位秒 (Upper bound of a single backoff in seconds)
+            jitter (bool): 是否使用完全随机抖动 (Whether to apply full jitter)
+            retry_statuses (frozenset): 可重试的状态码 (Retryable status codes)
+            retry_exceptions (tuple): 可重试的异常类型 (Retryable exception types)
+            respect_retry_after (bool): 是否遵循 Retry-After (Whether to honor Retry-After)
+            retry_after_cap (float): Retry-After 等待上限，单位秒 (Upper bound of a Retry-After wait in seconds)
+        """
+        self.max_retries = max(1, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retry_statuses = (
+            self.DEFAULT_RETRY_STATUSES if retry_statuses is None else frozenset(retry_statuses)
+        )
+        self.retry_exceptions = (
+            self.DEFAULT_RETRY_EXCEPTIONS if retry_exceptions is None else tuple(retry_exceptions)
+        )
+        self.respect_retry_after = respect_retry_after
+        self.retry_after_cap = retry_after_cap
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """状态码是否可重试 (Whether a status code is retryable)"""
+        return status_code in self.retry_statuses
+
+    def is_retryable_exception(self, exc: Exception) -> bool:
+        """异常是否可重试 (Whether an exception is retryable)"""
+        return isinstance(exc, self.retry_exceptions)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第 attempt 次失败后的退避时间 (Compute the backoff after the given failed attempt)
+
+        Args:
+            attempt (int): 从 0 开始的尝试序号 (Zero-based attempt index)
+
+        Returns:
+            float: 等待秒数 (Seconds to wait)
+        """
+        delay = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def retry_after(self, response: httpx.Response):
+        """
+        解析 Retry-After 响应头，支持秒数与 HTTP 日期两种格式
+        (Parse the Retry-After header, both delta-seconds and HTTP-date forms are supported)
+
+        Returns:
+            float | None: 等待秒数，无法解析时返回 None (Seconds to wait, None if absent or invalid)
+        """
+        if response is None:
+            return None
+
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def compute_delay(self, attempt: int, response: httpx.Response = None) -> float:
+        """
+        计算下一次重试前的等待时间 (Compute the wait before the next retry)
+
+        Args:
+            attempt (int): 从 0 开始的尝试序号 (Zero-based attempt index)
+            response (httpx.Response): 上一次的响应，可为空 (Previous response, may be None)
+
+        Returns:
+            float: 等待秒数 (Seconds to wait)
+        """
+        if self.respect_retry_after:
+            retry_after = self.retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.retry_after_cap)
+        return self.backoff(attempt)
@@ -0,0 +1,167 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import asyncio
+import functools
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from crawlers.utils.deadline import Deadline, SharedDeadline
+
+
+class _Flight:
+    """执行中的共享调用 (A shared call in flight)"""
+
+    def __init__(self, task: asyncio.Future, deadline: SharedDeadline):
+        self.task = task
+        self.deadline = deadline
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    合并并发的相同请求 (Coalesce concurrent identical calls)
+
+    同一个键在执行期间的后续调用不会再次执行，而是等待并共享第一次调用的结果。
+    共享的结果是同一个对象，调用方不应修改它。
+    (Later calls with a key that is already running do not run again, they await and share the result
+    of the first call. The shared result is the same object, so callers must not mutate it.)
+
+    共享任务按等待方中最晚的截止时间运行，所有等待方都离开后即被取消。
+    (The shared task runs by the latest deadline among its waiters and is cancelled once every waiter has left.)
+    """
+
+    # 签名、令牌等每次请求都会变化的参数 / Params such as signatures and tokens that change on every request
+    VOLATILE_PARAMS = frozenset({
+        "a_bogus", "X-Bogus", "msToken", "_signature", "X-Gnarly", "verifyFp", "fp", "w_rid", "wts",
+    })
+
+    _calls: dict = {}
+    _stats: dict = {"executed": 0, "coalesced": 0}
+
+    @classmethod
+    def canonical_url(cls, url: str) -> str:
+        """
+        去掉易变参数并排序后的URL (URL without volatile params, with the remaining params sorted)
+
+        Args:
+            url (str): 端点URL (Endpoint URL)
+
+        Returns:
+            str: 规范化的URL (Canonical URL)
+        """
+        parts = urlsplit(url)
+        query = sorted(
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in cls.VOLATILE_PARAMS
+        )
+        return parts._replace(query=urlencode(query), fragment="").geturl()
+
+    @classmethod
+    async def do(cls, key, func, *args, **kwargs):
+        """
+        以 key 合并执行 func(*args, **kwargs) (Run func(*args, **kwargs) coalesced by key)
+
+        Args:
+            key: 可哈希的请求键 (Hashable call key)
+            func: 异步函数 (Async function)
+
+        Returns:
+            func 的返回值 (Return value of func)
+        """
+        # 任务与事件循环绑定 / Tasks are bound to their event loop
+        key = (asyncio.get_running_loop(), key)
+        deadline = Deadline.current()
+        flight = cls._calls.get(key)
+        if flight is None:
+            cls._stats["executed"] += 1
+            # 共享任务按所有等待方中最晚的截止时间运行，后加入的调用方可以延长它
+            # The shared task runs by the latest deadline among its waiters, callers that join later can extend it
+            with Deadline.shared(deadline) as shared:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+            flight = _Flight(task, shared)
+            cls._calls[key] = flight
+            task.add_done_callback(functools.partial(cls._finish, key, flight))
+        else:
+            cls._stats["coalesced"] += 1
+            flight.deadline.extend(deadline)
+
+        flight.waiters += 1
+        try:
+            # shield 保证某个调用方被取消或超时时不会取消共享任务，每个调用方只按自己的截止时间等待
+            # shield keeps the shared task running when one of the callers is cancelled or times out, every caller waits by its own deadline
+            return await Deadline.wait(asyncio.shield(flight.task))
+        finally:
+            flight.waiters -= 1
+            # 最后一个等待方离开后不再为它继续工作 / Stop working once the last waiter has left
+            if flight.waiters == 0 and not flight.task.done():
+                cls._discard(key, flight)
+                flight.task.cancel()
+
+    @classmethod
+    def _discard(cls, key, flight) -> None:
+        if cls._calls.get(key) is flight:
+            del cls._calls[key]
+
+    @classmethod
+    def _finish(cls, key, flight, task: asyncio.Task) -> None:
+        cls._discard(key, flight)
+        # 所有调用方都已取消时避免 "exception was never retrieved" 警告
+        # Avoid "exception was never retrieved" warnings when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    @classmethod
+    def stats(cls) -> dict:
+        """合并统计 (Coalescing statistics)"""
+        return {
+            "in_flight": len(cls._calls),
+            "executed": cls._stats["executed"],
+            "coalesced": cls._stats["coalesced"],
+        }
+
+
+def coalesce(func):
+    """
+    按 方法名 + 参数 合并并发调用的装饰器 (Decorator that coalesces concurrent calls by method name and arguments)
+
+    用于爬虫方法，使签名计算与上游请求对同一作品只执行一次。
+    (Used on crawler methods so that signing and the upstream request run only once per item.)
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+        return await SingleFlight.do(key, func, self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,387 @@
+# ==============================================================================
+# Copyright (C) 2021 Evil0ctal
+#
+# This file is part of the Douyin_TikTok_Download_API project.
+#
+# This project is licensed under the Apache License 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+# 　　　　 　　  ＿＿
+# 　　　 　　 ／＞　　フ
+# 　　　 　　| 　_　 _ l
+# 　 　　 　／` ミ＿xノ
+# 　　 　 /　　　 　 |       Feed me Stars ⭐ ️
+# 　　　 /　 ヽ　　 ﾉ
+# 　 　 │　　|　|　|
+# 　／￣|　　 |　|　|
+# 　| (￣ヽ＿_ヽ_)__)
+# 　＼二つ
+# ==============================================================================
+#
+# Contributor Link:
+# - https://github.com/Evil0ctal
+# - https://github.com/Johnserf-Seed
+#
+# ==============================================================================
+
+import asyncio
+import json
+import os
+import time
+
+from crawlers.utils.logger import logger
+
+
+class TokenStore:
+    """
+    令牌持久化文件 (Token persistence file)
+
+    保存令牌及其签发时间，重启后重新载入未过期的令牌，使服务无需等待令牌生成即可就绪。
+    (Saves tokens with their issue time so unexpired tokens are reloaded after a restart and the
+    service is ready without waiting for token generation.)
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): JSON 文件路径 (JSON file path)
+        """
+        self.path = path
+
+    def load(self) -> dict:
+        """
+        读取令牌 (Read the tokens)
+
+        Returns:
+            dict: {(平台, 类型): [(令牌, 签发时间)]} ({(platform, kind): [(token, issued_at)]})
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("读取令牌文件失败: {0} (Failed to read the token store)".format(e))
+            return {}
+
+        return {
+            (platform, kind): [(value, float(issued_at)) for value, issued_at in tokens]
+            for platform, kinds in data.items()
+            for kind, tokens in kinds.items()
+        }
+
+    def save(self, tokens: dict) -> None:
+        """
+        原子写入令牌，文件仅当前用户可读写 (Write the tokens atomically, readable by the current user only)
+
+        Args:
+            tokens (dict): {(平台, 类型): [(令牌, 签发时间)]} ({(platform, kind): [(token, issued_at)]})
+        """
+        data = {}
+        for (platform, kind), values in tokens.items():
+            data.setdefault(platform, {})[kind] = [list(token) for token in values]
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        # 多个工作进程可能同时保存，各自使用独立的临时文件 / Several workers may save at once, each uses its own temp file
+        temp_path = "{0}.{1}.tmp".format(self.path, os.getpid())
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning("保存令牌文件失败: {0} (Failed to save the token store)".format(e))
+
+
+class TokenPool:
+    """
+    预热令牌池 (Pre-warmed token pool)
+
+    后台任务为每个 平台 + 令牌类型 (如 msToken) 保持少量新鲜的令牌，
+    新鲜令牌数低于水位线时补充，超过最大寿命的令牌被淘汰；请求构建参数时以 O(1) 轮流取用，
+    令牌生成不再出现在请求的关键路径上。
+    (A background task keeps a few fresh tokens per platform and token kind, tops them up when the
+    fresh count drops below the watermark and retires tokens older than their maximum age. Request
+    builders take them in O(1) round robin, so token generation leaves the request critical path.)
+
+    补充全部失败后按指数退避，等待 interval * 2^n 秒（不超过 max_backoff）再重试，避免持续请求上游。
+    (After a refill fails completely it backs off exponentially, waiting interval * 2^n seconds capped at
+    max_backoff before the next try, so a failing upstream is not hit continuously.)
+    """
+
+    _generators: dict = {}
+    _settings: dict = {}
+    _tokens: dict = {}
+    _cursors: dict = {}
+    _counters: dict = {}
+    _pending: dict = {}
+    _backoff: dict = {}
+    _store = None
+    _task = None
+
+    # 后台任务检查间隔（秒） / Interval of the background task in seconds
+    interval: float = 5.0
+    # 补充失败后的最长退避时间（秒） / Longest backoff after failed refills in seconds
+    max_backoff: float = 300.0
+
+    @classmethod
+    def register(cls, platform: str, kind: str, generator, size: int = 4, low_watermark: int = 2,
+                 max_age: float = 1800) -> None:
+        """
+        注册令牌生成函数 (Register a token generator)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            kind (str): 令牌类型 (Token kind)
+            generator (callable): 异步生成函数，失败时应抛出异常 (Async generator, should raise on failure)
+            size (int): 池容量 (Pool size)
+            low_watermark (int): 新鲜令牌少于该值时补充 (Top up when fewer fresh tokens remain)
+            max_age (float): 令牌最大寿命（秒） (Maximum token age in seconds)
+        """
+        key = (platform, kind)
+        cls._generators[key] = generator
+        cls._settings[key] = (max(1, size), max(1, min(low_watermark, size)), max_age)
+        cls._tokens.setdefault(key, [])
+        cls._counters.setdefault(key, {"served": 0, "misses": 0, "generated": 0, "failed": 0, "expired": 0})
+
+    @classmethod
+    def get(cls, platform: str, kind: str):
+        """
+        取用一个未过期的令牌 (Take an unexpired token)
+
+        Args:
+            platform (str): 平台名称 (Platform name)
+            kind (str): 令牌类型 (Token kind)
+
+        Returns:
+            str | None: 令牌，池为空时返回 None (Token, None when the pool is empty)
+        """
+        key = (platform, kind)
+        tokens = cls._tokens.get(key)
+        if tokens:
+            cursor = cls._cursors.get(key, -1) + 1
+            cls._cursors[key] = cursor
+            value, issued_at = tokens[cursor % len(tokens)]
+            if time.time() - issued_at < cls._settings[key][2]:
+                cls._counters[key]["served"] += 1
+                return value
+            cls._prune(key)
+            return cls.get(platform, kind)
+
+        if key in cls._counters:
+            cls._counters[key]["misses"] += 1
+            cls._kick(key)
+        return None
+
+    @classmethod
+    def _kick(cls, key: tuple) -> None:
+        """
+        池为空且后台任务未运行时，在当前事件循环中补充一次，没有事件循环时什么也不做
+        (When the pool is empty and the refresher is not running, refill once on the current loop,
+        do nothing without a running loop)
+        """
+        if cls._task is not None and not cls._task.done():
+            return
+        pending = cls._pending.get(key)
+        if pending is not None and not pending.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        cls._pending[key] = loop.create_task(cls.refill(*key))
+
+    @classmethod
+    def factory(cls, platform: str, kind: str, fallback):
+        """
+        生成 pydantic default_factory：优先取用池中令牌，池为空时调用 fallback
+        (Build a pydantic default_factory that takes a pooled token and calls fallback when the pool is empty)
+
+        令牌在每次构建请求参数时才解析，导入模块不会产生任何网络请求，fallback 也不应访问网络。
+        (Tokens are resolved each time request parameters are built, so importing a module never touches
+        the network, and fallback should not either.)
+        """
+        return lambda: cls.get(platform, kind) or fallback()
+
+    @classmethod
+    def add(cls, platform: str, kind: str, value: str, issued_at: float = None) -> None:
+        """放入一个令牌 (Put a token into the pool)"""
+        key = (platform, kind)
+        if key not in cls._settings or not value:
+            return
+        tokens = cls._tokens[key]
+        tokens.append((value, issued_at or time.time()))
+        # 超出容量时淘汰最旧的令牌 / Drop the oldest tokens beyond the pool size
+        size = cls._settings[key][0]
+        if len(tokens) > size:
+            tokens.sort(key=lambda token: token[1])
+            del tokens[:len(tokens) - size]
+
+    @classmethod
+    def _prune(cls, key: tuple) -> None:
+        max_age = cls._settings[key][2]
+        now = time.time()
+        tokens = cls._tokens[key]
+        fresh = [token for token in tokens if now - token[1] < max_age]
+        cls._counters[key]["expired"] += len(tokens) - len(fresh)
+        cls._tokens[key] = fresh
+
+    @classmethod
+    def _fresh_count(cls, key: tuple) -> int:
+        # 寿命超过 80% 的令牌视为即将过期，提前补充 / Tokens past 80% of their age are replaced ahead of time
+        max_age = cls._settings[key][2]
+        now = time.time()
+        return sum(1 for _, issued_at in cls._tokens[key] if now - issued_at < max_age * 0.8)
+
+    @classmethod
+    async def refill(cls, platform: str, kind: str) -> bool:
+        """
+        新鲜令牌低于水位线时补充到池容量 (Top the pool up to its size when fresh tokens fall below the watermark)
+
+        Returns:
+            bool: 是否生成了新令牌 (Whether new tokens were generated)
+        """
+        key = (platform, kind)
+        cls._prune(key)
+        size, low_watermark, _ = cls._settings[key]
+        fresh = cls._fresh_count(key)
+        if fresh >= low_watermark:
+            return False
+        # 上次补充全部失败时，退避期内不再请求上游 / After a completely failed refill, do not call upstream during the backoff
+        failures, retry_at = cls._backoff.get(key, (0, 0.0))
+        if time.monotonic() < retry_at:
+            return False
+
+        results = await asyncio.gather(
+            *[cls._generators[key]() for _ in range(size - fresh)], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                cls._counters[key]["failed"] += 1
+            else:
+                cls._counters[key]["generated"] += 1
+                cls.add(platform, kind, result)
+        failed = [result for result in results if isinstance(result, BaseException)]
+        if len(failed) < len(results):
+            cls._backoff.pop(key, None)
+        else:
+            failures += 1
+            cls._backoff[key] = (failures, time.monotonic() + min(cls.max_backoff, cls.interval * 2 ** failures))
+        if failed:
+            logger.warning("预热 {0} {1} 失败 {2} 次: {3} (Token pre-warming failed)".format(
+                platform, kind, len(failed), failed[0]
+            ))
+        return len(failed) < len(results)
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            changed = False
+            for platform, kind in list(cls._generators):
+                try:
+                    changed = await cls.refill(platform, kind) or changed
+                except Exception as e:
+                    logger.error("令牌池刷新异常: {0} (Token pool refresh error)".format(e))
+            if changed and cls._store is not None:
+                await asyncio.to_thread(cls._store.save, dict(cls._tokens))
+            await asyncio.sleep(cls.interval)
+
+    @classmethod
+    def _load(cls, store: TokenStore) -> int:
+        """从持久化文件载入未过期的令牌 (Load unexpired tokens from the store)"""
+        loaded = 0
+        for (platform, kind), tokens in store.load().items():
+            key = (platform, kind)
+            if key not in cls._settings:
+                continue
+            max_age = cls._settings[key][2]
+            for value, issued_at in tokens:
+                if time.time() - issued_at < max_age:
+                    cls.add(platform, kind, value, issued_at)
+                    loaded += 1
+        return loaded
+
+    @classmethod
+    async def start(cls, store_path: str = None) -> None:
+        """
+        在当前事件循环中启动后台刷新任务 (Start the background refresher on the current loop)
+
+        Args:
+            store_path (str): 令牌持久化文件，为空时不持久化 (Token store file, empty disables persistence)
+        """
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._store = TokenStore(store_path) if store_path else None
+        if cls._store is not None:
+            loaded = cls._load(cls._store)
+            logger.info("已载入 {0} 个未过期的令牌 (Loaded unexpired tokens)".format(loaded))
+        cls._task = asyncio.create_task(cls._run())
+        logger.info("令牌预热池已启动 (Token pool started)")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """停止后台刷新任务并保存令牌 (Stop the background refresher and save the tokens)"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        if cls._store is not None:
+            for key in cls._tokens:
+                cls._prune(key)
+            cls._store.save(dict(cls._tokens))
+
+    @classmethod
+    def stats(cls) -> list:
+        """所有令牌池的状态，不展示令牌内容 (Statistics of every pool, token values are not shown)"""
+        now = time.time()
+        monotonic = time.monotonic()
+        stats = []
+        for key, tokens in cls._tokens.items():
+            size, low_watermark, max_age = cls._settings[key]
+            _, retry_at = cls._backoff.get(key, (0, 0.0))
+            stats.append({
+                "platform": key[0],
+                "kind": key[1],
+                "size": size,
+                "low_watermark": low_watermark,
+                "max_age": max_age,
+                "tokens": len(tokens),
+                "oldest_age_seconds": round(max((now - issued_at for _, issued_at in tokens), default=0.0), 1),
+                "backoff_seconds": round(max(0.0, retry_at - monotonic), 1),
+                **cls._counters[key],
+            })
+        return stats
+
+
+if __name__ == "__main__":
+    # 启动耗时基准：统计导入 app.main 时的 DNS 查询次数与耗时
+    # Startup benchmark: count DNS lookups and time spent while importing app.main
+    # python -m crawlers.utils.token_pool
+    import socket
+
+    lookups = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counting_getaddrinfo(host, *args, **kwargs):
+        lookups.append(host)
+        return getaddrinfo(host, *args, **kwargs)
+
+    socket.getaddrinfo = counting_getaddrinfo
+    start = time.perf_counter()
+    import app.main  # noqa: F401
+
+    print("import app.main: {0:.3f} s, network lookups: {1} {2}".format(
+        time.perf_counter() - start, len(lookups), sorted(set(lookups))
+    ))
@@ -34,6 +34,7 @@
 
 
 import re
+import functools
 import sys
 import random
 import secrets
@@ -392,3 +393,55 @@ def merge_config(
             merged_conf[key] = value  # CLI 参数会覆盖自定义配置和主配置中的同名参数
 
     return merged_conf
+
+
+@functools.lru_cache(maxsize=256)
+def parse_fields(fields: str) -> dict:
+    """
+    将逗号分隔的点路径解析为字段树 (Parse comma-separated dotted paths into a field tree)
+
+    Args:
+        fields (str): 如 "author.nickname,statistics.digg_count" (e.g. "author.nickname,statistics.digg_count")
+
+    Returns:
+        dict: 字段树，叶子为 None 表示保留整个值 (Field tree, a None leaf keeps the whole value)
+    """
+    tree = {}
+    for path in fields.split(","):
+        keys = [key for key in path.strip().split(".") if key]
+        node = tree
+        for i, key in enumerate(keys):
+            if i == len(keys) - 1:
+                # 较短的路径覆盖较长的路径 (A shorter path wins over a longer one)
+                node[key] = None
+            elif key not in node:
+                node[key] = {}
+            elif node[key] is None:
+                break
+            node = node[key]
+    return tree
+
+
+def project_fields(data: Any, tree: dict) -> Any:
+    """
+    按字段树裁剪数据，列表中的每一项分别裁剪，不存在的路径被忽略
+    (Project data through a field tree, every list item is projected on its own and missing paths are skipped)
+
+    Args:
+        data (Any): 原始数据 (Original data)
+        tree (dict): parse_fields 生成的字段树 (Field tree built by parse_fields)
+
+    Returns:
+        Any: 裁剪后的数据 (Projected data)
+    """
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [project_fields(item, tree) for item in data]
+    if not isinstance(data, dict):
+        return data
+    return {
+        key: data[key] if sub is None else project_fields(data[key], sub)
+        for key, sub in tree.items()
+        if key in data
+    }